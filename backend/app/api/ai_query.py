@@ -13,6 +13,7 @@ from app.core.analysis.models import (
     QueryConfirmation,
 )
 from app.core.analysis.store import AnalysisStore, SessionStore
+from app.core.analysis.query_cache import get_query_cache, query_cache_key
 from app.core.nlp.enhanced_parser import ConversationalQueryInterpreter
 from app.core.terminology.fda_mapper import FDATerminologyMapper
 from app.core.terminology.snomed_mapper import SNOMEDCTMapper
@@ -246,7 +247,18 @@ def _compute_fast_count(filters, supabase: Client) -> Optional[int]:
     """
     Compute a fast estimated count for the given filters.
     Uses the same logic as run_cases_query but only for count.
+    
+    Cached per filters; only the first drug/event value is used, so those
+    are part of the key.
     """
+    return get_query_cache().get_or_compute(
+        query_cache_key("fast_count", filters, filters.drugs.values[:1], filters.events.values[:1]),
+        lambda: _fetch_fast_count(filters, supabase),
+    )
+
+
+def _fetch_fast_count(filters, supabase: Client) -> Optional[int]:
+    """Uncached body of _compute_fast_count"""
     try:
         # Build base query for count only
         query = supabase.table("pv_cases").select("id", count="exact")
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import csv
 import io
+import json
 import os
 from datetime import datetime, timedelta
 from collections import Counter
@@ -22,7 +24,11 @@ from app.core.analysis.models import (
     CategoryCount,
 )
 from app.core.analysis.store import AnalysisStore, SavedAnalysisStore
-from app.core.signal_detection.fusion_query import run_fusion_for_filters
+from app.core.analysis.query_cache import get_query_cache, query_cache_key
+from app.core.signal_detection.fusion_query import (
+    run_fusion_for_filters_async,
+    stream_fusion_for_filters,
+)
 from app.core.signal_detection.query_router import FusionResultSummary
 
 # Create global instances
@@ -207,50 +213,13 @@ async def run_cases_query(
         page_size = MAX_PAGE_SIZE
     
     try:
-        # Build base query with all filters
-        base_query = _build_base_query(supabase, filters)
-        
-        # Get total count (before pagination)
-        count_response = base_query.execute()
-        total_count = count_response.count if hasattr(count_response, 'count') else 0
-        
-        # Apply pagination
-        from_index = (page - 1) * page_size
-        to_index = from_index + page_size - 1
-        query = base_query.range(from_index, to_index)
-        
-        # Execute query
-        response = query.execute()
-        rows_data = response.data or []
-        
-        # Map database rows to AnalysisRow objects (no Python-side filtering needed)
-        rows: List[AnalysisRow] = []
-        for row in rows_data:
-            # Convert date to string
-            onset_date = row.get("onset_date")
-            if onset_date:
-                if isinstance(onset_date, str):
-                    onset_date_str = onset_date
-                else:
-                    onset_date_str = onset_date.isoformat() if hasattr(onset_date, 'isoformat') else str(onset_date)
-            else:
-                onset_date_str = None
-            
-            # Build AnalysisRow
-            analysis_row = AnalysisRow(
-                case_id=row.get("case_id") or row.get("id", ""),
-                drug=row.get("drug_name", ""),
-                event=row.get("reaction", ""),
-                serious=bool(row.get("serious", False)),
-                outcome=row.get("outcome"),
-                onset_date=onset_date_str,
-                age=int(row.get("age_yrs")) if row.get("age_yrs") is not None else None,
-                sex=row.get("sex"),
-                region=row.get("country"),
-            )
-            rows.append(analysis_row)
-        
-        return rows, total_count
+        # Chat refinements that land on the same filters skip the scan
+        return await get_query_cache().get_or_compute_async(
+            query_cache_key("cases_page", filters, page, page_size),
+            lambda: _fetch_cases_page(filters, page, page_size),
+            dump=lambda result: {"rows": [r.dict() for r in result[0]], "total": result[1]},
+            load=lambda data: ([AnalysisRow(**r) for r in data["rows"]], data["total"]),
+        )
         
     except Exception as e:
         # Log error and return empty result
@@ -260,6 +229,58 @@ async def run_cases_query(
         return [], 0
 
 
+async def _fetch_cases_page(
+    filters: SignalQueryFilters,
+    page: int,
+    page_size: int,
+) -> tuple[List[AnalysisRow], int]:
+    """Uncached body of run_cases_query"""
+    # Build base query with all filters
+    base_query = _build_base_query(supabase, filters)
+    
+    # Get total count (before pagination)
+    count_response = base_query.execute()
+    total_count = count_response.count if hasattr(count_response, 'count') else 0
+    
+    # Apply pagination
+    from_index = (page - 1) * page_size
+    to_index = from_index + page_size - 1
+    query = base_query.range(from_index, to_index)
+    
+    # Execute query
+    response = query.execute()
+    rows_data = response.data or []
+    
+    # Map database rows to AnalysisRow objects (no Python-side filtering needed)
+    rows: List[AnalysisRow] = []
+    for row in rows_data:
+        # Convert date to string
+        onset_date = row.get("onset_date")
+        if onset_date:
+            if isinstance(onset_date, str):
+                onset_date_str = onset_date
+            else:
+                onset_date_str = onset_date.isoformat() if hasattr(onset_date, 'isoformat') else str(onset_date)
+        else:
+            onset_date_str = None
+        
+        # Build AnalysisRow
+        analysis_row = AnalysisRow(
+            case_id=row.get("case_id") or row.get("id", ""),
+            drug=row.get("drug_name", ""),
+            event=row.get("reaction", ""),
+            serious=bool(row.get("serious", False)),
+            outcome=row.get("outcome"),
+            onset_date=onset_date_str,
+            age=int(row.get("age_yrs")) if row.get("age_yrs") is not None else None,
+            sex=row.get("sex"),
+            region=row.get("country"),
+        )
+        rows.append(analysis_row)
+    
+    return rows, total_count
+
+
 def _build_analysis_stats(rows: List[AnalysisRow], total_count: int) -> AnalysisStats:
     """
     Build aggregated stats for charts from a list of AnalysisRow.
@@ -526,10 +547,16 @@ async def list_session_analyses(session_id: str) -> List[AnalysisHandle]:
 class FusionRankingResponse(BaseModel):
     handle: AnalysisHandle
     results: List[dict]  # FusionResultSummary as dict (dataclass converted)
+    skipped_pairs: int = 0  # Candidate pairs that never co-occur
+    message: Optional[str] = None
 
 
 @router.get("/{analysis_id}/fusion", response_model=FusionRankingResponse)
-async def get_fusion_ranking_for_analysis(analysis_id: str) -> FusionRankingResponse:
+async def get_fusion_ranking_for_analysis(
+    analysis_id: str,
+    organization: Optional[str] = Query(None, description="Organization whose signal detection config to use"),
+    user_id: Optional[str] = Query(None, description="User whose signal detection config to use (default: analysis owner)"),
+) -> FusionRankingResponse:
     """
     Run heavy fusion ranking for the cohort defined by this AnalysisHandle.
 
@@ -543,17 +570,54 @@ async def get_fusion_ranking_for_analysis(analysis_id: str) -> FusionRankingResp
     filters = handle.filters
 
     # You can tune the limit or expose it as a query param
-    fusion_results = run_fusion_for_filters(filters, limit=50)
+    fusion_query = await run_fusion_for_filters_async(
+        filters,
+        limit=50,
+        organization=organization,
+        user_id=user_id or handle.owner_user_id,
+    )
 
     # Convert FusionResultSummary dataclass to dict for Pydantic response
-    results_dict = [result.to_dict() for result in fusion_results]
+    results_dict = [result.to_dict() for result in fusion_query.results]
 
     return FusionRankingResponse(
         handle=handle,
         results=results_dict,
+        skipped_pairs=fusion_query.skipped_pairs,
+        message=fusion_query.message,
     )
 
 
+@router.get("/{analysis_id}/fusion/stream")
+async def stream_fusion_ranking_for_analysis(
+    analysis_id: str,
+    organization: Optional[str] = Query(None, description="Organization whose signal detection config to use"),
+    user_id: Optional[str] = Query(None, description="User whose signal detection config to use (default: analysis owner)"),
+) -> StreamingResponse:
+    """
+    Same ranking as /{analysis_id}/fusion, streamed as NDJSON.
+
+    Each line is {"results": [...]} with the running top 50 as evidence
+    arrives, so the UI can show partial rankings for large cohorts. The
+    last line is the final ranking.
+    """
+    handle = analysis_store.get(analysis_id)
+    if handle is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    async def lines():
+        async for results in stream_fusion_for_filters(
+            handle.filters,
+            limit=50,
+            organization=organization,
+            user_id=user_id or handle.owner_user_id,
+        ):
+            payload = {"results": [result.to_dict() for result in results]}
+            yield json.dumps(jsonable_encoder(payload)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{analysis_id}/stats", response_model=AnalysisStats)
 async def get_analysis_stats(
     analysis_id: str,
@@ -0,0 +1,266 @@
+"""
+Columnar Case Snapshot
+Compact in-process index from drug/reaction names to pv_cases ids
+
+The signal endpoints take their 2x2 tables from the count cube
+(app.core.signal_detection.count_cube); the cube holds no case ids, so
+/signals/drug-event lists the matching cases from this snapshot instead of
+an ILIKE scan over pv_cases. It keeps one shared, columnar copy of:
+- drug_name, reaction as dictionary-encoded int32 codes
+- id as 16-byte UUIDs
+
+At roughly 24 bytes per case a 2M-case snapshot takes about 50 MB. It is
+built once, extended incrementally from rows created since the last
+refresh, and rebuilt from scratch periodically to pick up edits/deletes.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMNS = "id,drug_name,reaction,created_at"
+CATEGORICAL_COLUMNS = ("drug_name", "reaction")
+
+
+class CaseSnapshot:
+    """
+    Immutable columnar view of pv_cases.
+
+    New rows go into a new snapshot (extend() or CaseSnapshotBuilder);
+    existing snapshots are never modified, so requests can keep reading
+    one while another is built.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.vocab: Dict[str, List[Optional[str]]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._vocab_ids: Dict[str, Dict[Optional[str], int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self.codes: Dict[str, np.ndarray] = {
+            name: np.zeros(0, dtype=np.int32) for name in CATEGORICAL_COLUMNS
+        }
+        self.ids = np.zeros(0, dtype="S16")
+        self._text_ids: Dict[int, str] = {}  # Rows whose id is not a UUID
+        self.last_created_at: Optional[str] = None
+        self._ids_at_last_created_at: set = set()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def extend(self, rows: Sequence[Dict[str, Any]]) -> "CaseSnapshot":
+        """New snapshot with rows appended (see CaseSnapshotBuilder)"""
+        builder = CaseSnapshotBuilder(self)
+        builder.add(rows)
+        return builder.build()
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the column arrays"""
+        return sum(codes.nbytes for codes in self.codes.values()) + self.ids.nbytes
+
+    def substring_codes(self, name: str, term: str) -> np.ndarray:
+        """Codes of values containing term, case-insensitively"""
+        term = term.lower()
+        return np.array(
+            [i for i, value in enumerate(self.vocab[name]) if term in (value or "").lower()],
+            dtype=np.int32,
+        )
+
+    def case_ids(self, rows: np.ndarray) -> List[str]:
+        """pv_cases ids for row indices"""
+        return [
+            self._text_ids[i] if i in self._text_ids else str(uuid.UUID(bytes=bytes(self.ids[i])))
+            for i in np.asarray(rows).tolist()
+        ]
+
+
+class CaseSnapshotBuilder:
+    """
+    Encodes pages of pv_cases rows into a new CaseSnapshot.
+
+    Pages are encoded as they arrive and concatenated once in build(), so
+    the raw row dicts never accumulate. Rows already in the base snapshot
+    (same id at its latest created_at) are skipped, which makes overlapping
+    incremental fetches safe.
+    """
+
+    def __init__(self, base: Optional[CaseSnapshot] = None):
+        self.base = base or CaseSnapshot()
+        self.vocab = {name: list(values) for name, values in self.base.vocab.items()}
+        self._vocab_ids = {name: dict(ids) for name, ids in self.base._vocab_ids.items()}
+        self._text_ids = dict(self.base._text_ids)
+        self._chunks: Dict[str, List[np.ndarray]] = {
+            name: [] for name in CATEGORICAL_COLUMNS + ("ids",)
+        }
+        self.n = self.base.n
+        self.last_created_at = self.base.last_created_at
+        self._ids_at_last_created_at = set(self.base._ids_at_last_created_at)
+
+    def add(self, rows: Sequence[Dict[str, Any]]) -> None:
+        rows = [
+            r for r in rows
+            if not (r.get("created_at") == self.base.last_created_at
+                    and str(r.get("id")) in self.base._ids_at_last_created_at)
+        ]
+        count = len(rows)
+        if not count:
+            return
+
+        for name in CATEGORICAL_COLUMNS:
+            values, ids = self.vocab[name], self._vocab_ids[name]
+            codes = np.empty(count, dtype=np.int32)
+            for i, row in enumerate(rows):
+                value = row.get(name)
+                if value is not None:
+                    value = str(value)
+                code = ids.get(value)
+                if code is None:
+                    code = ids[value] = len(values)
+                    values.append(value)
+                codes[i] = code
+            self._chunks[name].append(codes)
+
+        ids = np.empty(count, dtype="S16")
+        for i, row in enumerate(rows):
+            try:
+                ids[i] = uuid.UUID(str(row.get("id"))).bytes
+            except ValueError:
+                ids[i] = b""
+                self._text_ids[self.n + i] = str(row.get("id"))
+        self._chunks["ids"].append(ids)
+
+        for row in rows:
+            created_at = row.get("created_at")
+            if created_at is None:
+                continue
+            if self.last_created_at is None or created_at > self.last_created_at:
+                self.last_created_at = created_at
+                self._ids_at_last_created_at = {str(row.get("id"))}
+            elif created_at == self.last_created_at:
+                self._ids_at_last_created_at.add(str(row.get("id")))
+        self.n += count
+
+    def build(self) -> CaseSnapshot:
+        base = self.base
+        snapshot = CaseSnapshot()
+        snapshot.n = self.n
+        snapshot.vocab = self.vocab
+        snapshot._vocab_ids = self._vocab_ids
+        snapshot._text_ids = self._text_ids
+        snapshot.codes = {
+            name: np.concatenate([base.codes[name]] + self._chunks[name])
+            for name in CATEGORICAL_COLUMNS
+        }
+        snapshot.ids = np.concatenate([base.ids] + self._chunks["ids"])
+        snapshot.last_created_at = self.last_created_at
+        snapshot._ids_at_last_created_at = self._ids_at_last_created_at
+        return snapshot
+
+
+class CaseSnapshotStore:
+    """
+    Shared, lazily refreshed CaseSnapshot for a Supabase client.
+
+    get() returns the current snapshot. When it is older than
+    CASE_SNAPSHOT_REFRESH_SECONDS a background task fetches the rows created
+    since the last refresh (or rebuilds it completely every
+    CASE_SNAPSHOT_REBUILD_SECONDS) in a worker thread, and requests keep
+    getting the previous snapshot until it finishes. Only the first get()
+    waits for a build.
+    """
+
+    def __init__(
+        self,
+        supabase_client: Any,
+        refresh_seconds: Optional[float] = None,
+        rebuild_seconds: Optional[float] = None,
+        page_size: int = 1000,
+    ):
+        self.supabase = supabase_client
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None
+            else float(os.getenv("CASE_SNAPSHOT_REFRESH_SECONDS", "60"))
+        )
+        self.rebuild_seconds = (
+            rebuild_seconds if rebuild_seconds is not None
+            else float(os.getenv("CASE_SNAPSHOT_REBUILD_SECONDS", "3600"))
+        )
+        self.page_size = page_size
+        self._snapshot: Optional[CaseSnapshot] = None
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self._invalidations = 0
+        self._rebuilt_invalidations = 0
+        self._refresh: Optional["asyncio.Task[CaseSnapshot]"] = None
+
+    async def get(self) -> CaseSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return snapshot
+
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._run_refresh())
+        if snapshot is None:
+            # Shielded so a cancelled request does not cancel the shared build
+            return await asyncio.shield(self._refresh)
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Rebuild completely on the next refresh, serving the current snapshot meanwhile"""
+        self._invalidations += 1
+        self._refreshed_at = 0.0
+
+    async def _run_refresh(self) -> CaseSnapshot:
+        snapshot = self._snapshot
+        invalidations = self._invalidations
+        started = time.monotonic()
+        rebuild = (
+            snapshot is None
+            or invalidations != self._rebuilt_invalidations
+            or started - self._built_at >= self.rebuild_seconds
+        )
+        try:
+            if rebuild:
+                snapshot = await asyncio.to_thread(self._fetch, CaseSnapshot(), None)
+                self._built_at = started
+                self._rebuilt_invalidations = invalidations
+                logger.info(f"Case snapshot built: {snapshot.n:,} cases, "
+                            f"{snapshot.nbytes / 1e6:.1f} MB")
+            else:
+                snapshot = await asyncio.to_thread(self._fetch, snapshot, snapshot.last_created_at)
+        except Exception:
+            if self._snapshot is None:
+                raise
+            # Keep serving the previous snapshot; the next get() retries
+            logger.exception("Case snapshot refresh failed")
+            return self._snapshot
+        self._snapshot = snapshot
+        self._refreshed_at = time.monotonic()
+        return snapshot
+
+    def _fetch(self, snapshot: CaseSnapshot, since: Optional[str]) -> CaseSnapshot:
+        builder = CaseSnapshotBuilder(snapshot)
+        offset = 0
+        while True:
+            query = self.supabase.table("pv_cases").select(SNAPSHOT_COLUMNS)
+            if since is not None:
+                query = query.gte("created_at", since)
+            result = query.order("created_at").order("id").range(
+                offset, offset + self.page_size - 1
+            ).execute()
+            rows = result.data or []
+            builder.add(rows)
+            offset += len(rows)
+            if len(rows) < self.page_size:
+                return builder.build()
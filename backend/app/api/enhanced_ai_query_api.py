@@ -9,11 +9,12 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional
+import asyncio
 import os
 import logging
 from supabase import create_client, Client
 
-from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine
+from app.core.signal_detection.complete_fusion_engine import get_fusion_engine
 from app.core.signal_detection.metrics_provider import create_supabase_metrics_provider, MetricsProvider
 from app.core.terminology.fda_mapper import FDATerminologyMapper
 from app.core.nlp.enhanced_nlp_integration import process_natural_language_query
@@ -28,27 +29,26 @@ supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
 supabase: Client = create_client(supabase_url, supabase_key) if supabase_url and supabase_key else None
 
-_fusion_engine: Optional[CompleteFusionEngine] = None
 _fda_mapper: Optional[FDATerminologyMapper] = None
 _metrics_provider: Optional[MetricsProvider] = None
 
 
 def _get_components():
-    global _fusion_engine, _fda_mapper, _metrics_provider
-    if _fusion_engine is None:
-        _fusion_engine = CompleteFusionEngine()
+    global _fda_mapper, _metrics_provider
     if _fda_mapper is None:
         _fda_mapper = FDATerminologyMapper()
     if _metrics_provider is None:
         if supabase is None:
             raise HTTPException(status_code=500, detail="Supabase not configured for enhanced AI query.")
         _metrics_provider = create_supabase_metrics_provider(supabase)
-    return _fusion_engine, _fda_mapper, _metrics_provider
+    return _fda_mapper, _metrics_provider
 
 
 class EnhancedQueryRequest(BaseModel):
     query: str
     max_results: int = 50
+    organization: Optional[str] = None  # Org-level signal detection config
+    user_id: Optional[str] = None  # User-level signal detection config
 
 
 class SignalSummary(BaseModel):
@@ -80,8 +80,10 @@ async def enhanced_ai_query(request: EnhancedQueryRequest):
     4) Returns ranked signals with fusion scores
     """
     try:
-        fusion_engine, fda_mapper, metrics_provider = _get_components()
-        results: List[FusionResultSummary] = process_natural_language_query(
+        fda_mapper, metrics_provider = _get_components()
+        fusion_engine = get_fusion_engine(user_id=request.user_id, organization=request.organization)
+        results: List[FusionResultSummary] = await asyncio.to_thread(
+            process_natural_language_query,
             query=request.query,
             fusion_engine=fusion_engine,
             fda_mapper=fda_mapper,
@@ -0,0 +1,434 @@
+"""
+FAERS Quarterly Release Loader
+Streams a full FAERS ASCII quarter (DEMO, DRUG, REAC, OUTC, THER) into
+joined, de-duplicated case dicts with bounded memory
+
+A quarterly release is ~10-20M lines over five $-delimited files linked by
+primaryid. Loading it with readlines() and DataFrame.iterrows() holds every
+line several times over. Instead:
+
+1. DEMO is read in chunks keeping only (primaryid, caseid, fda_dt), and
+   case versions are de-duplicated: per caseid the report with the latest
+   fda_dt (then highest primaryid) wins, as FDA recommends.
+2. Every file is read in typed chunks, rows of superseded versions are
+   dropped, and the rest are spilled to one of N temporary partitions by
+   primaryid (a grace hash join).
+3. Partitions are joined one at a time and emitted as batches of case
+   dicts in the same shape as the E2B parser output.
+
+Peak memory is one read chunk plus one partition, independent of the size
+of the release.
+"""
+
+import csv
+import logging
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FAERS_FILE_TYPES = ("DEMO", "DRUG", "REAC", "OUTC", "THER")
+
+# Columns read from each file (lower-case FAERS headers, 2012Q4 onwards)
+FAERS_COLUMNS = {
+    "DEMO": ["primaryid", "caseid", "caseversion", "event_dt", "init_fda_dt", "fda_dt",
+             "rept_dt", "age", "age_cod", "sex", "wt", "wt_cod", "occr_country", "occp_cod"],
+    "DRUG": ["primaryid", "drug_seq", "role_cod", "drugname", "prod_ai", "route", "dose_vbm"],
+    "REAC": ["primaryid", "pt"],
+    "OUTC": ["primaryid", "outc_cod"],
+    "THER": ["primaryid", "dsg_drug_seq", "start_dt", "end_dt"],
+}
+INTEGER_COLUMNS = {"primaryid", "caseid", "caseversion", "drug_seq", "dsg_drug_seq"}
+FLOAT_COLUMNS = {"age", "wt"}
+
+# FAERS outcome codes, most severe first
+OUTCOME_CODES = {
+    "DE": "fatal",
+    "LT": "life_threatening",
+    "HO": "hospitalization",
+    "DS": "disability",
+    "CA": "congenital_anomaly",
+    "RI": "required_intervention",
+    "OT": "other_serious",
+}
+SUSPECT_ROLES = ("PS", "SS")
+
+_FILE_PATTERN = re.compile(r"(DEMO|DRUG|REAC|OUTC|THER)\d{2}Q[1-4]\.TXT$", re.IGNORECASE)
+
+
+def find_quarter_files(source: Union[str, Path]) -> Dict[str, str]:
+    """
+    Locate the five quarterly files in a directory or in a FAERS zip
+
+    Returns:
+        {file_type: path or zip member name}
+    """
+    source = Path(source)
+    if source.suffix.lower() == ".zip":
+        with zipfile.ZipFile(source) as archive:
+            names = archive.namelist()
+    else:
+        names = [str(p) for p in source.rglob("*") if p.is_file()]
+
+    files = {}
+    for name in names:
+        match = _FILE_PATTERN.search(Path(name).name)
+        if match:
+            files.setdefault(match.group(1).upper(), name)
+    return files
+
+
+def is_faers_quarter(source: Union[str, Path]) -> bool:
+    """True if source holds at least DEMO, DRUG and REAC files"""
+    try:
+        files = find_quarter_files(source)
+    except (zipfile.BadZipFile, OSError):
+        return False
+    return all(t in files for t in ("DEMO", "DRUG", "REAC"))
+
+
+def read_faers_chunks(
+    handle,
+    file_type: str,
+    chunk_size: int = 1_000_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Typed chunks of one FAERS ASCII file
+
+    Integer ids are int64, age/weight float64, everything else str (or
+    None). Columns missing from older releases come back as None.
+    """
+    wanted = FAERS_COLUMNS[file_type]
+    # Numeric columns are parsed by the C reader (as float64 so blanks are
+    # NaN); headers are lower-case since 2012Q4 but upper-case before
+    numeric = {c: "float64" for c in INTEGER_COLUMNS.union(FLOAT_COLUMNS).intersection(wanted)}
+    dtype = defaultdict(lambda: str, {**numeric, **{c.upper(): t for c, t in numeric.items()}})
+    reader = pd.read_csv(
+        handle,
+        sep="$",
+        dtype=dtype,
+        encoding="latin-1",
+        quoting=csv.QUOTE_NONE,
+        keep_default_na=False,
+        na_values=[""],
+        index_col=False,
+        usecols=lambda column: column.strip().lower() in wanted,
+        chunksize=chunk_size,
+        on_bad_lines="skip",
+        engine="c",
+    )
+    for chunk in reader:
+        chunk.columns = [c.strip().lower() for c in chunk.columns]
+        for column in wanted:
+            if column not in chunk.columns:
+                chunk[column] = np.nan if column in numeric else None
+        for column in INTEGER_COLUMNS.intersection(wanted):
+            chunk[column] = chunk[column].fillna(-1).astype(np.int64)
+        yield chunk[wanted]
+
+
+def faers_date(values: pd.Series) -> pd.Series:
+    """YYYYMMDD / YYYYMM / YYYY strings to ISO dates (partial dates -> first day)"""
+    text = values.fillna("").astype(str).str.strip()
+    padded = text.where(text.str.len() != 6, text + "01")
+    padded = padded.where(padded.str.len() != 4, padded + "0101")
+    dates = pd.to_datetime(padded, format="%Y%m%d", errors="coerce")
+    return dates.dt.strftime("%Y-%m-%d").where(dates.notna(), None)
+
+
+class FAERSQuarterlyLoader:
+    """
+    Streaming DEMO/DRUG/REAC/OUTC/THER join for a FAERS quarterly release.
+
+    Usage:
+        loader = FAERSQuarterlyLoader("faers_ascii_2024Q1.zip")
+        for batch in loader.iter_batches(batch_size=5000):
+            ...  # list of case dicts
+
+    Args:
+        source: Directory or zip containing the quarterly ASCII files
+        chunk_size: Lines per read chunk
+        partitions: Number of spill partitions (FAERS_JOIN_PARTITIONS);
+            memory per partition is roughly the release size / partitions
+        suspect_only: Only take primary/secondary suspect drugs (PS, SS)
+            as the case's drugs; concomitant drugs are kept separately
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path],
+        chunk_size: int = 1_000_000,
+        partitions: Optional[int] = None,
+        suspect_only: bool = True,
+    ):
+        self.source = Path(source)
+        self.chunk_size = chunk_size
+        self.partitions = partitions or int(os.getenv("FAERS_JOIN_PARTITIONS", "16"))
+        self.suspect_only = suspect_only
+        self.files = find_quarter_files(self.source)
+        missing = [t for t in ("DEMO", "DRUG", "REAC") if t not in self.files]
+        if missing:
+            raise ValueError(f"FAERS release at {source} is missing {', '.join(missing)} files")
+        self.stats: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def iter_batches(self, batch_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """Yield lists of at most batch_size joined case dicts"""
+        batch: List[Dict[str, Any]] = []
+        for case in self.iter_cases():
+            batch.append(case)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def iter_cases(self) -> Iterator[Dict[str, Any]]:
+        """Yield one joined case dict per latest case version"""
+        kept = self._latest_versions()
+        spill_dir = tempfile.mkdtemp(prefix="faers_join_")
+        try:
+            for file_type in FAERS_FILE_TYPES:
+                if file_type in self.files:
+                    self._spill(file_type, kept, spill_dir)
+            for partition in range(self.partitions):
+                yield from self._join_partition(spill_dir, partition)
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Passes
+    # ------------------------------------------------------------------
+
+    def _latest_versions(self) -> np.ndarray:
+        """Sorted primaryids of the latest version of every case"""
+        parts = []
+        with self._open("DEMO") as handle:
+            for chunk in read_faers_chunks(handle, "DEMO", self.chunk_size):
+                fda_dt = pd.to_numeric(chunk["fda_dt"], errors="coerce").fillna(0).astype(np.int64)
+                parts.append(pd.DataFrame({
+                    "primaryid": chunk["primaryid"].to_numpy(),
+                    "caseid": chunk["caseid"].to_numpy(),
+                    "fda_dt": fda_dt.to_numpy(),
+                }))
+        versions = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            {"primaryid": [], "caseid": [], "fda_dt": []}, dtype=np.int64
+        )
+        latest = versions.sort_values(["caseid", "fda_dt", "primaryid"]).drop_duplicates("caseid", keep="last")
+        self.stats["reports"] = len(versions)
+        self.stats["cases"] = len(latest)
+        logger.info(f"FAERS DEMO: {len(versions):,} reports, {len(latest):,} latest case versions")
+        return np.sort(latest["primaryid"].to_numpy())
+
+    def _spill(self, file_type: str, kept: np.ndarray, spill_dir: str) -> None:
+        rows = 0
+        handles = [
+            open(os.path.join(spill_dir, f"{file_type}.{p}.pkl"), "wb") for p in range(self.partitions)
+        ]
+        try:
+            with self._open(file_type) as handle:
+                for chunk in read_faers_chunks(handle, file_type, self.chunk_size):
+                    primaryid = chunk["primaryid"].to_numpy()
+                    chunk = chunk[_isin_sorted(primaryid, kept)]
+                    partition = chunk["primaryid"].to_numpy() % self.partitions
+                    for p in np.unique(partition):
+                        pickle.dump(chunk[partition == p], handles[p], protocol=pickle.HIGHEST_PROTOCOL)
+                    rows += len(chunk)
+        finally:
+            for h in handles:
+                h.close()
+        self.stats[f"{file_type.lower()}_rows"] = rows
+        logger.info(f"FAERS {file_type}: {rows:,} rows for latest case versions")
+
+    def _join_partition(self, spill_dir: str, partition: int) -> Iterator[Dict[str, Any]]:
+        frames = {
+            t: _load_partition(os.path.join(spill_dir, f"{t}.{partition}.pkl"), t)
+            for t in FAERS_FILE_TYPES
+        }
+        demo = frames["DEMO"].sort_values("primaryid", kind="stable")
+        if demo.empty:
+            return
+
+        for column in ("event_dt", "init_fda_dt", "fda_dt", "rept_dt"):
+            demo[column] = faers_date(demo[column])
+        therapy = frames["THER"]
+        if not therapy.empty:
+            therapy = therapy.assign(start_dt=faers_date(therapy["start_dt"]), end_dt=faers_date(therapy["end_dt"]))
+            therapy = therapy.drop_duplicates(["primaryid", "dsg_drug_seq"])
+            drugs = frames["DRUG"].merge(
+                therapy.rename(columns={"dsg_drug_seq": "drug_seq"}), on=["primaryid", "drug_seq"], how="left"
+            )
+            for column in ("start_dt", "end_dt"):
+                drugs[column] = drugs[column].astype(object).where(drugs[column].notna(), None)
+        else:
+            drugs = frames["DRUG"].assign(start_dt=None, end_dt=None)
+
+        primaryids = demo["primaryid"].to_numpy()
+        drugs = _GroupIndex(drugs.sort_values(["primaryid", "drug_seq"], kind="stable"), primaryids)
+        reactions = _GroupIndex(frames["REAC"].sort_values("primaryid", kind="stable"), primaryids)
+        outcomes = _GroupIndex(frames["OUTC"].sort_values("primaryid", kind="stable"), primaryids)
+
+        columns = {c: demo[c].tolist() for c in demo.columns}
+        for i in range(len(demo)):
+            yield self._build_case(
+                {c: values[i] for c, values in columns.items()},
+                drugs.rows(i),
+                [pt for pt in reactions.column("pt", i) if pt],
+                [str(code).strip().upper() for code in outcomes.column("outc_cod", i) if code],
+            )
+
+    # ------------------------------------------------------------------
+    # Case assembly
+    # ------------------------------------------------------------------
+
+    def _build_case(
+        self,
+        demo: Dict[str, Any],
+        drug_rows: List[Dict[str, Any]],
+        reactions: List[str],
+        outcome_codes: List[str],
+    ) -> Dict[str, Any]:
+        drugs = [
+            {
+                "name": d["drugname"],
+                "active_ingredient": d["prod_ai"],
+                "role": d["role_cod"],
+                "route": d["route"],
+                "dose": d["dose_vbm"],
+                "start_date": d["start_dt"],
+                "end_date": d["end_dt"],
+            }
+            for d in drug_rows if d["drugname"]
+        ]
+        if self.suspect_only:
+            suspects = [d for d in drugs if d["role"] in SUSPECT_ROLES]
+            concomitant = [d["name"] for d in drugs if d["role"] not in SUSPECT_ROLES]
+        else:
+            suspects, concomitant = drugs, []
+        primary = suspects[0] if suspects else (drugs[0] if drugs else None)
+        outcome = next((OUTCOME_CODES[c] for c in OUTCOME_CODES if c in outcome_codes), None)
+
+        case = {
+            "case_number": str(demo["caseid"]),
+            "primaryid": str(demo["primaryid"]),
+            "case_version": demo["caseversion"] if demo["caseversion"] >= 0 else None,
+            "patient_age": _none_if_nan(demo["age"]),
+            "patient_age_unit": demo["age_cod"],
+            "patient_sex": demo["sex"],
+            "patient_weight": _none_if_nan(demo["wt"]),
+            "reporter_country": demo["occr_country"],
+            "reporter_type": demo["occp_cod"],
+            "event_date": demo["event_dt"],
+            "report_date": demo["rept_dt"],
+            "receipt_date": demo["init_fda_dt"] or demo["fda_dt"],
+            "drug_name": primary["name"] if primary else None,
+            "route": primary["route"] if primary else None,
+            "dose": primary["dose"] if primary else None,
+            "start_date": primary["start_date"] if primary else None,
+            "stop_date": primary["end_date"] if primary else None,
+            "drugs": suspects,
+            "concomitant_drugs": concomitant,
+            "reaction": reactions[0] if reactions else None,
+            "reactions": [{"term": pt} for pt in reactions],
+            "serious": bool(outcome_codes),
+            "outcome": outcome,
+            "outcome_codes": outcome_codes,
+            "source": "FAERS",
+            "format": "faers",
+        }
+        return case
+
+    @contextmanager
+    def _open(self, file_type: str):
+        name = self.files[file_type]
+        if self.source.suffix.lower() == ".zip":
+            with zipfile.ZipFile(self.source) as archive, archive.open(name) as handle:
+                yield handle
+        else:
+            with open(name, "rb") as handle:
+                yield handle
+
+
+class _GroupIndex:
+    """
+    Rows of a primaryid-sorted frame, grouped by the i-th DEMO primaryid.
+
+    Group bounds are found with one vectorized searchsorted and values are
+    kept as plain column lists, so no per-row dicts or Series are built
+    for child rows that are only read once.
+    """
+
+    def __init__(self, frame: pd.DataFrame, primaryids: np.ndarray):
+        keys = frame["primaryid"].to_numpy()
+        self.starts = np.searchsorted(keys, primaryids, side="left").tolist()
+        self.ends = np.searchsorted(keys, primaryids, side="right").tolist()
+        self.columns = {c: frame[c].tolist() for c in frame.columns}
+
+    def column(self, name: str, i: int) -> List[Any]:
+        return self.columns[name][self.starts[i]:self.ends[i]]
+
+    def rows(self, i: int) -> List[Dict[str, Any]]:
+        start, end = self.starts[i], self.ends[i]
+        return [{c: values[j] for c, values in self.columns.items()} for j in range(start, end)]
+
+
+def _isin_sorted(values: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    if not len(sorted_keys):
+        return np.zeros(len(values), dtype=bool)
+    index = np.searchsorted(sorted_keys, values)
+    index[index == len(sorted_keys)] = 0
+    return sorted_keys[index] == values
+
+
+def _load_partition(path: str, file_type: str) -> pd.DataFrame:
+    parts = []
+    if os.path.exists(path):
+        with open(path, "rb") as handle:
+            while True:
+                try:
+                    parts.append(pickle.load(handle))
+                except EOFError:
+                    break
+    if not parts:
+        return pd.DataFrame(columns=FAERS_COLUMNS[file_type])
+    frame = pd.concat(parts, ignore_index=True)
+    # Missing text values as None rather than NaN for the case dicts
+    for column in frame.columns:
+        if column not in INTEGER_COLUMNS and column not in FLOAT_COLUMNS:
+            frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+    return frame
+
+
+def _none_if_nan(value: Any) -> Optional[float]:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return float(value)
+
+
+def load_faers_quarter(
+    source: Union[str, Path],
+    batch_size: int = 5000,
+    **kwargs: Any,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream a FAERS quarterly release as batches of joined case dicts
+
+    Usage:
+        for batch in load_faers_quarter("faers_ascii_2024Q1.zip"):
+            insert(batch)
+    """
+    return FAERSQuarterlyLoader(source, **kwargs).iter_batches(batch_size)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from typing import Optional, List
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, List, Tuple, TypeVar, Union
 from pydantic import BaseModel
 from datetime import datetime
 import os
@@ -8,7 +8,12 @@ import uuid
 from pathlib import Path
 import asyncio
 import json
+from collections import Counter, deque
 from supabase import create_client, Client
+from app.core.signal_detection.count_cube import age_in_years, get_count_cube
+from app.api.faers_quarterly import FAERSQuarterlyLoader, is_faers_quarter
+from app.api.multi_format_parsers import E2BParser, FormatDetector
+from app.services.extraction_pool import extraction_executor
 
 router = APIRouter(prefix="/api/v1/files", tags=["files"])
 
@@ -35,6 +40,16 @@ except Exception as e:
 UPLOADS_DIR = Path("uploads")
 UPLOADS_DIR.mkdir(exist_ok=True)
 
+# Rows per pv_cases bulk insert request (clamped to 500-5000)
+PV_CASES_INSERT_CHUNK_SIZE = min(max(int(os.getenv("PV_CASES_INSERT_CHUNK_SIZE", "1000")), 500), 5000)
+
+# Token budget per AI extraction request, tokens repeated from the previous
+# chunk, requests per document and requests in flight per upload
+AI_EXTRACTION_CHUNK_TOKENS = int(os.getenv("AI_EXTRACTION_CHUNK_TOKENS", "2500"))
+AI_EXTRACTION_CHUNK_OVERLAP_TOKENS = int(os.getenv("AI_EXTRACTION_CHUNK_OVERLAP_TOKENS", "250"))
+AI_EXTRACTION_MAX_CHUNKS = int(os.getenv("AI_EXTRACTION_MAX_CHUNKS", "100"))
+AI_EXTRACTION_MAX_CONCURRENCY = int(os.getenv("AI_EXTRACTION_MAX_CONCURRENCY", "3"))
+
 # Supported file formats
 SUPPORTED_FORMATS = {
     'pdf': ['.pdf'],
@@ -90,128 +105,233 @@ def detect_file_type(filename: str) -> str:
 async def extract_content(file_path: str, file_type: str) -> str:
     """
     Extract text content from different file types
+    
+    Parsing runs in the extraction process pool, so large PDFs, OCR and
+    archives do not block other requests.
     """
     try:
-        if file_type == "pdf":
-            import pdfplumber
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-            return text
-        
-        elif file_type == "document":
-            # Try Word document first
-            if file_path.endswith('.docx'):
-                from docx import Document
-                doc = Document(file_path)
-                text = "\n".join([para.text for para in doc.paragraphs])
-                return text
-            else:
-                # Plain text
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
+        if file_type == "archive":
+            return await extract_archive_content(file_path)
+        return await extraction_executor.extract(file_path, file_type)
+    
+    except Exception as e:
+        print(f"Content extraction error: {e}")
+        return f"[Error extracting content: {str(e)}]"
+
+
+async def extract_archive_content(file_path: str) -> str:
+    """
+    Extract and process ZIP files
+    
+    Members are extracted in parallel (bounded per upload by the
+    extraction pool) and reassembled in archive order.
+    """
+    import zipfile
+    import tempfile
+    import shutil
+    
+    temp_dir = None
+    
+    try:
+        # Create temporary directory for extraction
+        temp_dir = tempfile.mkdtemp()
         
-        elif file_type == "spreadsheet":
-            import pandas as pd
-            df = pd.read_excel(file_path)
-            text = df.to_string()
-            return text
+        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+            # Extract all files
+            await asyncio.to_thread(zip_ref.extractall, temp_dir)
+            names = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
         
-        elif file_type == "email":
-            import email
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                msg = email.message_from_file(f)
-                text = f"From: {msg['from']}\nSubject: {msg['subject']}\n\n{msg.get_payload()}"
-                return text
+        # Members in archive order. Entry names are untrusted ("/etc/x",
+        # "../../x"): only files that resolve inside temp_dir are read.
+        root_dir = os.path.realpath(temp_dir)
+        members = []
+        seen = set()
+        for name in names:
+            path = os.path.realpath(os.path.join(root_dir, name))
+            if os.path.commonpath([root_dir, path]) != root_dir or path in seen:
+                continue
+            if os.path.isfile(path):
+                seen.add(path)
+                file = Path(name).name
+                members.append((file, path, detect_file_type(file)))
         
-        elif file_type == "image":
-            # OCR for images
-            try:
-                import pytesseract
-                from PIL import Image
-                img = Image.open(file_path)
-                text = pytesseract.image_to_string(img)
-                return text
-            except Exception as e:
-                print(f"OCR error: {e}")
-                return f"[Image file - OCR not available: {e}]"
+        # Nested archives are skipped to avoid infinite recursion
+        to_extract = [(path, file_type) for _, path, file_type in members if file_type != "archive"]
+        results = iter(await extraction_executor.extract_many(to_extract))
         
-        elif file_type == "archive":
-            # Extract and process ZIP files
-            import zipfile
-            import tempfile
-            import shutil
-            
-            extracted_text = []
-            temp_dir = None
+        extracted_text = []
+        for file, _, file_type in members:
+            if file_type == "archive":
+                extracted_text.append(f"\n--- File: {file} (Nested archive - skipped) ---\n")
+                continue
             
-            try:
-                # Create temporary directory for extraction
-                temp_dir = tempfile.mkdtemp()
-                
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    # Extract all files
-                    zip_ref.extractall(temp_dir)
-                    
-                    # Process each extracted file
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            file_path_in_zip = os.path.join(root, file)
-                            file_ext = Path(file).suffix.lower()
-                            
-                            # Determine file type and extract content
-                            extracted_file_type = detect_file_type(file)
-                            
-                            if extracted_file_type != "unknown" and extracted_file_type != "archive":
-                                # Recursively extract content from this file
-                                try:
-                                    content = await extract_content(file_path_in_zip, extracted_file_type)
-                                    if content and content.strip():
-                                        extracted_text.append(f"\n--- File: {file} ---\n{content}\n")
-                                except Exception as e:
-                                    extracted_text.append(f"\n--- File: {file} (Error: {str(e)}) ---\n")
-                            elif extracted_file_type == "archive":
-                                # Nested archive - skip for now to avoid infinite recursion
-                                extracted_text.append(f"\n--- File: {file} (Nested archive - skipped) ---\n")
-                            else:
-                                # Unknown file type - try reading as text
-                                try:
-                                    with open(file_path_in_zip, 'r', encoding='utf-8', errors='ignore') as f:
-                                        content = f.read()
-                                        if content.strip():
-                                            extracted_text.append(f"\n--- File: {file} ---\n{content}\n")
-                                except:
-                                    pass
-                
-                return "\n".join(extracted_text) if extracted_text else "[ZIP file extracted but no readable content found]"
-            
-            except zipfile.BadZipFile:
-                return f"[Error: Not a valid ZIP file]"
-            except Exception as e:
-                print(f"ZIP extraction error: {e}")
-                return f"[Error extracting ZIP file: {str(e)}]"
-            finally:
-                # Clean up temporary directory
-                if temp_dir and os.path.exists(temp_dir):
-                    try:
-                        shutil.rmtree(temp_dir)
-                    except:
-                        pass
+            content = next(results)
+            if isinstance(content, BaseException):
+                # Unknown file types were only tried as text; skip them quietly
+                if file_type != "unknown":
+                    extracted_text.append(f"\n--- File: {file} (Error: {str(content)}) ---\n")
+            elif content and content.strip():
+                extracted_text.append(f"\n--- File: {file} ---\n{content}\n")
         
-        else:
-            # Fallback: try reading as text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+        return "\n".join(extracted_text) if extracted_text else "[ZIP file extracted but no readable content found]"
     
+    except zipfile.BadZipFile:
+        return f"[Error: Not a valid ZIP file]"
     except Exception as e:
-        print(f"Content extraction error: {e}")
-        return f"[Error extracting content: {str(e)}]"
+        print(f"ZIP extraction error: {e}")
+        return f"[Error extracting ZIP file: {str(e)}]"
+    finally:
+        # Clean up temporary directory
+        if temp_dir and os.path.exists(temp_dir):
+            try:
+                shutil.rmtree(temp_dir)
+            except:
+                pass
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def split_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into pieces of at most max_tokens, preferring line breaks"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return [text]
+    
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", start, end)
+            if newline > start:
+                end = newline + 1
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def overlap_tail(text: str, max_tokens: int) -> str:
+    """End of text of at most max_tokens, starting at a line (or word) boundary"""
+    if max_tokens <= 0:
+        return ""
+    tail = text[-max_tokens * 4:]
+    if len(tail) < len(text):
+        for separator in ("\n", " "):
+            cut = tail.find(separator)
+            if cut != -1:
+                return tail[cut + 1:]
+    return tail
+
+
+async def chunk_pages(
+    pages: AsyncIterable[str],
+    max_tokens: int = AI_EXTRACTION_CHUNK_TOKENS,
+    overlap_tokens: int = AI_EXTRACTION_CHUNK_OVERLAP_TOKENS,
+) -> AsyncIterator[str]:
+    """
+    Group page texts into chunks of at most max_tokens
+    
+    A chunk is yielded as soon as the next page would overflow it, so the
+    first chunks of a long PDF are ready while later pages are still being
+    parsed. Pages longer than the budget are split.
+    
+    Each chunk after the first starts with the last overlap_tokens of the
+    previous one, so a case split across a chunk boundary is seen whole
+    once; extract_entities_streaming drops the case extracted twice.
+    """
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    buffer: List[str] = []
+    size = 0
+    has_content = False  # buffer holds more than the carried-over tail
+    async for page in pages:
+        if not page or not page.strip():
+            continue
+        for piece in split_text(page, max_tokens - overlap_tokens):
+            tokens = estimate_tokens(piece)
+            if has_content and size + tokens > max_tokens:
+                chunk = "\n".join(buffer)
+                yield chunk
+                tail = overlap_tail(chunk, overlap_tokens)
+                buffer, size = ([tail], estimate_tokens(tail)) if tail else ([], 0)
+                has_content = False
+            buffer.append(piece)
+            size += tokens
+            has_content = True
+    if has_content:
+        yield "\n".join(buffer)
+
+
+async def take_chunks(chunks: AsyncIterable[str], limit: int) -> AsyncIterator[str]:
+    """
+    The first limit chunks of a stream (all of them if limit <= 0)
+    
+    Stops without reading past the limit, so the caller can check the
+    stream for chunks that were left out.
+    """
+    count = 0
+    async for chunk in chunks:
+        yield chunk
+        count += 1
+        if limit > 0 and count >= limit:
+            return
+
+
+async def iter_texts(texts: Iterable[str]) -> AsyncIterator[str]:
+    """Already extracted texts as an async page stream for chunk_pages"""
+    for text in texts:
+        yield text
+
+
+T = TypeVar("T")
+
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Drive a blocking iterator (a parser or loader generator) from a worker
+    thread, one item per step, so parsing does not block the event loop
+    """
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Lists of up to size consecutive items"""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def prepend_chunk(first: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Put a chunk taken off the front of a stream back"""
+    yield first
+    async for chunk in chunks:
+        yield chunk
 
 
 async def extract_entities_with_ai(content: str) -> List[dict]:
     """
     Use Claude to extract pharmacovigilance entities from text
+    
+    content should fit the model input; long documents go through
+    extract_entities_streaming, which splits them with chunk_pages.
     """
     if not anthropic_client:
         print("Warning: Anthropic client not available, returning empty entities")
@@ -221,7 +341,7 @@ async def extract_entities_with_ai(content: str) -> List[dict]:
 You are a pharmacovigilance expert. Extract adverse event case information from the following text.
 
 Text:
-{content[:10000]}  # Limit to first 10K chars
+{content}
 
 Extract the following information for each adverse event case found:
 - Patient demographics (age, sex)
@@ -231,9 +351,11 @@ Extract the following information for each adverse event case found:
 
 Return ONLY a JSON array of cases. Each case should have this structure:
 {{
+  "case_id": "case/report reference number in the text, or null",
   "patient": {{
     "age": "number or null",
-    "sex": "M/F/Unknown"
+    "sex": "M/F/Unknown",
+    "initials": "patient initials or null"
   }},
   "drug": {{
     "name": "drug name",
@@ -253,7 +375,8 @@ If no adverse events found, return empty array [].
 """
     
     try:
-        message = anthropic_client.messages.create(
+        message = await asyncio.to_thread(
+            anthropic_client.messages.create,
             model="claude-sonnet-4-20250514",
             max_tokens=4000,
             messages=[
@@ -345,6 +468,86 @@ If no adverse events found, return empty array [].
         return []
 
 
+def entity_case_key(entity: dict) -> tuple:
+    """
+    Identifying fields of an extracted case, normalized for comparison:
+    (case_id, initials, event_date, drug, reaction, age, sex). The first
+    three identify a patient; the rest are shared by many cases of a
+    line listing.
+    """
+    patient = entity.get("patient") or {}
+    values = (
+        entity.get("case_id"),
+        patient.get("initials"),
+        entity.get("event_date"),
+        (entity.get("drug") or {}).get("name"),
+        (entity.get("reaction") or {}).get("description"),
+        patient.get("age"),
+        patient.get("sex"),
+    )
+    return tuple("" if value is None else str(value).strip().lower() for value in values)
+
+
+async def extract_entities_streaming(
+    chunks: AsyncIterable[str],
+    max_concurrency: int = AI_EXTRACTION_MAX_CONCURRENCY,
+    overlap_tokens: int = AI_EXTRACTION_CHUNK_OVERLAP_TOKENS,
+) -> AsyncIterator[List[dict]]:
+    """
+    Run extract_entities_with_ai on each chunk as soon as it is ready
+    
+    Up to max_concurrency chunks are with the model at once while the next
+    pages are parsed. Entity lists are yielded in chunk order.
+    
+    Chunks overlap (see chunk_pages), so a case of the overlap can be
+    extracted from both chunks. A case is only treated as such a repeat if
+    its entity_case_key matches a case of the previous chunk (each previous
+    case matches once) and its drug is named in the overlap text. Repeats
+    with a case id, initials or event date are dropped; others are kept
+    with "possible_duplicate" set, since different patients of a line
+    listing can share every other field.
+    """
+    pending = deque()
+    previous_chunk: Optional[str] = None
+    previous_keys: Counter = Counter()
+    
+    async def next_batch() -> List[dict]:
+        nonlocal previous_chunk, previous_keys
+        chunk, future = pending.popleft()
+        entities = await future
+        overlap = ""
+        if previous_chunk is not None:
+            tail = overlap_tail(previous_chunk, overlap_tokens)
+            if chunk.startswith(tail):
+                overlap = tail.lower()
+        
+        unmatched = Counter(previous_keys)
+        batch = []
+        for entity in entities:
+            key = entity_case_key(entity)
+            drug = key[3]
+            if overlap and drug and drug in overlap and unmatched[key] > 0:
+                unmatched[key] -= 1
+                if any(key[:3]):
+                    continue
+                entity = {**entity, "possible_duplicate": True}
+            batch.append(entity)
+        previous_chunk = chunk
+        previous_keys = Counter(entity_case_key(entity) for entity in entities)
+        return batch
+    
+    try:
+        async for chunk in chunks:
+            pending.append((chunk, asyncio.ensure_future(extract_entities_with_ai(chunk))))
+            while pending and (pending[0][1].done() or len(pending) >= max_concurrency):
+                yield await next_batch()
+        while pending:
+            yield await next_batch()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
 def validate_ich_e2b_compliance(case_data: dict) -> tuple[bool, list[str], str]:
     """
     Validate if case meets ICH E2B(R3) minimum criteria
@@ -487,16 +690,100 @@ def generate_validation_message(cases_created: int, cases_incomplete: int,
     )
 
 
-async def create_cases_from_entities(entities: List[dict], file_id: str) -> dict:
+def insert_pv_cases(records: List[dict], chunk_size: Optional[int] = None) -> Tuple[List[dict], int]:
+    """
+    Bulk insert pv_cases rows in chunks
+    
+    Each chunk is one INSERT ... RETURNING request. If a chunk request
+    fails, its rows are retried one at a time so a single bad row does not
+    drop the others. If a chunk succeeds but returns fewer rows than were
+    sent, the chunk was written and is not retried (that would duplicate
+    the rows that did go in); the rows not accounted for are reported as
+    unconfirmed.
+    
+    Returns: (inserted rows as returned by the database, number of
+    unconfirmed records)
+    """
+    chunk_size = chunk_size or PV_CASES_INSERT_CHUNK_SIZE
+    inserted: List[dict] = []
+    unconfirmed = 0
+    
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        try:
+            result = supabase.table("pv_cases").insert(chunk).execute()
+        except Exception as e:
+            print(f"Bulk insert of {len(chunk)} cases failed ({e}); retrying row by row")
+        else:
+            rows = result.data or []
+            inserted.extend(rows)
+            if len(rows) < len(chunk):
+                print(f"Bulk insert of {len(chunk)} cases returned {len(rows)} rows; "
+                      f"{len(chunk) - len(rows)} unconfirmed")
+                unconfirmed += len(chunk) - len(rows)
+            continue
+        
+        for record in chunk:
+            try:
+                result = supabase.table("pv_cases").insert(record).execute()
+            except Exception as e:
+                print(f"Error creating case: {e}")
+                continue
+            if result.data:
+                inserted.append(result.data[0])
+            else:
+                unconfirmed += 1
+    
+    return inserted, unconfirmed
+
+
+async def create_cases_from_entities(
+    entities: Union[Iterable[dict], AsyncIterable[List[dict]]],
+    file_id: str,
+    source: str = "AI_EXTRACTED",
+) -> dict:
     """
     Create pv_cases records from extracted entities with ICH E2B validation
-    Returns: dict with counts and validation summary
+    
+    Entities are consumed lazily (a generator works) and written with
+    insert_pv_cases one chunk at a time, so a large ZIP or E2B upload costs
+    one request per chunk instead of one per case and never holds more
+    than a chunk of records. An async iterable of entity lists (from
+    extract_entities_streaming, or a parser driven by iterate_in_thread)
+    is written list by list as it arrives. Inserts run in a worker thread.
+    
+    Returns: dict with counts, validation summary and average confidence
     """
     case_ids = []
     incomplete_cases = 0
+    unconfirmed_cases = 0
+    possible_duplicates = 0
+    confidence_total = 0.0
+    confidence_count = 0
     missing_fields_summary = {}
+    count_cube = get_count_cube()
+    receipt_default = datetime.now().date().isoformat()
+    records = []
     
-    for entity in entities:
+    async def flush():
+        nonlocal incomplete_cases, unconfirmed_cases, confidence_total, confidence_count
+        # Count from the returned rows: they carry the validation and
+        # confidence columns, and a short bulk return does not say which
+        # records are missing
+        rows, unconfirmed = await asyncio.to_thread(insert_pv_cases, list(records))
+        unconfirmed_cases += unconfirmed
+        for row in rows:
+            case_ids.append(row["id"])
+            count_cube.add_case(row)
+            if not row.get("validation_passed"):
+                incomplete_cases += 1
+            if row.get("ai_confidence"):
+                confidence_total += float(row["ai_confidence"])
+                confidence_count += 1
+        records.clear()
+    
+    def add(entity: dict):
+        nonlocal possible_duplicates
         try:
             # Prepare case data
             case_data = {
@@ -507,10 +794,10 @@ async def create_cases_from_entities(entities: List[dict], file_id: str) -> dict
                 "age": entity.get("patient", {}).get("age"),
                 "sex": entity.get("patient", {}).get("sex"),
                 "serious": entity.get("serious", False),
-                "source": "AI_EXTRACTED",
+                "source": source,
                 "source_file_id": file_id,
                 "narrative": entity.get("narrative", ""),
-                "ai_extracted": True,
+                "ai_extracted": source == "AI_EXTRACTED",
                 "ai_confidence": entity.get("confidence", 0.5),
                 # ICH E2B fields (if available from entity)
                 "reporter_type": entity.get("reporter", {}).get("type") or "Other",
@@ -518,7 +805,7 @@ async def create_cases_from_entities(entities: List[dict], file_id: str) -> dict
                 "reporter_qualification": entity.get("reporter", {}).get("qualification"),
                 "drug_start_date": entity.get("drug", {}).get("start_date"),
                 "drug_end_date": entity.get("drug", {}).get("end_date"),
-                "receipt_date": entity.get("receipt_date") or datetime.now().date().isoformat(),
+                "receipt_date": entity.get("receipt_date") or receipt_default,
                 "patient_initials": entity.get("patient", {}).get("initials"),
                 "event_date": entity.get("event_date"),
                 "onset_date": entity.get("onset_date"),
@@ -536,28 +823,167 @@ async def create_cases_from_entities(entities: List[dict], file_id: str) -> dict
                 "completeness_status": completeness_status,
                 "missing_fields": json.dumps(missing_fields),
                 "validation_passed": is_valid,
-                "requires_manual_review": not is_valid,
+                "requires_manual_review": not is_valid or bool(entity.get("possible_duplicate")),
             })
             
-            # Insert case
-            result = supabase.table("pv_cases").insert(case_data).execute()
-            
-            if result.data:
-                case_ids.append(result.data[0]["id"])
-                if not is_valid:
-                    incomplete_cases += 1
+            records.append(case_data)
+            if entity.get("possible_duplicate"):
+                possible_duplicates += 1
         
         except Exception as e:
-            print(f"Error creating case: {e}")
-            continue
+            print(f"Error preparing case: {e}")
+    
+    if hasattr(entities, "__aiter__"):
+        # Write each extracted chunk's cases as soon as it arrives
+        async for batch in entities:
+            for entity in batch:
+                add(entity)
+                if len(records) >= PV_CASES_INSERT_CHUNK_SIZE:
+                    await flush()
+            await flush()
+    else:
+        for entity in entities:
+            add(entity)
+            if len(records) >= PV_CASES_INSERT_CHUNK_SIZE:
+                await flush()
+    
+    await flush()
+
+    # Persist the new drug-event counts for the signal endpoints (a delta
+    # file, written off the event loop). The upload is recorded even without
+    # cases so the cube's coverage keeps up with the ingest watermark.
+    count_cube.add_upload(file_id)
+    try:
+        await asyncio.to_thread(count_cube.save)
+    except OSError as e:
+        print(f"Warning: Could not save count cube: {e}")
     
     # Return detailed results
     return {
         "case_ids": case_ids,
         "valid_cases": len(case_ids) - incomplete_cases,
         "incomplete_cases": incomplete_cases,
-        "missing_fields_summary": missing_fields_summary
+        "unconfirmed_cases": unconfirmed_cases,
+        "possible_duplicates": possible_duplicates,
+        "missing_fields_summary": missing_fields_summary,
+        "avg_confidence": confidence_total / confidence_count if confidence_count else None,
+    }
+
+
+# E2B R2 patient sex (1/2) and primary source qualification codes
+E2B_SEX_CODES = {"1": "M", "2": "F"}
+E2B_QUALIFICATION_CODES = {
+    "1": "Physician",
+    "2": "Pharmacist",
+    "3": "Other health professional",
+    "4": "Lawyer",
+    "5": "Consumer",
+}
+
+
+def e2b_date(value) -> Optional[str]:
+    """
+    E2B date (CCYYMMDD, optionally followed by a time) as an ISO date;
+    partial (CCYYMM, CCYY) or invalid dates give None
+    """
+    text = str(value or "").strip()
+    if len(text) < 8 or not text[:8].isdigit():
+        return None
+    try:
+        return datetime.strptime(text[:8], "%Y%m%d").date().isoformat()
+    except ValueError:
+        return None
+
+
+def e2b_case_to_entity(case: dict) -> dict:
+    """
+    Convert a parsed E2B case to the entity shape create_cases_from_entities
+    takes, so structured E2B uploads skip AI extraction
+
+    Ages are converted to years using the E2B age unit (800-805) and dates
+    to ISO dates.
+    """
+    qualification = case.get("reporter_type")
+    return {
+        "patient": {
+            "age": age_in_years(case.get("patient_age"), case.get("patient_age_unit")),
+            "sex": E2B_SEX_CODES.get(case.get("patient_sex"), case.get("patient_sex")),
+        },
+        "drug": {
+            "name": case.get("drug_name") or "Unknown",
+            "start_date": e2b_date(case.get("start_date")),
+            "end_date": e2b_date(case.get("stop_date")),
+        },
+        "reaction": {"description": case.get("reaction") or "Unknown"},
+        "serious": bool(case.get("serious")) or case.get("outcome") == "fatal",
+        "narrative": case.get("narrative") or "",
+        "confidence": 1.0,  # Structured source, not extracted
+        "reporter": {
+            "type": E2B_QUALIFICATION_CODES.get(qualification, qualification),
+            "country": case.get("reporter_country"),
+            "qualification": qualification,
+        },
+        "receipt_date": e2b_date(case.get("report_date")),
+        "event_date": e2b_date(case.get("event_date")),
+    }
+
+
+# FAERS reporter occupation codes
+FAERS_OCCUPATION_CODES = {
+    "MD": "Physician",
+    "PH": "Pharmacist",
+    "OT": "Other health professional",
+    "LW": "Lawyer",
+    "CN": "Consumer",
+}
+
+
+def faers_case_to_entities(case: dict) -> List[dict]:
+    """
+    Convert a joined FAERS quarterly case (FAERSQuarterlyLoader) to the
+    entity shape create_cases_from_entities takes
+
+    pv_cases holds one drug and one reaction per row, so a report gives one
+    entity per (suspect drug, preferred term): a report of two suspect
+    drugs with nausea and vomiting becomes four rows.
+    """
+    occupation = case.get("reporter_type")
+    sex = case.get("patient_sex")
+    drugs = case.get("drugs") or [{
+        "name": case.get("drug_name"),
+        "start_date": case.get("start_date"),
+        "end_date": case.get("stop_date"),
+    }]
+    reactions = [r.get("term") for r in case.get("reactions") or [] if r.get("term")]
+    common = {
+        "patient": {
+            "age": age_in_years(case.get("patient_age"), case.get("patient_age_unit")),
+            "sex": sex if sex in ("M", "F") else None,
+        },
+        "serious": bool(case.get("serious")),
+        "narrative": "",
+        "confidence": 1.0,  # Structured source, not extracted
+        "reporter": {
+            "type": FAERS_OCCUPATION_CODES.get(occupation, occupation),
+            "country": case.get("reporter_country"),
+            "qualification": occupation,
+        },
+        "receipt_date": case.get("receipt_date"),
+        "event_date": case.get("event_date"),
     }
+    return [
+        {
+            **common,
+            "drug": {
+                "name": drug.get("name") or "Unknown",
+                "start_date": drug.get("start_date"),
+                "end_date": drug.get("end_date"),
+            },
+            "reaction": {"description": reaction or "Unknown"},
+        }
+        for drug in drugs
+        for reaction in reactions or [case.get("reaction")]
+    ]
 
 
 async def auto_code_cases(case_ids: List[str]):
@@ -584,27 +1010,71 @@ async def process_file_ai(file_id: str, file_path: Path, filename: str):
         # Step 1: Extract content based on file type
         file_ext = Path(filename).suffix.lower()
         file_type = detect_file_type(filename)
+        xml_format = FormatDetector.detect_format(str(file_path)) if file_type == "xml" else None
+        truncated = False
         
-        content = await extract_content(str(file_path), file_type)
-        
-        if not content or len(content.strip()) == 0:
-            raise Exception("No content extracted from file")
-        
-        supabase.table("file_upload_history").update({
-            "progress": 30,
-            "status_message": "AI extracting entities..."
-        }).eq("id", file_id).execute()
-        
-        # Step 2: AI entity extraction
-        entities = await extract_entities_with_ai(content)
-        
-        supabase.table("file_upload_history").update({
-            "progress": 60,
-            "status_message": "Creating cases..."
-        }).eq("id", file_id).execute()
+        if file_type == "archive" and await asyncio.to_thread(is_faers_quarter, file_path):
+            # FAERS quarterly release: join the ASCII files in a worker
+            # thread and write each batch of cases as it is produced
+            supabase.table("file_upload_history").update({
+                "progress": 30,
+                "status_message": "Creating cases from FAERS quarterly release..."
+            }).eq("id", file_id).execute()
+            
+            loader = FAERSQuarterlyLoader(file_path)
+            batches = (
+                [entity for case in batch for entity in faers_case_to_entities(case)]
+                for batch in loader.iter_batches(PV_CASES_INSERT_CHUNK_SIZE)
+            )
+            result = await create_cases_from_entities(
+                iterate_in_thread(batches), file_id, source="FAERS"
+            )
+        elif xml_format == "e2b_r2":
+            # Structured E2B R2: stream reports straight into the bulk insert
+            # (R3 parsing is still a placeholder, so R3 goes through AI)
+            supabase.table("file_upload_history").update({
+                "progress": 60,
+                "status_message": "Creating cases from E2B reports..."
+            }).eq("id", file_id).execute()
+            
+            # Parsed in a worker thread, a batch of reports at a time
+            batches = (
+                [e2b_case_to_entity(case) for case in batch]
+                for batch in batched(E2BParser().iter_r2(str(file_path)), PV_CASES_INSERT_CHUNK_SIZE)
+            )
+            result = await create_cases_from_entities(
+                iterate_in_thread(batches), file_id, source="E2B"
+            )
+        else:
+            if file_type == "pdf":
+                # Page-streamed: the first chunks reach the model while
+                # later pages are still being parsed
+                pages = extraction_executor.iter_pdf_pages(str(file_path))
+            else:
+                content = await extract_content(str(file_path), file_type)
+                pages = iter_texts([content])
+            
+            chunks = chunk_pages(pages)
+            first_chunk = await anext(chunks, None)
+            if first_chunk is None:
+                raise Exception("No content extracted from file")
+            
+            supabase.table("file_upload_history").update({
+                "progress": 30,
+                "status_message": "AI extracting entities and creating cases..."
+            }).eq("id", file_id).execute()
+            
+            # Step 2-3: AI entity extraction per chunk (at most
+            # AI_EXTRACTION_MAX_CHUNKS), with each chunk's cases created as
+            # soon as its entities come back
+            entity_batches = extract_entities_streaming(
+                take_chunks(prepend_chunk(first_chunk, chunks), AI_EXTRACTION_MAX_CHUNKS)
+            )
+            result = await create_cases_from_entities(entity_batches, file_id)
+            truncated = await anext(chunks, None) is not None
+            await chunks.aclose()
+            await pages.aclose()
         
-        # Step 3: Create cases - NOW RETURNS DETAILED RESULTS
-        result = await create_cases_from_entities(entities, file_id)
         case_ids = result["case_ids"]
         valid_cases = result["valid_cases"]
         incomplete_cases = result["incomplete_cases"]
@@ -618,17 +1088,8 @@ async def process_file_ai(file_id: str, file_path: Path, filename: str):
         # Step 4: Auto-code cases (placeholder)
         await auto_code_cases(case_ids)
         
-        # Calculate confidence score (average of all case confidences)
-        avg_confidence = None
-        if case_ids:
-            confidences = []
-            for case_id in case_ids:
-                case_result = supabase.table("pv_cases").select("ai_confidence").eq("id", case_id).execute()
-                if case_result.data and case_result.data[0].get("ai_confidence"):
-                    confidences.append(float(case_result.data[0]["ai_confidence"]))
-            
-            if confidences:
-                avg_confidence = sum(confidences) / len(confidences)
+        # Confidence score (average of the inserted cases' confidences)
+        avg_confidence = result["avg_confidence"]
 
         # NEW: Generate smart validation message
         smart_message = generate_validation_message(
@@ -636,7 +1097,22 @@ async def process_file_ai(file_id: str, file_path: Path, filename: str):
             incomplete_cases, 
             missing_fields_summary
         )
-        
+        if truncated:
+            smart_message += (
+                f" Only the first {AI_EXTRACTION_MAX_CHUNKS} text chunks were analysed; "
+                "the rest of the document was not processed."
+            )
+        if result["possible_duplicates"]:
+            smart_message += (
+                f" {result['possible_duplicates']} case(s) may repeat a case from the "
+                "preceding text and were marked for manual review."
+            )
+        if result["unconfirmed_cases"]:
+            smart_message += (
+                f" {result['unconfirmed_cases']} more case(s) were sent but could not be "
+                "confirmed as saved; check the case list before re-uploading."
+            )
+
         # Mark as completed with detailed stats
         supabase.table("file_upload_history").update({
             "upload_status": "completed",
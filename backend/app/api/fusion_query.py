@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
 
 from app.core.analysis.models import SignalQueryFilters
 from app.core.nlp.enhanced_parser import run_fusion_for_filters
@@ -10,7 +12,11 @@ router = APIRouter(prefix="/fusion", tags=["Fusion Engine"])
 
 
 @router.post("/fusion-from-filters")
-async def fusion_from_filters(filters: SignalQueryFilters) -> List[dict]:
+async def fusion_from_filters(
+    filters: SignalQueryFilters,
+    organization: Optional[str] = Query(None, description="Organization for config overrides"),
+    user_id: Optional[str] = Query(None, description="User for config overrides"),
+) -> List[dict]:
     """
     Run fusion engine for given SignalQueryFilters.
     
@@ -19,12 +25,14 @@ async def fusion_from_filters(filters: SignalQueryFilters) -> List[dict]:
     
     Args:
         filters: SignalQueryFilters from conversational query
+        organization: Organization whose signal detection config to use
+        user_id: User whose signal detection config to use
         
     Returns:
         List of FusionResultSummary as dictionaries
     """
     try:
-        results = run_fusion_for_filters(filters)
+        results = await asyncio.to_thread(run_fusion_for_filters, filters, organization, user_id)
         return [r.to_dict() for r in results]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fusion query failed: {str(e)}")
@@ -5,16 +5,26 @@ Supports: E2B XML (R2/R3), FAERS ASCII, Excel, CSV, PDF
 Intelligent format detection and parsing with error handling
 """
 
+import csv
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import pandas as pd
 import re
 from datetime import datetime
 import logging
+import os
 from pathlib import Path
 
+from app.api.faers_quarterly import FAERSQuarterlyLoader, is_faers_quarter
+
 logger = logging.getLogger(__name__)
 
+# Cases UniversalParser.parse() returns for a FAERS quarterly release; a
+# full quarter is ingested batch by batch with FAERSParser.parse_quarter()
+MAX_QUARTER_PARSE_CASES = int(os.getenv("FAERS_QUARTER_PARSE_MAX_CASES", "10000"))
+
+E2B_R3_NAMESPACE = 'urn:hl7-org:v3'
+
 
 class FormatDetector:
     """
@@ -26,11 +36,16 @@ class FormatDetector:
         """
         Detect file format from extension and content
         
-        Returns: 'e2b_r2', 'e2b_r3', 'faers', 'excel', 'csv', 'pdf', 'unknown'
+        Returns: 'e2b_r2', 'e2b_r3', 'faers', 'faers_quarter', 'excel', 'csv',
+        'pdf', 'unknown'
         """
         path = Path(file_path)
         extension = path.suffix.lower()
         
+        # Directory or zip holding a FAERS quarterly release
+        if (path.is_dir() or extension == '.zip') and is_faers_quarter(path):
+            return 'faers_quarter'
+        
         # XML - check if E2B
         if extension == '.xml':
             return FormatDetector._detect_e2b_version(file_path)
@@ -55,21 +70,20 @@ class FormatDetector:
     
     @staticmethod
     def _detect_e2b_version(file_path: str) -> str:
-        """Detect E2B R2 vs R3"""
+        """Detect E2B R2 vs R3 from the root element (without parsing the whole file)"""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+            _, root = next(ET.iterparse(file_path, events=('start',)))
             
             # Check namespace
-            namespace = root.tag.split('}')[0].strip('{')
+            namespace = root.tag.split('}')[0].strip('{') if root.tag.startswith('{') else ''
             
             if 'R2' in namespace or 'r2' in namespace:
                 return 'e2b_r2'
-            elif 'R3' in namespace or 'r3' in namespace:
+            elif 'R3' in namespace or 'r3' in namespace or namespace == E2B_R3_NAMESPACE:
                 return 'e2b_r3'
             
             # Fallback - check structure
-            if root.find('.//ichicsr') is not None:
+            if _local_name(root.tag) == 'ichicsr':
                 return 'e2b_r2'
             
             return 'e2b_r3'
@@ -79,6 +93,11 @@ class FormatDetector:
             return 'e2b_r2'  # Default
 
 
+def _local_name(tag: str) -> str:
+    """Tag without its {namespace}"""
+    return tag.rsplit('}', 1)[-1]
+
+
 class E2BParser:
     """
     Parser for E2B XML format (R2 and R3)
@@ -92,16 +111,7 @@ class E2BParser:
         Returns: List of case dictionaries
         """
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            cases = []
-            
-            # Find all safety reports
-            for report in root.findall('.//safetyreport'):
-                case = self._parse_r2_report(report)
-                cases.append(case)
-            
+            cases = list(self.iter_r2(file_path))
             logger.info(f"Parsed {len(cases)} cases from E2B R2 file")
             return cases
             
@@ -109,6 +119,49 @@ class E2BParser:
             logger.error(f"Error parsing E2B R2: {e}", exc_info=True)
             raise
     
+    def iter_r2(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the safety reports of an E2B R2 file one case at a time
+        
+        Memory use is one safetyreport element, however large the file.
+        """
+        for report in self._iter_elements(file_path, 'safetyreport'):
+            yield self._parse_r2_report(report)
+    
+    def iter_cases(self, file_path: str, version: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the cases of an E2B R2 or R3 file
+        
+        Args:
+            version: 'e2b_r2' or 'e2b_r3'; detected from the root element if omitted
+        """
+        version = version or FormatDetector._detect_e2b_version(file_path)
+        if version == 'e2b_r3':
+            return self.iter_r3(file_path)
+        return self.iter_r2(file_path)
+    
+    def _iter_elements(self, file_path: str, name: str) -> Iterator[ET.Element]:
+        """
+        Yield each complete <name> element (any namespace) of an XML file
+        
+        Uses iterparse and detaches every yielded element from its parent
+        afterwards, so processed reports do not accumulate in the tree.
+        """
+        parents: List[ET.Element] = []
+        for event, element in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            
+            parents.pop()
+            if _local_name(element.tag) != name:
+                continue
+            
+            yield element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+    
     def _parse_r2_report(self, report: ET.Element) -> Dict[str, Any]:
         """Parse single E2B R2 report"""
         case = {}
@@ -152,14 +205,19 @@ class E2BParser:
         for reaction in report.findall('.//reaction'):
             reaction_info = {
                 'term': self._get_text(reaction, './/reactionmeddrapt'),
-                'serious': self._get_text(reaction, './/reactionoutcome') == '1'
+                'outcome': self._get_text(reaction, './/reactionoutcome')
             }
             reactions.append(reaction_info)
         
         # Primary reaction
         if reactions:
             case['reaction'] = reactions[0]['term']
-            case['serious'] = reactions[0]['serious']
+            case['reaction_outcome'] = reactions[0]['outcome']
+        
+        # Seriousness is a report-level field (1 = yes, 2 = no); reaction
+        # outcome 1 means recovered/resolved, not serious
+        serious = self._get_text(report, 'serious')
+        case['serious'] = {'1': True, '2': False}.get((serious or '').strip())
         
         # Outcomes
         case['outcome'] = self._get_text(report, './/patientdeath')
@@ -186,16 +244,7 @@ class E2BParser:
         Returns: List of case dictionaries
         """
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            cases = []
-            
-            # Find all ICSRs (Individual Case Safety Reports)
-            for icsr in root.findall('.//{urn:hl7-org:v3}ICSR'):
-                case = self._parse_r3_report(icsr)
-                cases.append(case)
-            
+            cases = list(self.iter_r3(file_path))
             logger.info(f"Parsed {len(cases)} cases from E2B R3 file")
             return cases
             
@@ -203,6 +252,11 @@ class E2BParser:
             logger.error(f"Error parsing E2B R3: {e}", exc_info=True)
             raise
     
+    def iter_r3(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Stream the ICSRs (Individual Case Safety Reports) of an E2B R3 file"""
+        for icsr in self._iter_elements(file_path, 'ICSR'):
+            yield self._parse_r3_report(icsr)
+    
     def _parse_r3_report(self, icsr: ET.Element) -> Dict[str, Any]:
         """Parse single E2B R3 report (simplified)"""
         # R3 has different structure - simplified implementation
@@ -238,9 +292,35 @@ class FAERSParser:
     FDA Adverse Event Reporting System
     """
     
+    # Output field -> FAERS column, per file type
+    FIELD_MAPS = {
+        'DEMO': {
+            'case_number': 'caseid',
+            'patient_age': 'age',
+            'patient_age_unit': 'age_cod',
+            'patient_sex': 'sex',
+            'reporter_country': 'occr_country',
+            'event_date': 'event_dt',
+            'report_date': 'rept_dt',
+        },
+        'DRUG': {
+            'case_number': 'caseid',
+            'drug_name': 'drugname',
+            'route': 'route',
+            'indication': 'indi_pt',
+        },
+        'REAC': {
+            'case_number': 'caseid',
+            'reaction': 'pt',
+        },
+    }
+    
+    def __init__(self, chunk_size: int = 500_000):
+        self.chunk_size = chunk_size
+    
     def parse(self, file_path: str) -> List[Dict[str, Any]]:
         """
-        Parse FAERS ASCII file
+        Parse a single FAERS ASCII file
         
         FAERS format has multiple files:
         - DEMO (demographics)
@@ -249,30 +329,53 @@ class FAERSParser:
         - OUTC (outcomes)
         - THER (therapy dates)
         
+        This returns the rows of one file. For a whole quarterly release
+        (joined cases, de-duplicated versions) use FAERSQuarterlyLoader.
+        
         Returns: List of case dictionaries
         """
         try:
-            # Read file
             with open(file_path, 'r', encoding='latin-1') as f:
-                lines = f.readlines()
+                header = f.readline()
             
             # Determine file type from filename or content
-            file_type = self._detect_faers_type(file_path, lines)
-            
-            if file_type == 'DEMO':
-                return self._parse_demo(lines)
-            elif file_type == 'DRUG':
-                return self._parse_drug(lines)
-            elif file_type == 'REAC':
-                return self._parse_reac(lines)
-            else:
+            file_type = self._detect_faers_type(file_path, [header])
+            field_map = self.FIELD_MAPS.get(file_type)
+            if field_map is None:
                 logger.warning(f"Unknown FAERS file type: {file_type}")
                 return []
+            
+            # Chunked C-parser read instead of readlines() + iterrows()
+            records = []
+            reader = pd.read_csv(
+                file_path, sep='$', dtype=str, encoding='latin-1',
+                quoting=csv.QUOTE_NONE, keep_default_na=False, index_col=False,
+                chunksize=self.chunk_size, on_bad_lines='skip',
+            )
+            for chunk in reader:
+                chunk.columns = [c.strip().lower() for c in chunk.columns]
+                rows = pd.DataFrame({
+                    field: chunk[column] if column in chunk.columns else ''
+                    for field, column in field_map.items()
+                }, index=chunk.index)
+                if 'patient_age' in rows:
+                    age = pd.to_numeric(rows['patient_age'], errors='coerce')
+                    rows['patient_age'] = age.astype(object).where(age.notna(), None)
+                records.extend(rows.to_dict('records'))
+            
+            return records
                 
         except Exception as e:
             logger.error(f"Error parsing FAERS: {e}", exc_info=True)
             raise
     
+    def parse_quarter(self, source: str, batch_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a quarterly release (directory or zip) as batches of joined
+        DEMO/DRUG/REAC/OUTC/THER cases
+        """
+        return FAERSQuarterlyLoader(source).iter_batches(batch_size)
+    
     def _detect_faers_type(self, file_path: str, lines: List[str]) -> str:
         """Detect FAERS file type"""
         # Check filename
@@ -301,69 +404,6 @@ class FAERSParser:
                 return 'REAC'
         
         return 'UNKNOWN'
-    
-    def _parse_demo(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Parse DEMO (demographics) file"""
-        cases = []
-        
-        # Parse as CSV
-        df = pd.DataFrame([line.strip().split('$') for line in lines[1:]], 
-                         columns=lines[0].strip().split('$'))
-        
-        for _, row in df.iterrows():
-            case = {
-                'case_number': row.get('caseid', ''),
-                'patient_age': self._safe_float(row.get('age')),
-                'patient_age_unit': row.get('age_cod', ''),
-                'patient_sex': row.get('sex', ''),
-                'reporter_country': row.get('occr_country', ''),
-                'event_date': row.get('event_dt', ''),
-                'report_date': row.get('rept_dt', '')
-            }
-            cases.append(case)
-        
-        return cases
-    
-    def _parse_drug(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Parse DRUG file"""
-        drugs = []
-        
-        df = pd.DataFrame([line.strip().split('$') for line in lines[1:]], 
-                         columns=lines[0].strip().split('$'))
-        
-        for _, row in df.iterrows():
-            drug = {
-                'case_number': row.get('caseid', ''),
-                'drug_name': row.get('drugname', ''),
-                'route': row.get('route', ''),
-                'indication': row.get('indi_pt', '')
-            }
-            drugs.append(drug)
-        
-        return drugs
-    
-    def _parse_reac(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Parse REAC (reactions) file"""
-        reactions = []
-        
-        df = pd.DataFrame([line.strip().split('$') for line in lines[1:]], 
-                         columns=lines[0].strip().split('$'))
-        
-        for _, row in df.iterrows():
-            reaction = {
-                'case_number': row.get('caseid', ''),
-                'reaction': row.get('pt', '')
-            }
-            reactions.append(reaction)
-        
-        return reactions
-    
-    def _safe_float(self, value) -> Optional[float]:
-        """Safely convert to float"""
-        try:
-            return float(value) if value else None
-        except (ValueError, TypeError):
-            return None
 
 
 class ExcelParser:
@@ -444,6 +484,9 @@ class UniversalParser:
                 'cases': [...],
                 'metadata': {...}
             }
+        
+        A FAERS quarterly release yields at most MAX_QUARTER_PARSE_CASES
+        cases, with metadata['truncated'] set when there were more.
         """
         # Detect format
         detected_format = FormatDetector.detect_format(file_path)
@@ -451,12 +494,24 @@ class UniversalParser:
         logger.info(f"Detected format: {detected_format} for file: {file_path}")
         
         # Parse based on format
+        truncated = False
         if detected_format == 'e2b_r2':
             cases = self.e2b_parser.parse_r2(file_path)
         elif detected_format == 'e2b_r3':
             cases = self.e2b_parser.parse_r3(file_path)
         elif detected_format == 'faers':
             cases = self.faers_parser.parse(file_path)
+        elif detected_format == 'faers_quarter':
+            cases = []
+            batches = self.faers_parser.parse_quarter(file_path)
+            for batch in batches:
+                cases.extend(batch)
+                if len(cases) > MAX_QUARTER_PARSE_CASES:
+                    truncated = True
+                    break
+            # Stops the join and removes its spill files
+            batches.close()
+            cases = cases[:MAX_QUARTER_PARSE_CASES]
         elif detected_format in ['excel', 'csv']:
             cases = self.excel_parser.parse(file_path)
         elif detected_format == 'pdf':
@@ -470,7 +525,8 @@ class UniversalParser:
             'metadata': {
                 'file_path': file_path,
                 'parsed_at': datetime.now().isoformat(),
-                'case_count': len(cases)
+                'case_count': len(cases),
+                'truncated': truncated
             }
         }
 
@@ -8,20 +8,21 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field, validator
 
 from app.core.signal_detection import (
-    CompleteFusionEngine,
     ContingencyTable,
     ClinicalFeatures,
+    SignalDetectionConfig,
     TimeSeriesData,
+    config_manager,
+    get_fusion_engine,
 )
 
 router = APIRouter(prefix="/signal-detection", tags=["Quantum Fusion"])
 
-# Singleton engine
-fusion_engine = CompleteFusionEngine()
+CONFIG_LEVELS = ("platform", "organization", "user")
 
 
 class ContingencyInput(BaseModel):
@@ -85,6 +86,14 @@ class BatchQuantumSignalRequest(BaseModel):
     signals: List[QuantumSignalRequest]
 
 
+class ConfigOverrideRequest(BaseModel):
+    level: str = Field(..., description="platform, organization or user")
+    config: Dict[str, Any] = Field(..., description="Partial SignalDetectionConfig")
+    organization: Optional[str] = None
+    user_id: Optional[str] = None
+    notes: Optional[str] = None
+
+
 # Response Models (Claude's Improvement #1)
 class Layer2Components(BaseModel):
     """Multi-source quantum components (Layer 2)"""
@@ -191,10 +200,60 @@ class FusionScoreResponse(BaseModel):
         }
 
 
+@router.get("/config")
+async def get_signal_detection_config(
+    organization: Optional[str] = Query(None, description="Organization for org-level overrides"),
+    user_id: Optional[str] = Query(None, description="User for user-level overrides"),
+):
+    """Effective signal detection config for an organization/user."""
+    return config_manager.get_config(user_id=user_id, organization=organization).to_dict()
+
+
+@router.put("/config")
+async def save_signal_detection_config(request: ConfigOverrideRequest):
+    """
+    Save a platform, organization or user override.
+    
+    Configs cached by this worker are invalidated right away; other workers
+    pick the change up within SIGNAL_CONFIG_CACHE_TTL seconds.
+    """
+    if request.level not in CONFIG_LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be one of {', '.join(CONFIG_LEVELS)}")
+    if request.level == "organization" and not request.organization:
+        raise HTTPException(status_code=400, detail="organization is required for organization overrides")
+    if request.level == "user" and not request.user_id:
+        raise HTTPException(status_code=400, detail="user_id is required for user overrides")
+    unknown = set(request.config) - set(SignalDetectionConfig.__dataclass_fields__)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown config fields: {', '.join(sorted(unknown))}")
+    
+    try:
+        config_manager.save_override(
+            request.level,
+            request.config,
+            organization=request.organization,
+            user_id=request.user_id,
+            notes=request.notes,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return config_manager.get_config(
+        user_id=request.user_id if request.level == "user" else None,
+        organization=request.organization if request.level == "organization" else None,
+    ).to_dict()
+
+
 @router.post("/fusion", response_model=FusionScoreResponse)
-async def detect_fusion_signal(request: QuantumSignalRequest):
+async def detect_fusion_signal(
+    request: QuantumSignalRequest,
+    organization: Optional[str] = Query(None, description="Organization for config overrides"),
+    user_id: Optional[str] = Query(None, description="User for config overrides"),
+):
     """Run full fusion detection for a single drug-event pair."""
     try:
+        fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
+
         contingency_table = None
         if request.contingency:
             contingency_table = ContingencyTable(
@@ -310,9 +369,15 @@ async def detect_fusion_signal(request: QuantumSignalRequest):
 
 
 @router.post("/fusion/batch", response_model=List[FusionScoreResponse])
-async def detect_fusion_batch(request: BatchQuantumSignalRequest):
+async def detect_fusion_batch(
+    request: BatchQuantumSignalRequest,
+    organization: Optional[str] = Query(None, description="Organization for config overrides"),
+    user_id: Optional[str] = Query(None, description="User for config overrides"),
+):
     """Batch fusion detection; ranks signals by fusion score."""
     try:
+        fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
+
         # Claude's Improvement #2: Use Pydantic's dict() instead of manual mapping
         signal_payloads = [
             {
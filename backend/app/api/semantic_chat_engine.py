@@ -16,6 +16,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
 
+from app.core.analysis.query_cache import get_query_cache, query_cache_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -378,7 +380,8 @@ class QueryOptimizer:
     """
     
     def __init__(self):
-        self.query_cache = {}
+        # Shared two-tier result cache; optimize_query() returns its key
+        self.query_cache = get_query_cache()
         
     def optimize_query(self, intent: QueryIntent) -> Dict[str, Any]:
         """
@@ -480,21 +483,8 @@ class QueryOptimizer:
         }
     
     def _generate_cache_key(self, intent: QueryIntent) -> str:
-        """Generate cache key from intent"""
-        import hashlib
-        key_parts = [
-            intent.query_type,
-            ','.join(sorted(intent.drugs)),
-            ','.join(sorted(intent.events)),
-            str(intent.seriousness),
-            str(intent.age_range),
-            str(intent.sex),
-            ','.join(sorted(intent.countries)),
-            str(intent.date_range),
-            str(intent.outcome)
-        ]
-        key_string = '|'.join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        """Generate cache key from intent (see app.core.analysis.query_cache)"""
+        return query_cache_key("intent", intent)
     
     def _estimate_rows(self, intent: QueryIntent) -> int:
         """Estimate number of rows (for query planning)"""
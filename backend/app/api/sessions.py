@@ -11,6 +11,8 @@ import os
 from supabase import create_client, Client
 import uuid
 
+from app.services.view_refresher import view_refresher
+
 router = APIRouter(prefix="/api/v1/sessions", tags=["sessions"])
 
 # Initialize Supabase
@@ -377,3 +379,57 @@ async def get_cross_session_analytics(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/analytics/overview")
+async def get_analytics_overview(
+    start_date: Optional[str] = Query(None, description="First event date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Last event date (YYYY-MM-DD)")
+):
+    """
+    Daily event statistics and geographic distribution
+    
+    Read from mv_daily_statistics / mv_geographic_distribution while the
+    view refresher reports them fresh, otherwise computed from pv_cases.
+    Countries always cover all cases (the view is not date-partitioned).
+    """
+    try:
+        if view_refresher.is_fresh():
+            daily_query = supabase.table("mv_daily_statistics").select(
+                "date, total_cases, serious_cases, unique_drugs, unique_reactions, countries_reporting, avg_patient_age"
+            )
+            if start_date:
+                daily_query = daily_query.gte("date", start_date)
+            if end_date:
+                daily_query = daily_query.lte("date", end_date)
+            daily = daily_query.order("date").execute().data or []
+            
+            countries = supabase.table("mv_geographic_distribution").select(
+                "reporter_country, case_count, serious_count, unique_drugs, unique_reactions"
+            ).order("case_count", desc=True).execute().data or []
+            source = "materialized_view"
+        else:
+            daily, countries = _compute_analytics_overview(start_date, end_date)
+            source = "live"
+        
+        return {
+            "daily": daily,
+            "countries": countries,
+            "source": source,
+            "views": view_refresher.staleness()
+        }
+        
+    except Exception as e:
+        print(f"Error in analytics overview: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _compute_analytics_overview(start_date: Optional[str], end_date: Optional[str]):
+    """Same rows as the migration-007 views, grouped in the database (migration 014)"""
+    daily = supabase.rpc("analytics_daily_statistics", {
+        "p_start_date": start_date or None,
+        "p_end_date": end_date or None
+    }).execute().data or []
+    countries = supabase.rpc("analytics_geographic_distribution", {}).execute().data or []
+    return daily, countries
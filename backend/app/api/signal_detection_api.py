@@ -55,6 +55,7 @@ class UnifiedSignalRequest(BaseModel):
 class BatchSignalRequest(BaseModel):
     """Request model for batch signal detection"""
     drug_event_pairs: List[dict]
+    top_k: Optional[int] = None  # Only return the highest-scoring pairs
 
 
 @router.post("/unified", response_model=dict)
@@ -159,7 +160,9 @@ async def detect_batch_signals(request: BatchSignalRequest):
                 ct
             ))
         
-        results = detector.detect_signals_batch(pairs, estimate_priors=True)
+        results = detector.detect_signals_batch(
+            pairs, estimate_priors=True, top_k=request.top_k
+        )
         
         return [result.to_dict() for result in results]
         
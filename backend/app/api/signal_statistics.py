@@ -9,10 +9,14 @@ Based on:
 """
 
 import math
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,6 +55,140 @@ class SignalResult:
     methods_flagged: List[str]  # Which methods flagged as signal
 
 
+def _normalize_term(value: Optional[str]) -> str:
+    """Normalize a drug/reaction value the same way the 2x2 matcher does"""
+    return (value or '').strip().lower()
+
+
+class _TermIndex:
+    """
+    Lookup of distinct normalized terms with their case counts.
+
+    Resolves which stored terms "match" a search term under the same
+    bidirectional substring rule used by SignalDetector._case_has_drug
+    (search in value, or value in search) without scanning every case.
+    """
+
+    def __init__(self, counts: Counter):
+        self.counts = counts
+        self.values = list(counts)
+        self._value_set = set(self.values)
+        # All values joined by a separator so "search in value" becomes a
+        # handful of C-level str.find calls instead of a Python loop
+        self._joined = '\x00'.join(self.values)
+        self._starts = []
+        offset = 0
+        for value in self.values:
+            self._starts.append(offset)
+            offset += len(value) + 1
+        self._cache: Dict[str, Tuple[str, ...]] = {}
+
+    def match(self, term: str) -> Tuple[str, ...]:
+        """Return all stored values v with term in v or v in term"""
+        cached = self._cache.get(term)
+        if cached is not None:
+            return cached
+
+        if not term:
+            matched = set(self.values)
+        else:
+            matched = set()
+            # Values containing the search term
+            if '\x00' in term:
+                matched.update(v for v in self.values if term in v)
+            else:
+                pos = self._joined.find(term)
+                while pos != -1:
+                    idx = bisect_right(self._starts, pos) - 1
+                    matched.add(self.values[idx])
+                    next_start = self._starts[idx + 1] if idx + 1 < len(self._starts) else len(self._joined)
+                    pos = self._joined.find(term, next_start)
+            # Values contained in the search term (incl. the empty value)
+            length = len(term)
+            if length * (length + 1) // 2 <= len(self.values):
+                for i in range(length):
+                    for j in range(i + 1, length + 1):
+                        if term[i:j] in self._value_set:
+                            matched.add(term[i:j])
+                if '' in self._value_set:
+                    matched.add('')
+            else:
+                matched.update(v for v in self.values if v in term)
+
+        result = tuple(matched)
+        self._cache[term] = result
+        return result
+
+    def total(self, term: str) -> int:
+        """Number of cases whose value matches the search term"""
+        return sum(self.counts[v] for v in self.match(term))
+
+
+class ContingencyCounts:
+    """
+    Marginal counts for a case list, built in a single pass.
+
+    Holds drug totals, event totals, drug-event pair counts and N so that
+    any 2x2 table can be derived without re-iterating the cases. Tables are
+    identical to SignalDetector.build_2x2_table, including its substring
+    matching of drug and reaction names.
+    """
+
+    def __init__(self, all_cases: List[Dict]):
+        self.n = 0
+        drug_counts: Counter = Counter()
+        event_counts: Counter = Counter()
+        self._events_by_drug: Dict[str, Counter] = defaultdict(Counter)
+
+        for case in all_cases:
+            drug = _normalize_term(case.get('drug_name'))
+            event = _normalize_term(case.get('reaction'))
+            drug_counts[drug] += 1
+            event_counts[event] += 1
+            self._events_by_drug[drug][event] += 1
+            self.n += 1
+
+        self.drugs = _TermIndex(drug_counts)
+        self.events = _TermIndex(event_counts)
+
+    def pair_count(self, drug: str, event: str) -> int:
+        """Number of cases matching both the drug and the event"""
+        drugs = self.drugs.match(drug.strip().lower())
+        events = self.events.match(event.strip().lower())
+        if not drugs or not events:
+            return 0
+
+        total = 0
+        if len(events) == 1:
+            only_event = events[0]
+            for d in drugs:
+                total += self._events_by_drug[d].get(only_event, 0)
+            return total
+
+        event_set = set(events)
+        for d in drugs:
+            row = self._events_by_drug[d]
+            if len(row) <= len(event_set):
+                total += sum(count for e, count in row.items() if e in event_set)
+            else:
+                total += sum(row.get(e, 0) for e in event_set)
+        return total
+
+    def table(self, drug: str, event: str) -> Tuple[int, int, int, int]:
+        """
+        Derive the (a, b, c, d) table for a drug-event pair
+
+        Same layout as SignalDetector.build_2x2_table.
+        """
+        a = self.pair_count(drug, event)
+        drug_total = self.drugs.total(drug.strip().lower())
+        event_total = self.events.total(event.strip().lower())
+        b = drug_total - a
+        c = event_total - a
+        d = self.n - a - b - c
+        return a, b, c, d
+
+
 class SignalDetector:
     """
     Statistical signal detection for pharmacovigilance
@@ -292,6 +430,20 @@ class SignalDetector:
         # Build 2x2 contingency table
         a, b, c, d = self.build_2x2_table(drug, event, all_cases)
         
+        return self.detect_signal_from_table(drug, event, a, b, c, d)
+    
+    def detect_signal_from_table(
+        self,
+        drug: str,
+        event: str,
+        a: int, b: int, c: int, d: int
+    ) -> SignalResult:
+        """
+        Run complete signal detection analysis on a prebuilt 2x2 table
+        
+        Used by detect_all_signals, which derives every table from one
+        ContingencyCounts pass instead of rescanning the cases per pair.
+        """
         # Calculate PRR
         prr, prr_ci_lower, prr_ci_upper, prr_is_signal = self.calculate_prr(a, b, c, d)
         
@@ -374,15 +526,58 @@ class SignalDetector:
         # Filter by minimum case count
         pairs = {k: v for k, v in pairs.items() if v >= min_case_count}
         
+        # All tables come from a single marginal-count pass rather than
+        # one case scan per pair
+        return self._detect_pairs(list(pairs), ContingencyCounts(all_cases), min_case_count)
+    
+    def detect_all_signals_from_tables(
+        self,
+        drugs: Sequence[str],
+        events: Sequence[str],
+        n11: Sequence[int],
+        n10: Sequence[int],
+        n01: Sequence[int],
+        n00: Sequence[int]
+    ) -> List[SignalResult]:
+        """
+        Detect signals for prebuilt 2x2 tables, one per drug-event pair
+        
+        Takes the output of DrugEventCountCube.contingency_arrays(), so the
+        tables are lookups against the count cube rather than a case scan.
+        
+        Returns:
+            SignalResult objects sorted like detect_all_signals
+        """
+        logger.info(f"Analyzing {len(drugs)} drug-event pairs from count tables")
+        
+        results = [
+            self.detect_signal_from_table(drug, event, a, b, c, d)
+            for drug, event, a, b, c, d in zip(
+                drugs, events,
+                np.asarray(n11).tolist(), np.asarray(n10).tolist(),
+                np.asarray(n01).tolist(), np.asarray(n00).tolist()
+            )
+        ]
+        return self._sort_results(results)
+    
+    def _detect_pairs(
+        self,
+        pairs: List[Tuple[str, str]],
+        counts: 'ContingencyCounts',
+        min_case_count: int
+    ) -> List[SignalResult]:
         logger.info(f"Analyzing {len(pairs)} drug-event pairs "
                    f"(min {min_case_count} cases)")
         
-        # Detect signals for each pair
         results = []
-        for (drug, event), count in pairs.items():
-            result = self.detect_signal(drug, event, all_cases)
+        for drug, event in pairs:
+            a, b, c, d = counts.table(drug, event)
+            result = self.detect_signal_from_table(drug, event, a, b, c, d)
             results.append(result)
         
+        return self._sort_results(results)
+    
+    def _sort_results(self, results: List[SignalResult]) -> List[SignalResult]:
         # Sort by signal strength then case count
         strength_order = {'strong': 0, 'moderate': 1, 'weak': 2, 'none': 3}
         results.sort(
@@ -421,6 +616,11 @@ def calculate_signal_statistics(
     detector = SignalDetector(**(thresholds or {}))
     result = detector.detect_signal(drug, event, all_cases)
     
+    return signal_result_to_dict(result)
+
+
+def signal_result_to_dict(result: SignalResult) -> Dict:
+    """JSON-safe summary of a SignalResult (as returned by calculate_signal_statistics)"""
     return {
         'drug': result.drug,
         'event': result.event,
@@ -4,11 +4,15 @@ from pydantic import BaseModel
 from datetime import datetime
 import os
 import re
+import numpy as np
 from supabase import create_client, Client
+from .case_snapshot import CaseSnapshotStore
+from app.core.signal_detection.count_cube import get_count_cube
+from app.services.view_refresher import view_refresher
 from .signal_statistics import (
     SignalDetector,
-    calculate_signal_statistics,
-    get_all_signals
+    get_all_signals,
+    signal_result_to_dict
 )
 
 router = APIRouter(prefix="/api/v1/signals", tags=["signals"])
@@ -22,6 +26,13 @@ if not supabase_url or not supabase_key:
 
 supabase: Client = create_client(supabase_url, supabase_key)
 
+# Shared drug/reaction -> case id index for the drug-event case listing;
+# the 2x2 tables themselves come from the count cube
+case_store = CaseSnapshotStore(supabase)
+
+CASE_DETAIL_COLUMNS = "id,patient_age,patient_sex,serious,outcome,event_date,narrative"
+CASE_DETAIL_CHUNK_SIZE = 200
+
 
 def escape_sql_identifier(identifier: str) -> str:
     """Escape SQL identifier to prevent injection (only allow alphanumeric and underscore)"""
@@ -48,6 +59,32 @@ def sanitize_float(value: float) -> float:
     return value
 
 
+def session_filter_date(session_date: Optional[str]) -> Optional[str]:
+    """
+    Session date to filter on, or None for no session filter
+    
+    Session ids (UUIDs) are sometimes passed as session_date; like the
+    fallback queries, those skip session filtering.
+    """
+    if not session_date or session_date == "all":
+        return None
+    if len(session_date) == 36 and "-" in session_date and session_date.count("-") == 4:
+        print(f"[WARN] session_date is a UUID ({session_date}), not a date. Skipping session filter.")
+        return None
+    return session_date
+
+
+def signal_priority_level(cases: int, serious_count: int) -> str:
+    """Priority of a drug-event group (same rule as aggregate_drug_event_signals)"""
+    if cases >= 1000 or serious_count >= cases * 0.8:
+        return "critical"
+    if cases >= 500 or serious_count >= cases * 0.5:
+        return "high"
+    if cases >= 100:
+        return "medium"
+    return "low"
+
+
 class SignalStats(BaseModel):
     total_cases: int
     critical_signals: int
@@ -90,50 +127,25 @@ async def get_signal_stats(
 ):
     """
     Get aggregated statistics - OPTIMIZED with single database query
-    Falls back to multiple queries if RPC not available
+    Falls back to multiple queries if the signal_summary_stats RPC is not available
     """
     try:
-        # Try optimized RPC method first
+        # Try the server-side aggregate first (migration 012)
         try:
-            filters = []
-            if organization:
-                org_escaped = escape_sql_string(organization)
-                filters.append(f"organization = {org_escaped}")
-            if dataset and dataset != "all":
-                ds_escaped = escape_sql_string(dataset)
-                filters.append(f"source = {ds_escaped}")
-            if session_date and session_date != "all":
-                date_escaped = escape_sql_string(session_date)
-                filters.append(f"""source_file_id IN (
-                    SELECT id FROM file_upload_history 
-                    WHERE DATE(uploaded_at) = {date_escaped}
-                )""")
-            
-            where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
-            
-            # OPTIMIZED: Single query with all aggregations
-            query = f"""
-            SELECT 
-                COUNT(*)::int as total_cases,
-                COUNT(*) FILTER (WHERE serious = true)::int as serious_events,
-                COUNT(DISTINCT drug_name)::int as unique_drugs,
-                COUNT(DISTINCT reaction)::int as unique_reactions,
-                LEAST(
-                    COUNT(*) FILTER (WHERE serious = true)::int,
-                    COUNT(*)::int / 10
-                )::int as critical_signals
-            FROM pv_cases
-            {where_clause}
-            """
-            
-            result = supabase.rpc('exec_sql', {'query': query}).execute()
+            result = supabase.rpc('signal_summary_stats', {
+                'p_organization': organization or None,
+                'p_source': dataset if dataset and dataset != "all" else None,
+                'p_session_date': session_filter_date(session_date)
+            }).execute()
             
             if result.data and len(result.data) > 0:
                 stats = result.data[0]
+                total_cases = stats.get('total_cases', 0) or 0
+                serious_events = stats.get('serious_events', 0) or 0
                 return SignalStats(
-                    total_cases=stats.get('total_cases', 0) or 0,
-                    critical_signals=stats.get('critical_signals', 0) or 0,
-                    serious_events=stats.get('serious_events', 0) or 0,
+                    total_cases=total_cases,
+                    critical_signals=min(serious_events, total_cases // 10),
+                    serious_events=serious_events,
                     unique_drugs=stats.get('unique_drugs', 0) or 0,
                     unique_reactions=stats.get('unique_reactions', 0) or 0
                 )
@@ -267,8 +279,51 @@ async def get_signals(
     Uses PostgreSQL aggregation instead of Python loops
     """
     try:
-        # Use safe Supabase query builder instead of exec_sql to prevent SQL injection
-        # Fallback to Python-side aggregation (slower but secure)
+        # Unfiltered dashboard list: serve from mv_drug_event_signals while it
+        # is fresh. Searches always use the RPC, which matches the raw names.
+        unfiltered = not (organization or user_ids or serious_only or priority or search
+                          or (dataset and dataset != "all") or session_filter_date(session_date))
+        if unfiltered and view_refresher.is_fresh():
+            try:
+                signals = get_signals_from_view(limit, offset)
+                if signals is not None:
+                    return signals
+            except Exception as view_error:
+                print(f"[DEBUG] View read failed, using RPC: {view_error}")
+        
+        # Parameterized aggregate RPC (migration 012); no SQL strings are built here
+        try:
+            user_id_list = [uid.strip() for uid in user_ids.split(',') if uid.strip()] if user_ids else []
+            result = supabase.rpc('aggregate_drug_event_signals', {
+                'p_organization': organization or None,
+                'p_source': dataset if dataset and dataset != "all" else None,
+                'p_serious_only': bool(serious_only),
+                'p_session_date': session_filter_date(session_date),
+                'p_user_ids': user_id_list or None,
+                'p_search': search or None,
+                'p_priority': priority.lower() if priority else None,
+                'p_limit': limit,
+                'p_offset': offset
+            }).execute()
+            
+            return [
+                Signal(
+                    id=str(row["id"]),
+                    drug=row["drug"],
+                    reaction=row["reaction"],
+                    prr=round(row["cases"] * 0.1, 2),
+                    cases=row["cases"],
+                    priority=row["priority"],
+                    serious=row["serious_count"] > 0,
+                    dataset=row.get("dataset") or "FAERS",
+                    organization=row.get("organization")
+                )
+                for row in (result.data or [])
+            ]
+        except Exception as rpc_error:
+            print(f"[DEBUG] RPC method failed, using fallback: {rpc_error}")
+        
+        # Fallback to Python-side aggregation (slower, uses the query builder)
         return await get_signals_fallback(organization, dataset, priority, serious_only, search, session_date, limit, offset, user_ids)
         
     except Exception as e:
@@ -278,6 +333,41 @@ async def get_signals(
         raise HTTPException(status_code=500, detail=f"Error fetching signals: {str(e)}")
 
 
+def get_signals_from_view(limit: int, offset: int) -> Optional[List[Signal]]:
+    """
+    Top drug-event groups from mv_drug_event_signals
+    
+    The view (migration 014) groups like aggregate_drug_event_signals but
+    only holds pairs with >= 3 cases, so it is exact for the top of the
+    list sorted by case count. Returns None when the requested page runs
+    past the view, leaving that tail to the aggregate RPC.
+    """
+    query = supabase.table("mv_drug_event_signals").select(
+        "drug_name, reaction, first_case_id, dataset, organization, case_count, serious_count"
+    )
+    result = query.order("case_count", desc=True).order("drug_name").order("reaction").range(
+        offset, offset + limit - 1
+    ).execute()
+    rows = result.data or []
+    if len(rows) < limit:
+        return None
+    
+    return [
+        Signal(
+            id=str(row["first_case_id"]),
+            drug=row["drug_name"],
+            reaction=row["reaction"],
+            prr=round(row["case_count"] * 0.1, 2),
+            cases=row["case_count"],
+            priority=signal_priority_level(row["case_count"], row["serious_count"]),
+            serious=row["serious_count"] > 0,
+            dataset=row.get("dataset") or "FAERS",
+            organization=row.get("organization")
+        )
+        for row in rows
+    ]
+
+
 async def get_signals_fallback(
     organization: Optional[str],
     dataset: Optional[str],
@@ -382,15 +472,7 @@ async def get_signals_fallback(
         serious_count = data["serious_count"]
         
         prr = cases * 0.1 if cases > 0 else 0
-        
-        if cases >= 1000 or serious_count >= cases * 0.8:
-            priority_level = "critical"
-        elif cases >= 500 or serious_count >= cases * 0.5:
-            priority_level = "high"
-        elif cases >= 100:
-            priority_level = "medium"
-        else:
-            priority_level = "low"
+        priority_level = signal_priority_level(cases, serious_count)
         
         if priority and priority_level != priority.lower():
             continue
@@ -411,6 +493,12 @@ async def get_signals_fallback(
     return signals[:limit]
 
 
+@router.get("/views/status")
+async def get_view_status():
+    """Staleness of the materialized views behind the dashboard endpoints"""
+    return view_refresher.staleness()
+
+
 @router.get("/datasets")
 async def get_datasets(organization: Optional[str] = Query(None)):
     """Get list of available datasets (sources)"""
@@ -470,10 +558,10 @@ async def get_statistical_signals(
         # Override min_cases if provided
         thresholds["min_cases"] = min_cases
         
-        # Fetch cases
-        query = supabase.table("pv_cases").select("*")
+        # Restrict the count cube's tables to the dataset and session uploads
+        strata = {}
         if dataset and dataset != "all":
-            query = query.eq("source", dataset)
+            strata["source"] = dataset
         
         if session_date and session_date != "all":
             # Get file IDs for this session date
@@ -482,20 +570,17 @@ async def get_statistical_signals(
             ).lt("uploaded_at", f"{session_date}T23:59:59").execute()
             
             if files_result.data:
-                file_ids = [f["id"] for f in files_result.data]
-                query = query.in_("source_file_id", file_ids)
+                strata["upload"] = [f["id"] for f in files_result.data]
             else:
                 return []
         
-        result = query.execute()
-        all_cases = result.data or []
-        
-        if not all_cases:
+        tables = get_count_cube().contingency_arrays(min_count=min_cases, **strata)
+        if not tables[0]:
             return []
         
         # Create detector with custom thresholds
         detector = SignalDetector(**thresholds)
-        results = detector.detect_all_signals(all_cases, min_case_count=min_cases)
+        results = detector.detect_all_signals_from_tables(*tables)
         
         # Filter by method and signal status
         signals = []
@@ -569,14 +654,27 @@ async def get_drug_event_signal(drug: str, event: str):
     - Case details
     """
     try:
-        # Fetch all cases
-        result = supabase.table("pv_cases").select("*").execute()
-        all_cases = result.data or []
+        # Calculate statistics; names match like the case listing below
+        a, b, c, d = get_count_cube().table(drug, event, substring=True)
+        stats = signal_result_to_dict(
+            SignalDetector().detect_signal_from_table(drug, event, a, b, c, d)
+        )
         
-        # Calculate statistics
-        stats = calculate_signal_statistics(drug, event, all_cases)
+        # Get individual cases; details (incl. narratives) are only
+        # fetched for the matching rows
+        snapshot = await case_store.get()
+        matching = np.flatnonzero(
+            np.isin(snapshot.codes["drug_name"], snapshot.substring_codes("drug_name", drug))
+            & np.isin(snapshot.codes["reaction"], snapshot.substring_codes("reaction", event))
+        )
+        case_ids = snapshot.case_ids(matching)
+        details = {}
+        for start in range(0, len(case_ids), CASE_DETAIL_CHUNK_SIZE):
+            chunk = case_ids[start:start + CASE_DETAIL_CHUNK_SIZE]
+            result = supabase.table("pv_cases").select(CASE_DETAIL_COLUMNS).in_("id", chunk).execute()
+            for row in result.data or []:
+                details[str(row.get('id'))] = row
         
-        # Get individual cases
         cases = [
             {
                 'id': case.get('id'),
@@ -587,9 +685,7 @@ async def get_drug_event_signal(drug: str, event: str):
                 'event_date': case.get('event_date'),
                 'narrative': case.get('narrative', '')[:200] + '...' if case.get('narrative') else None
             }
-            for case in all_cases
-            if drug.lower() in (case.get('drug_name') or '').lower()
-            and event.lower() in (case.get('reaction') or '').lower()
+            for case in (details[case_id] for case_id in case_ids if case_id in details)
         ]
         
         return {
@@ -622,16 +718,13 @@ async def get_priority_signals(
     - Statistical significance
     """
     try:
-        # Fetch all cases
-        result = supabase.table("pv_cases").select("*").execute()
-        all_cases = result.data or []
-        
-        if not all_cases:
+        count_cube = get_count_cube()
+        if not count_cube.total:
             return []
         
         # Get all signals
         detector = SignalDetector()
-        results = detector.detect_all_signals(all_cases)
+        results = detector.detect_all_signals_from_tables(*count_cube.contingency_arrays())
         
         # Filter by minimum strength
         strength_order = {'strong': 0, 'moderate': 1, 'weak': 2, 'none': 3}
@@ -6,12 +6,15 @@ Checks for duplicate files using MD5/SHA-256 hashes and provides merge/skip/repl
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
 import hashlib
 import os
 from datetime import datetime
 from supabase import create_client, Client
 import logging
 
+from app.core.signal_detection.count_cube import get_count_cube
+
 router = APIRouter(prefix="/api/v1/upload", tags=["upload"])
 
 # Initialize Supabase
@@ -36,6 +39,23 @@ class DuplicateCheckResponse(BaseModel):
     cases_count: Optional[int] = None
 
 
+async def uncount_deleted_cases(rows: List[dict]) -> None:
+    """
+    Remove deleted pv_cases rows from the count cube behind /signals
+    
+    A cube not yet built from pv_cases (no coverage) is left alone; the
+    next scripts/build_count_cube.py run only counts the remaining cases.
+    """
+    count_cube = get_count_cube()
+    if count_cube.covered_uploads is None:
+        return
+    if sum(count_cube.remove_case(row) for row in rows):
+        try:
+            await asyncio.to_thread(count_cube.save)
+        except OSError as e:
+            logger.warning(f"Could not save count cube: {e}")
+
+
 def calculate_file_hash(file_content: bytes) -> str:
     """Calculate SHA-256 hash of file content"""
     return hashlib.sha256(file_content).hexdigest()
@@ -125,10 +145,11 @@ async def upload_file(
             
             elif duplicate_action == 'replace':
                 # Delete old cases
-                supabase.table("pv_cases")\
+                deleted = supabase.table("pv_cases")\
                     .delete()\
                     .eq("upload_id", existing_upload["id"])\
                     .execute()
+                await uncount_deleted_cases(deleted.data or [])
                 
                 # Delete old upload record
                 supabase.table("file_uploads")\
@@ -310,6 +331,7 @@ async def delete_upload(upload_id: str):
             .delete()\
             .eq("upload_id", upload_id)\
             .execute()
+        await uncount_deleted_cases(cases_result.data or [])
         
         # Delete upload
         upload_result = supabase.table("file_uploads")\
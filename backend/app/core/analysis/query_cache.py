@@ -0,0 +1,326 @@
+"""
+Two-tier result cache for cohort queries.
+
+Tier 1 is an in-process LRU with a TTL; tier 2 is the Postgres
+`query_cache` table from migration 007 (read through get_cached_query(),
+which also bumps hit counts). Keys are a canonical hash of the query
+(SignalQueryFilters, QueryIntent or plain dicts) plus the current ingest
+watermark, so:
+
+- refinements that arrive at the same filters in a different order
+  (drugs ["warfarin", "apixaban"] vs ["apixaban", "warfarin"]), or differ
+  only in fields that do not select cases (raw_text, intent, ...), map to
+  the same entry
+- any completed upload moves the watermark, which retires every entry
+  computed before it
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLE = "query_cache"
+
+# Filter fields that do not change which cases match
+_NON_SEMANTIC_FIELDS = {
+    "raw_text", "previous_raw_text", "refinement_mode", "base_query_id",
+    "intent", "merge_strategy",
+}
+
+# Value lists that are OR-ed, so their order does not matter
+_VALUE_SETS = {"drugs", "events", "seriousness_or_outcome", "countries", "region_codes", "values"}
+
+IngestWatermark = Tuple[int, Optional[str]]  # (completed uploads, latest uploaded_at)
+
+
+def fetch_ingest_watermark(supabase: Any) -> IngestWatermark:
+    """Number of completed uploads and the latest upload time"""
+    result = supabase.table("file_upload_history").select(
+        "uploaded_at", count="exact"
+    ).eq("upload_status", "completed").order("uploaded_at", desc=True).limit(1).execute()
+    latest = result.data[0].get("uploaded_at") if result.data else None
+    return (result.count or 0, latest)
+
+
+def _canonical(value: Any, field: Optional[str] = None) -> Any:
+    if hasattr(value, "model_dump"):
+        value = value.model_dump()
+    elif hasattr(value, "dict") and callable(value.dict) and not isinstance(value, dict):
+        value = value.dict()
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = dataclasses.asdict(value)
+
+    if isinstance(value, dict):
+        return {
+            k: _canonical(v, k) for k, v in sorted(value.items())
+            if k not in _NON_SEMANTIC_FIELDS and v not in (None, [], {}, "")
+        }
+    if isinstance(value, (list, tuple, set)):
+        items = [_canonical(v) for v in value]
+        if field in _VALUE_SETS:
+            return sorted({str(v).strip() for v in items if str(v).strip()})
+        return items
+    if isinstance(value, str):
+        return value.strip().upper() if field in ("sex", "time_window") else value.strip()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def query_cache_key(kind: str, *parts: Any) -> str:
+    """
+    Canonical key for a query
+
+    Args:
+        kind: What is computed (e.g. "cases_page", "fast_count", "fusion")
+        parts: Query definition and any extra parameters (page, limit, ...)
+    """
+    canonical = json.dumps([_canonical(p) for p in parts], sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha256(canonical.encode()).hexdigest()[:32]}"
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class QueryResultCache:
+    """
+    In-process LRU + Postgres query_cache table, invalidated by ingest.
+
+    Values are stored in tier 1 as computed; tier 2 stores dump(value)
+    as JSON and rebuilds the value with load(). Values for which
+    cacheable(value) is False (e.g. computed while a provider was failing)
+    are returned but not stored.
+    """
+
+    def __init__(
+        self,
+        supabase_client: Optional[Any] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        persistent: Optional[bool] = None,
+        watermark_seconds: Optional[float] = None,
+    ):
+        self._supabase = supabase_client
+        self._supabase_unavailable = False
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.getenv("QUERY_CACHE_SIZE", "512")
+        )
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("QUERY_CACHE_TTL", "900")
+        )
+        self.persistent = persistent if persistent is not None else (
+            os.getenv("QUERY_CACHE_PERSISTENT", "true").lower() == "true"
+        )
+        self.watermark_seconds = watermark_seconds if watermark_seconds is not None else float(
+            os.getenv("QUERY_CACHE_WATERMARK_SECONDS", "15")
+        )
+
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._watermark: Optional[IngestWatermark] = None
+        self._watermark_checked_at = 0.0
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        dump: Callable[[Any], Any] = lambda value: value,
+        load: Callable[[Any], Any] = lambda data: data,
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        full_key = self._full_key(key)
+        found, value = self._lookup(full_key, load)
+        if found:
+            return value
+        value = compute()
+        if cacheable(value):
+            self._store(full_key, value, dump)
+        return value
+
+    async def get_or_compute_async(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        dump: Callable[[Any], Any] = lambda value: value,
+        load: Callable[[Any], Any] = lambda data: data,
+        cacheable: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        full_key = self._full_key(key)
+        found, value = self._lookup(full_key, load)
+        if found:
+            return value
+        value = await compute()
+        if cacheable(value):
+            self._store(full_key, value, dump)
+        return value
+
+    def current_watermark(self) -> Optional[IngestWatermark]:
+        """Ingest watermark, re-read at most every watermark_seconds"""
+        return self._current_watermark()
+
+    def invalidate(self) -> None:
+        """Drop every tier-1 entry and re-read the watermark on next use"""
+        with self._lock:
+            self._entries.clear()
+            self._watermark_checked_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _full_key(self, key: str) -> str:
+        watermark = self._current_watermark()
+        if watermark is None:
+            return key
+        token = hashlib.sha1(json.dumps(watermark, default=str).encode()).hexdigest()[:12]
+        return f"{key}:{token}"
+
+    def _current_watermark(self) -> Optional[IngestWatermark]:
+        now = time.monotonic()
+        if now - self._watermark_checked_at < self.watermark_seconds:
+            return self._watermark
+
+        supabase = self._get_supabase()
+        if supabase is None:
+            return None
+        try:
+            watermark = fetch_ingest_watermark(supabase)
+        except Exception as e:
+            logger.warning(f"Could not read ingest watermark: {e}")
+            return self._watermark
+
+        with self._lock:
+            changed = self._watermark is not None and watermark != self._watermark
+            self._watermark = watermark
+            self._watermark_checked_at = now
+            if changed:
+                # Keys embed the watermark, so older entries can never hit again
+                self._entries.clear()
+        if changed and self.persistent:
+            try:
+                supabase.rpc("clean_expired_cache", {}).execute()
+            except Exception as e:
+                logger.debug(f"clean_expired_cache failed: {e}")
+        return watermark
+
+    def _lookup(self, key: str, load: Callable[[Any], Any]) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+
+        data = self._read_persistent(key)
+        if data is not None:
+            try:
+                value = load(data)
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.persistent_hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _store(self, key: str, value: Any, dump: Callable[[Any], Any]) -> None:
+        if value is None:
+            # get_cached_query returns NULL for misses, so None is not cacheable
+            return
+        self._remember(key, value)
+        if not self.persistent:
+            return
+        supabase = self._get_supabase()
+        if supabase is None:
+            return
+        try:
+            data = json.loads(json.dumps(dump(value), default=_json_default))
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+            supabase.table(CACHE_TABLE).upsert({
+                "cache_key": key,
+                "query_hash": key.split(":")[1],
+                "result_data": data,
+                "query_text": key.split(":")[0],
+                "expires_at": expires_at.replace(tzinfo=None).isoformat(),
+            }).execute()
+        except Exception as e:
+            logger.warning(f"Could not persist query cache entry {key}: {e}")
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_persistent(self, key: str) -> Optional[Any]:
+        if not self.persistent:
+            return None
+        supabase = self._get_supabase()
+        if supabase is None:
+            return None
+        try:
+            result = supabase.rpc("get_cached_query", {"p_cache_key": key}).execute()
+        except Exception as e:
+            logger.debug(f"get_cached_query failed: {e}")
+            return None
+        return result.data
+
+    def _get_supabase(self) -> Optional[Any]:
+        if self._supabase is None and not self._supabase_unavailable:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+            if url and key:
+                try:
+                    from supabase import create_client
+                except ImportError:
+                    logger.warning("supabase not installed; query cache is in-process only")
+                    self._supabase_unavailable = True
+                    return None
+                self._supabase = create_client(url, key)
+        return self._supabase
+
+
+_query_cache: Optional[QueryResultCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """Process-wide QueryResultCache"""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryResultCache()
+        return _query_cache
@@ -17,7 +17,7 @@ from app.core.signal_detection.query_router import (
     SignalQuerySpec,
     FusionResultSummary,
 )
-from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine
+from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine, get_fusion_engine
 from app.core.signal_detection.metrics_provider import MetricsProvider
 
 logger = logging.getLogger(__name__)
@@ -245,7 +245,7 @@ def process_natural_language_query(
 ) -> List[FusionResultSummary]:
     """Top-level helper to parse and route a query."""
     if fusion_engine is None:
-        fusion_engine = CompleteFusionEngine()
+        fusion_engine = get_fusion_engine()
     if fda_mapper is None:
         fda_mapper = FDATerminologyMapper()
 
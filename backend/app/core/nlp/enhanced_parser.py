@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Optional, Tuple, List, Dict
+import json
 import re
 
 from app.core.analysis.models import (
@@ -471,15 +472,41 @@ class ConversationalQueryInterpreter:
 
 # ------------------- Fusion bridge helper -------------------
 
-def run_fusion_for_filters(filters: SignalQueryFilters) -> List:
+def run_fusion_for_filters(
+    filters: SignalQueryFilters,
+    organization: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> List:
     """
     Helper function to run fusion engine for SignalQueryFilters.
     
-    Converts filters to SignalQuerySpec and routes through QueryRouter.
+    Converts filters to SignalQuerySpec and routes through QueryRouter,
+    scoring with the organization/user signal detection config.
+    Repeated filters are served from the query result cache; results
+    computed while a metrics provider was failing are not cached.
     """
+    from app.core.analysis.query_cache import get_query_cache, query_cache_key
+    from app.core.signal_detection.complete_fusion_engine import get_fusion_engine
+    from app.core.signal_detection.query_router import FusionResultSummary, QueryResult
+    
+    fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
+    config_key = json.dumps(fusion_engine.config.to_dict(), sort_keys=True)
+    result = get_query_cache().get_or_compute(
+        query_cache_key("fusion_spec", filters, config_key),
+        lambda: _run_fusion_uncached(filters, fusion_engine),
+        dump=lambda result: [r.to_dict() for r in result.results],
+        load=lambda data: QueryResult(results=[FusionResultSummary(**d) for d in data]),
+        cacheable=lambda result: result.complete,
+    )
+    return result.results
+
+
+def _run_fusion_uncached(filters: SignalQueryFilters, fusion_engine):
     from app.core.signal_detection.query_router import QueryRouter
-    from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine
-    from app.core.signal_detection.metrics_provider import create_supabase_metrics_provider
+    from app.core.signal_detection.metrics_provider import (
+        create_supabase_metrics_provider,
+        create_supabase_batch_metrics_provider,
+    )
     import os
     from supabase import create_client
     
@@ -492,14 +519,14 @@ def run_fusion_for_filters(filters: SignalQueryFilters) -> List:
     
     supabase = create_client(supabase_url, supabase_key)
     
-    # Initialize fusion engine and router
-    fusion_engine = CompleteFusionEngine()
+    # Initialize router
     metrics_provider = create_supabase_metrics_provider(supabase)
     query_router = QueryRouter(
         fusion_engine=fusion_engine,
-        metrics_provider=metrics_provider
+        metrics_provider=metrics_provider,
+        batch_metrics_provider=create_supabase_batch_metrics_provider(supabase)
     )
     
     # Convert filters to spec and run query
     spec = filters.to_signal_query_spec()
-    return query_router.run_query(spec)
+    return query_router.run_query_detailed(spec)
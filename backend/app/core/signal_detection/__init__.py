@@ -7,12 +7,15 @@ Contains all statistical and Bayesian signal detection methods
 from .bayesian_signal_detection import (
     BayesianSignalDetector,
     BayesianSignal,
+    BayesianBatchResult,
     ContingencyTable,
-    SignalStrength
+    SignalStrength,
+    GPSPrior
 )
 from .disproportionality_analysis import (
     DisproportionalityAnalyzer,
-    DisproportionalityResult
+    DisproportionalityResult,
+    DisproportionalityBatchResult
 )
 from .causality_assessment import (
     CausalityAssessor,
@@ -30,14 +33,21 @@ from .unified_signal_detection import (
 )
 from .complete_fusion_engine import (
     CompleteFusionEngine,
-    CompleteFusionResult
+    CompleteFusionResult,
+    FusionSignalColumns,
+    get_fusion_engine
 )
 from .query_router import (
     QueryRouter,
     SignalQuerySpec,
     FusionResultSummary
 )
+from .count_cube import (
+    DrugEventCountCube,
+    get_count_cube
+)
 from .config import (
+    CompiledSignalConfig,
     SignalDetectionConfig,
     ConfigManager,
     config_manager
@@ -46,10 +56,13 @@ from .config import (
 __all__ = [
     'BayesianSignalDetector',
     'BayesianSignal',
+    'BayesianBatchResult',
     'ContingencyTable',
     'SignalStrength',
+    'GPSPrior',
     'DisproportionalityAnalyzer',
     'DisproportionalityResult',
+    'DisproportionalityBatchResult',
     'CausalityAssessor',
     'CausalityAssessment',
     'ClinicalFeatures',
@@ -60,9 +73,14 @@ __all__ = [
     'UnifiedSignalResult',
     'CompleteFusionEngine',
     'CompleteFusionResult',
+    'FusionSignalColumns',
+    'get_fusion_engine',
     'QueryRouter',
     'SignalQuerySpec',
     'FusionResultSummary',
+    'DrugEventCountCube',
+    'get_count_cube',
+    'CompiledSignalConfig',
     'SignalDetectionConfig',
     'ConfigManager',
     'config_manager',
@@ -19,12 +19,15 @@ Version: 1.0.0
 
 import numpy as np
 from scipy import stats
-from scipy.special import gammaln, polygamma
+from scipy.special import gammaln, polygamma, gammainc, gammaincinv, digamma, expit
 from scipy.optimize import minimize
 from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
+from pathlib import Path
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,16 @@ class SignalStrength(Enum):
     VERY_STRONG = "very_strong"
 
 
+# Signal strength levels indexed by the strength_code of batch results
+STRENGTH_LEVELS: Tuple[SignalStrength, ...] = (
+    SignalStrength.NONE,
+    SignalStrength.WEAK,
+    SignalStrength.MODERATE,
+    SignalStrength.STRONG,
+    SignalStrength.VERY_STRONG,
+)
+
+
 @dataclass
 class ContingencyTable:
     """2x2 contingency table for drug-event pair"""
@@ -135,6 +148,172 @@ class BayesianSignal:
         }
 
 
+@dataclass
+class BayesianBatchResult:
+    """
+    Columnar Bayesian results for many drug-event pairs.
+    
+    Every field is a NumPy array with one entry per pair, in input order.
+    Rows with observed count below min_count (active == False) carry the
+    'no signal' values. p_value holds the per-pair p-value before any FDR
+    adjustment; use to_signal() to materialize a single row.
+    """
+    observed_count: np.ndarray
+    expected_count: np.ndarray
+    active: np.ndarray
+    
+    mgps_score: np.ndarray
+    mgps_lower_ci: np.ndarray
+    mgps_upper_ci: np.ndarray
+    
+    ebgm: np.ndarray
+    ebgm_lower_ci: np.ndarray
+    ebgm_upper_ci: np.ndarray
+    
+    is_signal: np.ndarray
+    strength_code: np.ndarray  # Index into STRENGTH_LEVELS
+    confidence_level: np.ndarray
+    p_value: np.ndarray
+    
+    prior_parameters: Dict[str, float]
+    posterior_alpha_offset: float  # Posterior alpha = N + offset
+    posterior_beta_offset: float   # Posterior beta = E + offset
+    
+    def __len__(self) -> int:
+        return len(self.observed_count)
+    
+    def to_signal(
+        self,
+        i: int,
+        drug: str,
+        event: str,
+        p_value: Optional[float] = None,
+        fdr_significant: bool = False
+    ) -> BayesianSignal:
+        """
+        Materialize row i as a BayesianSignal.
+        
+        Args:
+            i: Row index
+            drug: Drug name
+            event: Event/reaction name
+            p_value: FDR-adjusted p-value (defaults to the raw p-value)
+            fdr_significant: FDR significance flag
+        """
+        observed = int(self.observed_count[i])
+        expected = float(self.expected_count[i])
+        
+        if not self.active[i]:
+            return BayesianSignal(
+                drug=drug,
+                event=event,
+                observed_count=observed,
+                expected_count=expected,
+                mgps_score=0.0,
+                mgps_lower_ci=0.0,
+                mgps_upper_ci=0.0,
+                ebgm=0.0,
+                ebgm_lower_ci=0.0,
+                ebgm_upper_ci=0.0,
+                is_signal=False,
+                signal_strength=SignalStrength.NONE,
+                confidence_level=0.0,
+                fdr_adjusted_p_value=1.0 if p_value is None else p_value,
+                fdr_significant=fdr_significant,
+                prior_parameters={},
+                posterior_parameters={}
+            )
+        
+        return BayesianSignal(
+            drug=drug,
+            event=event,
+            observed_count=observed,
+            expected_count=expected,
+            mgps_score=float(self.mgps_score[i]),
+            mgps_lower_ci=float(self.mgps_lower_ci[i]),
+            mgps_upper_ci=float(self.mgps_upper_ci[i]),
+            ebgm=float(self.ebgm[i]),
+            ebgm_lower_ci=float(self.ebgm_lower_ci[i]),
+            ebgm_upper_ci=float(self.ebgm_upper_ci[i]),
+            is_signal=bool(self.is_signal[i]),
+            signal_strength=STRENGTH_LEVELS[self.strength_code[i]],
+            confidence_level=float(self.confidence_level[i]),
+            fdr_adjusted_p_value=float(self.p_value[i]) if p_value is None else p_value,
+            fdr_significant=fdr_significant,
+            prior_parameters=dict(self.prior_parameters),
+            posterior_parameters={
+                "alpha": observed + self.posterior_alpha_offset,
+                "beta": expected + self.posterior_beta_offset
+            }
+        )
+
+
+@dataclass
+class GPSPrior:
+    """
+    DuMouchel two-component gamma mixture prior for the GPS model.
+    
+    λ ~ p·Gamma(alpha1, beta1) + (1 - p)·Gamma(alpha2, beta2)
+    
+    Defaults are DuMouchel's (1999) published starting values. Fitted
+    priors are persisted as JSON so the next refit can warm-start.
+    """
+    alpha1: float = 0.2
+    beta1: float = 0.1
+    alpha2: float = 2.0
+    beta2: float = 4.0
+    p: float = 1/3
+    
+    # Fit diagnostics
+    log_likelihood: Optional[float] = None
+    n_pairs: int = 0
+    iterations: int = 0
+    converged: bool = False
+    
+    @property
+    def params(self) -> np.ndarray:
+        """(alpha1, beta1, alpha2, beta2, p) as an array"""
+        return np.array([self.alpha1, self.beta1, self.alpha2, self.beta2, self.p])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for persistence/API responses"""
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GPSPrior":
+        """Create prior from dictionary (unknown keys are ignored)"""
+        prior = cls()
+        for key, value in data.items():
+            if hasattr(prior, key):
+                setattr(prior, key, value)
+        return prior
+    
+    @staticmethod
+    def default_path() -> Path:
+        """Persistence path (GPS_PRIOR_PATH env var or config/gps_prior.json)"""
+        return Path(os.getenv("GPS_PRIOR_PATH", "config/gps_prior.json"))
+    
+    def save(self, path: Optional[str] = None) -> None:
+        """Persist fitted hyperparameters to JSON."""
+        prior_path = Path(path) if path else self.default_path()
+        prior_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(prior_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional["GPSPrior"]:
+        """Load persisted hyperparameters, or None if none were saved."""
+        prior_path = Path(path) if path else cls.default_path()
+        if not prior_path.exists():
+            return None
+        try:
+            with open(prior_path, "r") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load GPS prior from {prior_path}: {e}")
+            return None
+
+
 # ============================================================================
 # BAYESIAN PRIOR ESTIMATION
 # ============================================================================
@@ -248,6 +427,135 @@ class BayesianPriorEstimator:
         
         logger.info(f"Estimated LogNormal prior: μ={mu:.3f}, σ={sigma:.3f}")
         return mu, sigma
+    
+    def estimate_gps_prior(
+        self,
+        observed_counts: np.ndarray,
+        expected_counts: np.ndarray,
+        initial: Optional[GPSPrior] = None,
+        max_iter: int = 500,
+        tol: float = 1e-9
+    ) -> GPSPrior:
+        """
+        Fit DuMouchel's two-component gamma mixture by maximum likelihood.
+        
+        Marginally each count is a mixture of two negative binomials,
+            N ~ p·NB(alpha1, beta1/(beta1 + E)) + (1 - p)·NB(alpha2, beta2/(beta2 + E))
+        truncated to N ≥ min_count (pairs below it are never scored).
+        Identical (N, E) rows are collapsed and weighted by frequency, and
+        the weighted log-likelihood and its analytic gradient are
+        evaluated in a few vectorized passes per L-BFGS-B iteration.
+        
+        Args:
+            observed_counts: Array of observed counts (N)
+            expected_counts: Array of expected counts (E)
+            initial: Starting hyperparameters, typically the last persisted
+                fit (warm start). Defaults to DuMouchel's starting values.
+            max_iter: Maximum optimizer iterations
+            tol: Relative tolerance on the objective
+            
+        Returns:
+            Fitted GPSPrior
+        """
+        start = initial or GPSPrior()
+        n_star = max(self.min_count, 1)
+        
+        mask = (observed_counts >= n_star) & (expected_counts > 0)
+        if not mask.any():
+            logger.warning("No pairs meet minimum count threshold. Keeping GPS prior.")
+            return start
+        
+        # Collapse identical (N, E) rows into frequency weights
+        pairs = np.column_stack([observed_counts[mask], expected_counts[mask]]).astype(np.float64)
+        unique_pairs, weights = np.unique(pairs, axis=0, return_counts=True)
+        N, E = unique_pairs[:, 0], unique_pairs[:, 1]
+        weights = weights.astype(np.float64)
+        total_weight = weights.sum()
+        
+        def component(alpha: float, beta: float, n: np.ndarray):
+            """Log NB pmf and its (d/d log α, d/d log β) for every row"""
+            log_q = np.log(beta / (beta + E))
+            log_pmf = (
+                gammaln(alpha + n) - gammaln(alpha) - gammaln(n + 1)
+                + alpha * log_q + n * np.log(E / (beta + E))
+            )
+            d_log_alpha = alpha * (digamma(alpha + n) - digamma(alpha) + log_q)
+            d_log_beta = beta * (alpha / beta - (alpha + n) / (beta + E))
+            return log_pmf, d_log_alpha, d_log_beta
+        
+        def objective(theta: np.ndarray) -> Tuple[float, np.ndarray]:
+            alpha1, beta1, alpha2, beta2 = np.exp(theta[:4])
+            p = expit(theta[4])
+            
+            l1, da1, db1 = component(alpha1, beta1, N)
+            l2, da2, db2 = component(alpha2, beta2, N)
+            log_mix = np.logaddexp(np.log(p) + l1, np.log1p(-p) + l2)
+            q1 = np.exp(np.log(p) + l1 - log_mix)  # posterior weight of component 1
+            r1 = np.exp(l1 - log_mix)
+            r2 = np.exp(l2 - log_mix)
+            
+            loglik = log_mix
+            grad = [q1 * da1, q1 * db1, (1 - q1) * da2, (1 - q1) * db2, (r1 - r2) * p * (1 - p)]
+            
+            # Truncation: subtract log P(N ≥ n*) = log(1 - P(N < n*))
+            t1 = np.zeros_like(E)
+            t2 = np.zeros_like(E)
+            dt = [np.zeros_like(E) for _ in range(4)]
+            for k in range(n_star):
+                lk1, dka1, dkb1 = component(alpha1, beta1, np.full_like(E, k))
+                lk2, dka2, dkb2 = component(alpha2, beta2, np.full_like(E, k))
+                f1, f2 = np.exp(lk1), np.exp(lk2)
+                t1 += f1
+                t2 += f2
+                dt[0] += f1 * dka1
+                dt[1] += f1 * dkb1
+                dt[2] += f2 * dka2
+                dt[3] += f2 * dkb2
+            tail = np.maximum(1.0 - (p * t1 + (1 - p) * t2), 1e-300)
+            loglik = loglik - np.log(tail)
+            grad[0] = grad[0] + p * dt[0] / tail
+            grad[1] = grad[1] + p * dt[1] / tail
+            grad[2] = grad[2] + (1 - p) * dt[2] / tail
+            grad[3] = grad[3] + (1 - p) * dt[3] / tail
+            grad[4] = grad[4] + (t1 - t2) * p * (1 - p) / tail
+            
+            value = -np.dot(weights, loglik) / total_weight
+            gradient = -np.array([np.dot(weights, g) for g in grad]) / total_weight
+            return value, gradient
+        
+        p0 = float(np.clip(start.p, 1e-6, 1 - 1e-6))
+        theta0 = np.concatenate([
+            np.log([start.alpha1, start.beta1, start.alpha2, start.beta2]),
+            [np.log(p0 / (1 - p0))]
+        ])
+        bounds = [(np.log(1e-4), np.log(1e4))] * 4 + [(-12.0, 12.0)]
+        
+        with np.errstate(over="ignore", under="ignore", divide="ignore", invalid="ignore"):
+            result = minimize(
+                objective, theta0, jac=True, method="L-BFGS-B", bounds=bounds,
+                options={"maxiter": max_iter, "ftol": tol}
+            )
+        
+        alpha1, beta1, alpha2, beta2 = np.exp(result.x[:4])
+        prior = GPSPrior(
+            alpha1=float(alpha1),
+            beta1=float(beta1),
+            alpha2=float(alpha2),
+            beta2=float(beta2),
+            p=float(expit(result.x[4])),
+            log_likelihood=float(-result.fun * total_weight),
+            n_pairs=int(total_weight),
+            iterations=int(result.nit),
+            converged=bool(result.success)
+        )
+        
+        logger.info(
+            f"Fitted GPS prior in {prior.iterations} iterations "
+            f"({len(N)} unique of {prior.n_pairs} pairs, warm start: {initial is not None}): "
+            f"α1={prior.alpha1:.3f}, β1={prior.beta1:.3f}, "
+            f"α2={prior.alpha2:.3f}, β2={prior.beta2:.3f}, p={prior.p:.3f}"
+        )
+        return prior
 
 
 # ============================================================================
@@ -272,6 +580,11 @@ class MGPSCalculator:
     Confidence intervals are calculated using the posterior Gamma distribution.
     """
     
+    CI_QUANTILES = (0.025, 0.975)
+    
+    # Observed counts below this size use a memoized quantile table
+    QUANTILE_TABLE_SIZE = 1024
+    
     def __init__(self, alpha: float = 2.0, beta: float = 4.0):
         """
         Args:
@@ -280,6 +593,8 @@ class MGPSCalculator:
         """
         self.alpha = alpha
         self.beta = beta
+        self._quantile_table: Optional[np.ndarray] = None
+        self._quantile_table_alpha: Optional[float] = None
         
     def calculate(
         self,
@@ -309,6 +624,69 @@ class MGPSCalculator:
         
         return mgps, lower_ci, upper_ci
     
+    def calculate_batch(
+        self,
+        observed: np.ndarray,
+        expected: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized MGPS scores and 95% credibility intervals.
+        
+        The posterior is Gamma(N + α, rate=E + β), so each quantile is the
+        standard-gamma quantile of shape N + α divided by E + β. Those
+        shape-only quantiles are read from a memoized table for integer
+        N < QUANTILE_TABLE_SIZE and computed with one gammaincinv call for
+        everything else.
+        
+        Args:
+            observed: Observed counts (N)
+            expected: Expected counts (E)
+            
+        Returns:
+            (mgps_scores, lower_ci, upper_ci) arrays in input order
+        """
+        observed = np.atleast_1d(np.asarray(observed, dtype=np.float64))
+        expected = np.atleast_1d(np.asarray(expected, dtype=np.float64))
+        
+        alpha_post = observed + self.alpha
+        beta_post = expected + self.beta
+        
+        mgps = alpha_post / beta_post
+        
+        table = self._get_quantile_table()
+        standard_q = np.empty((len(observed), 2))
+        
+        in_table = (
+            (observed >= 0)
+            & (observed < len(table))
+            & (observed == np.floor(observed))
+        )
+        standard_q[in_table] = table[observed[in_table].astype(np.int64)]
+        
+        rest = ~in_table
+        if rest.any():
+            shape = alpha_post[rest][:, None]
+            standard_q[rest] = gammaincinv(shape, np.array(self.CI_QUANTILES)[None, :])
+        
+        lower_ci = standard_q[:, 0] / beta_post
+        upper_ci = standard_q[:, 1] / beta_post
+        
+        return mgps, lower_ci, upper_ci
+    
+    def _get_quantile_table(self) -> np.ndarray:
+        """
+        Standard-gamma 2.5%/97.5% quantiles for shapes N + α, N = 0..size-1.
+        
+        Rebuilt only when α changes (e.g. after prior re-estimation).
+        """
+        if self._quantile_table is None or self._quantile_table_alpha != self.alpha:
+            shapes = np.arange(self.QUANTILE_TABLE_SIZE, dtype=np.float64) + self.alpha
+            self._quantile_table = gammaincinv(
+                shapes[:, None], np.array(self.CI_QUANTILES)[None, :]
+            )
+            self._quantile_table_alpha = self.alpha
+        return self._quantile_table
+    
     def is_signal(
         self,
         mgps_score: float,
@@ -349,16 +727,36 @@ class EBGMCalculator:
     
     EB05 (5th percentile) is typically used for signal detection:
         Signal if EB05 > 2.0
+    
+    Two integration methods are available:
+    - "quadrature" (default): deterministic, vectorized integration of
+      the posterior on a fixed grid (see calculate_batch)
+    - "monte_carlo": the original 10,000-sample importance sampler
     """
     
-    def __init__(self, mu: float = 0.0, sigma: float = 1.0):
+    # Fixed grid in standardized posterior units (Laplace scale). The left
+    # side is wider because log λ | N has an exponential left tail.
+    QUADRATURE_GRID = np.linspace(-12.0, 8.0, 121)
+    NEWTON_ITERATIONS = 30
+    BATCH_CHUNK_SIZE = 16384
+    
+    def __init__(
+        self,
+        mu: float = 0.0,
+        sigma: float = 1.0,
+        method: str = "quadrature"
+    ):
         """
         Args:
             mu: LogNormal prior mean (for log λ)
             sigma: LogNormal prior standard deviation
+            method: "quadrature" or "monte_carlo"
         """
+        if method not in ("quadrature", "monte_carlo"):
+            raise ValueError(f"Unknown EBGM method: {method}")
         self.mu = mu
         self.sigma = sigma
+        self.method = method
         
     def calculate(
         self,
@@ -369,6 +767,164 @@ class EBGMCalculator:
         """
         Calculate EBGM with EB05 and EB95.
         
+        Args:
+            observed: Observed count (N)
+            expected: Expected count (E)
+            n_samples: Number of Monte Carlo samples (monte_carlo only)
+            
+        Returns:
+            (ebgm, eb05, eb95)
+        """
+        if self.method == "quadrature":
+            ebgm, eb05, eb95 = self.calculate_batch(
+                np.array([observed]), np.array([expected])
+            )
+            return float(ebgm[0]), float(eb05[0]), float(eb95[0])
+        
+        return self._calculate_monte_carlo(observed, expected, n_samples)
+    
+    def calculate_batch(
+        self,
+        observed: np.ndarray,
+        expected: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Deterministic EBGM, EB05 and EB95 for arrays of (N, E).
+        
+        For θ = log λ the unnormalized log posterior is
+            f(θ) = N·θ - E·e^θ - (θ - μ)² / (2σ²)
+        which is strictly concave. Its mode m is found with a vectorized
+        Newton iteration, and the posterior is integrated on the fixed
+        grid θ = m + s·z with s = 1/sqrt(-f''(m)). E[θ] (geometric mean)
+        uses the trapezoid rule; the posterior CDF uses the
+        Euler-Maclaurin corrected trapezoid and is inverted for EB05/EB95.
+        Results are bit-for-bit repeatable and need no random sampling.
+        
+        Args:
+            observed: Observed counts (N)
+            expected: Expected counts (E)
+            
+        Returns:
+            (ebgm, eb05, eb95) arrays in input order
+        """
+        observed = np.atleast_1d(np.asarray(observed, dtype=np.float64))
+        expected = np.atleast_1d(np.asarray(expected, dtype=np.float64))
+        
+        ebgm = np.empty(len(observed))
+        eb05 = np.empty(len(observed))
+        eb95 = np.empty(len(observed))
+        
+        for start in range(0, len(observed), self.BATCH_CHUNK_SIZE):
+            chunk = slice(start, start + self.BATCH_CHUNK_SIZE)
+            ebgm[chunk], eb05[chunk], eb95[chunk] = self._quadrature_chunk(
+                observed[chunk], expected[chunk]
+            )
+        
+        return ebgm, eb05, eb95
+    
+    def _quadrature_chunk(
+        self,
+        N: np.ndarray,
+        E: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Posterior integration for one chunk of pairs"""
+        E = np.maximum(E, 1e-12)
+        precision = 1.0 / (self.sigma ** 2)
+        
+        # Newton on f'(θ) = N - E·e^θ - (θ - μ)/σ². f' is concave and
+        # decreasing, so starting right of the root (θ* ≤ max(μ, log(N/E)))
+        # the iterates decrease monotonically onto the mode. A fixed
+        # iteration count keeps every pair independent of its chunk.
+        theta = np.maximum(self.mu, np.log(np.maximum(N, 1e-12) / E))
+        for _ in range(self.NEWTON_ITERATIONS):
+            rate = E * np.exp(theta)
+            theta = theta + (N - rate - (theta - self.mu) * precision) / (rate + precision)
+        
+        scale = 1.0 / np.sqrt(E * np.exp(theta) + precision)
+        
+        # Posterior on the grid: rows are pairs, columns grid points
+        grid = theta[:, None] + scale[:, None] * self.QUADRATURE_GRID[None, :]
+        rate = E[:, None] * np.exp(grid)
+        log_post = N[:, None] * grid - rate - 0.5 * precision * (grid - self.mu) ** 2
+        log_post -= log_post.max(axis=1, keepdims=True)
+        density = np.exp(log_post)
+        
+        # d(density)/dz on the standardized grid, known in closed form
+        slope = density * (N[:, None] - rate - precision * (grid - self.mu)) * scale[:, None]
+        
+        # Trapezoid weights (uniform grid, so spacing cancels on normalizing)
+        weights = density.copy()
+        weights[:, 0] *= 0.5
+        weights[:, -1] *= 0.5
+        weights /= weights.sum(axis=1, keepdims=True)
+        
+        ebgm = np.exp(np.sum(weights * grid, axis=1))
+        
+        # Posterior CDF at the grid points: trapezoid plus the Euler-Maclaurin
+        # end correction, which is exact for a cubic density per segment
+        dz = self.QUADRATURE_GRID[1] - self.QUADRATURE_GRID[0]
+        segment_mass = (
+            0.5 * dz * (density[:, 1:] + density[:, :-1])
+            + dz * dz / 12.0 * (slope[:, :-1] - slope[:, 1:])
+        )
+        cdf = np.concatenate(
+            [np.zeros((len(N), 1)), np.cumsum(segment_mass, axis=1)], axis=1
+        )
+        total = cdf[:, -1:].copy()
+        cdf /= total
+        density_dz = density * dz / total
+        
+        eb05 = np.exp(self._grid_quantile(grid, cdf, density_dz, 0.05))
+        eb95 = np.exp(self._grid_quantile(grid, cdf, density_dz, 0.95))
+        
+        return ebgm, eb05, eb95
+    
+    @staticmethod
+    def _grid_quantile(
+        grid: np.ndarray,
+        cdf: np.ndarray,
+        density_dz: np.ndarray,
+        q: float
+    ) -> np.ndarray:
+        """
+        Row-wise q-quantile of a gridded posterior.
+        
+        Within the bracketing segment the CDF is modelled as the cubic
+        Hermite interpolant of its values and slopes (the density) and
+        inverted with a few Newton steps.
+        """
+        rows = np.arange(len(grid))
+        upper = np.clip((cdf < q).sum(axis=1), 1, grid.shape[1] - 1)
+        lower = upper - 1
+        
+        c0, c1 = cdf[rows, lower], cdf[rows, upper]
+        m0, m1 = density_dz[rows, lower], density_dz[rows, upper]
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(np.where(c1 > c0, (q - c0) / (c1 - c0), 0.0), 0.0, 1.0)
+            for _ in range(4):
+                t2, t3 = t * t, t * t * t
+                value = (
+                    (2*t3 - 3*t2 + 1) * c0 + (t3 - 2*t2 + t) * m0
+                    + (-2*t3 + 3*t2) * c1 + (t3 - t2) * m1
+                )
+                deriv = (
+                    (6*t2 - 6*t) * c0 + (3*t2 - 4*t + 1) * m0
+                    + (-6*t2 + 6*t) * c1 + (3*t2 - 2*t) * m1
+                )
+                t = np.clip(np.where(deriv > 0, t - (value - q) / deriv, t), 0.0, 1.0)
+        
+        return grid[rows, lower] + t * (grid[rows, upper] - grid[rows, lower])
+    
+    def _calculate_monte_carlo(
+        self,
+        observed: int,
+        expected: float,
+        n_samples: int = 10000
+    ) -> Tuple[float, float, float]:
+        """
+        Calculate EBGM with EB05 and EB95.
+        
         Uses Monte Carlo integration to compute the posterior.
         
         Args:
@@ -429,6 +985,121 @@ class EBGMCalculator:
         return eb05 > threshold
 
 
+# ============================================================================
+# GPS (DUMOUCHEL GAMMA-POISSON SHRINKER)
+# ============================================================================
+
+class GPSCalculator:
+    """
+    EBGM under DuMouchel's Gamma-Poisson Shrinker (two-gamma mixture prior).
+    
+    Given a GPSPrior, the posterior of λ for a pair (N, E) is the mixture
+        Q·Gamma(alpha1 + N, beta1 + E) + (1 - Q)·Gamma(alpha2 + N, beta2 + E)
+    with Q the posterior probability of the first component. Everything is
+    closed form except the EB05/EB95 mixture quantiles, which are found by
+    vectorized bisection between the component quantiles.
+    """
+    
+    BISECTION_ITERATIONS = 60
+    
+    def __init__(self, prior: Optional[GPSPrior] = None):
+        """
+        Args:
+            prior: Fitted mixture prior (defaults to DuMouchel's start values)
+        """
+        self.prior = prior or GPSPrior()
+    
+    def calculate(
+        self,
+        observed: int,
+        expected: float
+    ) -> Tuple[float, float, float]:
+        """
+        Calculate EBGM with EB05 and EB95.
+        
+        Args:
+            observed: Observed count (N)
+            expected: Expected count (E)
+            
+        Returns:
+            (ebgm, eb05, eb95)
+        """
+        ebgm, eb05, eb95 = self.calculate_batch(np.array([observed]), np.array([expected]))
+        return float(ebgm[0]), float(eb05[0]), float(eb95[0])
+    
+    def calculate_batch(
+        self,
+        observed: np.ndarray,
+        expected: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized EBGM, EB05 and EB95 for arrays of (N, E).
+        
+        Returns:
+            (ebgm, eb05, eb95) arrays in input order
+        """
+        N = np.atleast_1d(np.asarray(observed, dtype=np.float64))
+        E = np.maximum(np.atleast_1d(np.asarray(expected, dtype=np.float64)), 1e-12)
+        prior = self.prior
+        
+        # Posterior component weight Q from the two negative binomial marginals
+        def log_nb(alpha: float, beta: float) -> np.ndarray:
+            return (
+                gammaln(alpha + N) - gammaln(alpha) - gammaln(N + 1)
+                + alpha * np.log(beta / (beta + E)) + N * np.log(E / (beta + E))
+            )
+        
+        l1 = np.log(prior.p) + log_nb(prior.alpha1, prior.beta1)
+        l2 = np.log1p(-prior.p) + log_nb(prior.alpha2, prior.beta2)
+        q = np.exp(l1 - np.logaddexp(l1, l2))
+        
+        shape1, rate1 = prior.alpha1 + N, prior.beta1 + E
+        shape2, rate2 = prior.alpha2 + N, prior.beta2 + E
+        
+        # EBGM = exp(E[log λ]); E[log λ] under Gamma(a, b) is ψ(a) - log b
+        expected_log = (
+            q * (digamma(shape1) - np.log(rate1))
+            + (1 - q) * (digamma(shape2) - np.log(rate2))
+        )
+        ebgm = np.exp(expected_log)
+        
+        eb05 = self._mixture_quantile(q, shape1, rate1, shape2, rate2, 0.05)
+        eb95 = self._mixture_quantile(q, shape1, rate1, shape2, rate2, 0.95)
+        
+        return ebgm, eb05, eb95
+    
+    def _mixture_quantile(
+        self,
+        q: np.ndarray,
+        shape1: np.ndarray,
+        rate1: np.ndarray,
+        shape2: np.ndarray,
+        rate2: np.ndarray,
+        level: float
+    ) -> np.ndarray:
+        """Quantile of the posterior gamma mixture by bisection on log λ"""
+        x1 = gammaincinv(shape1, level) / rate1
+        x2 = gammaincinv(shape2, level) / rate2
+        
+        # The mixture quantile lies between the component quantiles
+        lo = np.log(np.maximum(np.minimum(x1, x2), 1e-300))
+        hi = np.log(np.maximum(np.maximum(x1, x2), 1e-300))
+        
+        for _ in range(self.BISECTION_ITERATIONS):
+            mid = 0.5 * (lo + hi)
+            lam = np.exp(mid)
+            cdf = q * gammainc(shape1, rate1 * lam) + (1 - q) * gammainc(shape2, rate2 * lam)
+            below = cdf < level
+            lo = np.where(below, mid, lo)
+            hi = np.where(below, hi, mid)
+        
+        return np.exp(0.5 * (lo + hi))
+    
+    def is_signal(self, eb05: float, threshold: float = 2.0) -> bool:
+        """FDA standard criterion: EB05 > 2.0"""
+        return eb05 > threshold
+
+
 # ============================================================================
 # FALSE DISCOVERY RATE (FDR) CONTROL
 # ============================================================================
@@ -464,20 +1135,20 @@ class FDRController:
         
         elif method == "bh":
             # Benjamini-Hochberg (less conservative, controls FDR)
+            if n == 0:
+                return np.zeros(0)
+            
             # Sort p-values
             sorted_indices = np.argsort(p_values)
             sorted_p = p_values[sorted_indices]
             
-            # Calculate adjusted p-values
-            adjusted = np.zeros(n)
-            adjusted[sorted_indices[-1]] = sorted_p[-1]
+            # Adjusted p-values: running minimum of p·n/rank from the top
+            scaled = sorted_p * n / np.arange(1, n + 1)
+            scaled[-1] = sorted_p[-1]
+            adjusted_sorted = np.minimum.accumulate(scaled[::-1])[::-1]
             
-            for i in range(n - 2, -1, -1):
-                idx = sorted_indices[i]
-                adjusted[idx] = min(
-                    sorted_p[i] * n / (i + 1),
-                    adjusted[sorted_indices[i + 1]]
-                )
+            adjusted = np.empty(n)
+            adjusted[sorted_indices] = adjusted_sorted
             
             return np.minimum(adjusted, 1.0)
         
@@ -513,6 +1184,20 @@ class FDRController:
             p_value = 0.5 + 0.5 * (1 - np.exp(-deficit))
         
         return np.clip(p_value, 1e-10, 1.0)
+    
+    @staticmethod
+    def calculate_p_values_from_ci(
+        lower_ci: np.ndarray,
+        threshold: float = 2.0
+    ) -> np.ndarray:
+        """Vectorized calculate_p_value_from_ci()"""
+        with np.errstate(over="ignore"):
+            p_values = np.where(
+                lower_ci > threshold,
+                np.exp(-(lower_ci - threshold)),
+                0.5 + 0.5 * (1 - np.exp(-(threshold - lower_ci)))
+            )
+        return np.clip(p_values, 1e-10, 1.0)
 
 
 # ============================================================================
@@ -573,6 +1258,31 @@ class SignalStrengthClassifier:
         
         # No Signal
         return SignalStrength.NONE, 0.25
+    
+    @staticmethod
+    def classify_batch(
+        eb05: np.ndarray,
+        observed: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized classify(); same rules in the same precedence order.
+        
+        Returns:
+            (strength_code, confidence) arrays, where strength_code
+            indexes STRENGTH_LEVELS
+        """
+        strength_code = np.select(
+            [
+                (eb05 > 4.0) & (observed >= 10),
+                (eb05 > 2.0) & (observed >= 5),
+                (eb05 > 1.5) & (observed >= 3),
+                eb05 > 1.0,
+            ],
+            [4, 3, 2, 1],
+            default=0
+        ).astype(np.int8)
+        confidence = np.array([0.25, 0.50, 0.70, 0.85, 0.95])[strength_code]
+        return strength_code, confidence
 
 
 # ============================================================================
@@ -593,7 +1303,9 @@ class BayesianSignalDetector:
         alpha: Optional[float] = None,
         beta: Optional[float] = None,
         mu: Optional[float] = None,
-        sigma: Optional[float] = None
+        sigma: Optional[float] = None,
+        ebgm_method: str = "quadrature",
+        gps_prior_path: Optional[str] = None
     ):
         """
         Args:
@@ -602,13 +1314,27 @@ class BayesianSignalDetector:
             beta: MGPS prior rate (if None, estimated from data)
             mu: EBGM prior mean (if None, estimated from data)
             sigma: EBGM prior std (if None, estimated from data)
+            ebgm_method: "quadrature" or "monte_carlo" (log-normal prior), or
+                "gps" for DuMouchel's two-gamma mixture prior
+            gps_prior_path: Where fitted GPS hyperparameters are persisted
+                (defaults to GPSPrior.default_path()); only used for "gps"
         """
         self.min_count = min_count
+        self.ebgm_method = ebgm_method
+        self.gps_prior_path = gps_prior_path
         
         # Initialize components
         self.prior_estimator = BayesianPriorEstimator(min_count)
         self.mgps_calculator = MGPSCalculator(alpha or 2.0, beta or 4.0)
-        self.ebgm_calculator = EBGMCalculator(mu or 0.0, sigma or 1.0)
+        self.ebgm_calculator = EBGMCalculator(
+            mu or 0.0, sigma or 1.0,
+            method="quadrature" if ebgm_method == "gps" else ebgm_method
+        )
+        
+        # GPS mode starts from the last persisted fit, if any
+        self.gps_calculator: Optional[GPSCalculator] = None
+        if ebgm_method == "gps":
+            self.gps_calculator = GPSCalculator(GPSPrior.load(gps_prior_path))
         self.fdr_controller = FDRController()
         self.classifier = SignalStrengthClassifier()
         
@@ -632,6 +1358,29 @@ class BayesianSignalDetector:
         observed = np.array([ct.n11 for ct in contingency_tables])
         expected = np.array([ct.expected for ct in contingency_tables])
         
+        return self.estimate_priors_from_counts(observed, expected)
+    
+    def estimate_priors_from_counts(
+        self,
+        observed: np.ndarray,
+        expected: np.ndarray
+    ) -> Dict[str, float]:
+        """
+        Estimate prior distributions from observed/expected count arrays.
+        
+        Same as estimate_priors() for callers that already hold the counts
+        column-wise.
+        
+        Args:
+            observed: Observed counts (N) for all drug-event pairs
+            expected: Expected counts (E) for all drug-event pairs
+            
+        Returns:
+            Dictionary of estimated prior parameters
+        """
+        observed = np.asarray(observed)
+        expected = np.asarray(expected, dtype=np.float64)
+        
         # Estimate Gamma prior for MGPS
         alpha, beta = self.prior_estimator.estimate_gamma_prior(observed, expected)
         self.mgps_calculator.alpha = alpha
@@ -642,14 +1391,55 @@ class BayesianSignalDetector:
         self.ebgm_calculator.mu = mu
         self.ebgm_calculator.sigma = sigma
         
-        self.priors_estimated = True
-        
-        return {
+        priors = {
             "mgps_alpha": alpha,
             "mgps_beta": beta,
             "ebgm_mu": mu,
             "ebgm_sigma": sigma
         }
+        
+        # Refit the GPS mixture, warm-started from the previous fit, and
+        # persist it for the next run when the fit moved
+        if self.gps_calculator is not None:
+            previous = self.gps_calculator.prior if self.gps_calculator.prior.converged else None
+            gps_prior = self.prior_estimator.estimate_gps_prior(
+                observed, expected, initial=previous
+            )
+            self.gps_calculator.prior = gps_prior
+            if self._gps_prior_changed(previous, gps_prior):
+                try:
+                    gps_prior.save(self.gps_prior_path)
+                except OSError as e:
+                    logger.warning(f"Could not persist GPS prior: {e}")
+            priors.update({
+                "gps_alpha1": gps_prior.alpha1,
+                "gps_beta1": gps_prior.beta1,
+                "gps_alpha2": gps_prior.alpha2,
+                "gps_beta2": gps_prior.beta2,
+                "gps_p": gps_prior.p
+            })
+        
+        self.priors_estimated = True
+        
+        return priors
+    
+    @staticmethod
+    def _gps_prior_changed(previous: Optional[GPSPrior], fitted: GPSPrior) -> bool:
+        """
+        Whether a refit is worth persisting.
+        
+        A warm-started refit on unchanged counts lands back on the same
+        likelihood (the parameters may wander slightly along a flat
+        ridge), so the fit only counts as changed when the data size or
+        the maximized log-likelihood moved.
+        """
+        if not fitted.converged:
+            return False
+        if previous is None or previous.log_likelihood is None:
+            return True
+        return fitted.n_pairs != previous.n_pairs or not np.isclose(
+            fitted.log_likelihood, previous.log_likelihood, rtol=1e-6, atol=1e-6
+        )
     
     def detect_signal(
         self,
@@ -681,8 +1471,31 @@ class BayesianSignalDetector:
         )
         
         # Calculate EBGM
-        ebgm, eb05, eb95 = self.ebgm_calculator.calculate(observed, expected)
+        if self.gps_calculator is not None:
+            ebgm, eb05, eb95 = self.gps_calculator.calculate(observed, expected)
+        else:
+            ebgm, eb05, eb95 = self.ebgm_calculator.calculate(observed, expected)
         
+        return self._build_signal(
+            drug, event, observed, expected,
+            mgps_score, mgps_lower, mgps_upper,
+            ebgm, eb05, eb95
+        )
+    
+    def _build_signal(
+        self,
+        drug: str,
+        event: str,
+        observed: int,
+        expected: float,
+        mgps_score: float,
+        mgps_lower: float,
+        mgps_upper: float,
+        ebgm: float,
+        eb05: float,
+        eb95: float
+    ) -> BayesianSignal:
+        """Classify a pair from its MGPS/EBGM estimates and build the result"""
         # Classify signal strength
         strength, confidence = self.classifier.classify(
             mgps_score, mgps_lower, ebgm, eb05, observed, expected
@@ -710,18 +1523,35 @@ class BayesianSignalDetector:
             confidence_level=confidence,
             fdr_adjusted_p_value=p_value,  # Will be adjusted later in batch
             fdr_significant=False,  # Will be set in batch processing
-            prior_parameters={
-                "mgps_alpha": self.mgps_calculator.alpha,
-                "mgps_beta": self.mgps_calculator.beta,
-                "ebgm_mu": self.ebgm_calculator.mu,
-                "ebgm_sigma": self.ebgm_calculator.sigma
-            },
+            prior_parameters=self._prior_parameters(),
             posterior_parameters={
                 "alpha": observed + self.mgps_calculator.alpha,
                 "beta": expected + self.mgps_calculator.beta
             }
         )
     
+    def _prior_parameters(self) -> Dict[str, float]:
+        """Prior hyperparameters currently in use"""
+        params = {
+            "mgps_alpha": self.mgps_calculator.alpha,
+            "mgps_beta": self.mgps_calculator.beta,
+        }
+        if self.gps_calculator is not None:
+            prior = self.gps_calculator.prior
+            params.update({
+                "gps_alpha1": prior.alpha1,
+                "gps_beta1": prior.beta1,
+                "gps_alpha2": prior.alpha2,
+                "gps_beta2": prior.beta2,
+                "gps_p": prior.p
+            })
+        else:
+            params.update({
+                "ebgm_mu": self.ebgm_calculator.mu,
+                "ebgm_sigma": self.ebgm_calculator.sigma
+            })
+        return params
+    
     def detect_signals_batch(
         self,
         drug_event_pairs: List[Tuple[str, str, ContingencyTable]],
@@ -744,20 +1574,19 @@ class BayesianSignalDetector:
             contingency_tables = [ct for _, _, ct in drug_event_pairs]
             self.estimate_priors(contingency_tables)
         
-        # Detect signals for each pair
-        signals = []
-        p_values = []
+        observed = np.array([ct.n11 for _, _, ct in drug_event_pairs], dtype=np.int64)
+        expected = np.array([ct.expected for _, _, ct in drug_event_pairs], dtype=np.float64)
+        batch = self.analyze_batch(observed, expected)
         
-        for drug, event, ct in drug_event_pairs:
-            signal = self.detect_signal(drug, event, ct)
-            signals.append(signal)
-            p_values.append(signal.fdr_adjusted_p_value)
+        signals = [
+            batch.to_signal(i, drug, event)
+            for i, (drug, event, _) in enumerate(drug_event_pairs)
+        ]
+        p_values = batch.p_value
         
         # Apply FDR correction
         if len(p_values) > 0:
-            adjusted_p_values = self.fdr_controller.adjust_p_values(
-                np.array(p_values)
-            )
+            adjusted_p_values = self.fdr_controller.adjust_p_values(p_values)
             
             for i, signal in enumerate(signals):
                 signal.fdr_adjusted_p_value = adjusted_p_values[i]
@@ -768,6 +1597,79 @@ class BayesianSignalDetector:
         
         return signals
     
+    def analyze_batch(
+        self,
+        observed: np.ndarray,
+        expected: np.ndarray
+    ) -> BayesianBatchResult:
+        """
+        Score many pairs column-wise without building BayesianSignal objects.
+        
+        Applies the same min_count gate, estimators, classification and
+        p-value approximation as detect_signal(); no FDR adjustment is made.
+        
+        Args:
+            observed: Observed counts (N), one per pair
+            expected: Expected counts (E), one per pair
+            
+        Returns:
+            BayesianBatchResult with one row per pair
+        """
+        observed = np.asarray(observed, dtype=np.int64)
+        expected = np.asarray(expected, dtype=np.float64)
+        n = len(observed)
+        active = observed >= self.min_count
+        
+        mgps = np.zeros((3, n))
+        ebgm = np.zeros((3, n))
+        
+        # MGPS and quadrature/GPS EBGM are vectorized, so evaluate all
+        # active pairs at once
+        mgps[:, active] = self.mgps_calculator.calculate_batch(
+            observed[active], expected[active]
+        )
+        if self.gps_calculator is not None:
+            ebgm[:, active] = self.gps_calculator.calculate_batch(
+                observed[active], expected[active]
+            )
+        elif self.ebgm_calculator.method == "quadrature":
+            ebgm[:, active] = self.ebgm_calculator.calculate_batch(
+                observed[active], expected[active]
+            )
+        else:
+            for i in np.flatnonzero(active):
+                ebgm[:, i] = self.ebgm_calculator.calculate(
+                    int(observed[i]), float(expected[i])
+                )
+        
+        eb05 = ebgm[1]
+        strength_code, confidence = self.classifier.classify_batch(eb05, observed)
+        p_value = self.fdr_controller.calculate_p_values_from_ci(eb05)
+        
+        # Low-count pairs are reported as 'no signal'
+        strength_code[~active] = 0
+        confidence[~active] = 0.0
+        p_value[~active] = 1.0
+        
+        return BayesianBatchResult(
+            observed_count=observed,
+            expected_count=expected,
+            active=active,
+            mgps_score=mgps[0],
+            mgps_lower_ci=mgps[1],
+            mgps_upper_ci=mgps[2],
+            ebgm=ebgm[0],
+            ebgm_lower_ci=eb05,
+            ebgm_upper_ci=ebgm[2],
+            is_signal=active & (eb05 > 2.0),
+            strength_code=strength_code,
+            confidence_level=confidence,
+            p_value=p_value,
+            prior_parameters=self._prior_parameters(),
+            posterior_alpha_offset=self.mgps_calculator.alpha,
+            posterior_beta_offset=self.mgps_calculator.beta
+        )
+    
     def _create_no_signal(
         self,
         drug: str,
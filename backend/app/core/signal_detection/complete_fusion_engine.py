@@ -12,10 +12,14 @@ All thresholds and weights are configurable via the config system.
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import logging
+import threading
+
+import numpy as np
 
 from .unified_signal_detection import (
     UnifiedSignalResult,
@@ -70,6 +74,174 @@ class QuantumComponents:
     quantum_score_layer2: float = 0.0
 
 
+# Outcome codes used by the columnar path, in the precedence order of
+# SingleSourceQuantumScorer._calculate_seriousness_score
+OUTCOME_NONE, OUTCOME_DEATH, OUTCOME_HOSPITALIZATION, OUTCOME_DISABILITY = 0, 1, 2, 3
+
+_SERIOUS_FLAGS = ("1", "yes", "y", "true", "serious")
+_DEATH_TERMS = ("death", "fatal", "died", "deceased")
+_HOSPITALIZATION_TERMS = ("hospital", "hospitalized", "life", "threatening")
+_DISABILITY_TERMS = ("disability", "disabled", "permanent")
+
+
+def _outcome_code(outcome: Any) -> int:
+    if outcome is None:
+        return OUTCOME_NONE
+    outcome_str = str(outcome).lower()
+    if any(term in outcome_str for term in _DEATH_TERMS):
+        return OUTCOME_DEATH
+    if any(term in outcome_str for term in _HOSPITALIZATION_TERMS):
+        return OUTCOME_HOSPITALIZATION
+    if any(term in outcome_str for term in _DISABILITY_TERMS):
+        return OUTCOME_DISABILITY
+    return OUTCOME_NONE
+
+
+def _to_datetime64(value: Optional[datetime]) -> np.datetime64:
+    """Naive datetime64[us]; aware datetimes are converted to naive UTC"""
+    if value is None:
+        return np.datetime64("NaT", "us")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, "us")
+
+
+@dataclass
+class FusionSignalColumns:
+    """
+    Columnar inputs for CompleteFusionEngine.detect_signals_columnar.
+    
+    Per-signal arrays have one entry per signal. Source lists are stored
+    flattened: source_row[k] is the signal that source k belongs to.
+    """
+    drugs: Sequence[str]
+    events: Sequence[str]
+    count: np.ndarray
+    fraction_count: np.ndarray  # Denominator of the serious fraction (count, or 1 if absent)
+    serious_count: np.ndarray
+    serious_flag: np.ndarray  # Seriousness flag set
+    outcome_code: np.ndarray  # OUTCOME_* code
+    most_recent: np.ndarray  # datetime64[us] of latest case date, NaT if none
+    
+    # Layer 2 inputs
+    has_layer2: np.ndarray  # Whether Layer 2 applies (sources given or present)
+    severity: np.ndarray
+    burst: np.ndarray
+    mechanism: np.ndarray
+    novelty_date: np.ndarray  # datetime64[us] of most_recent_date, NaT if none
+    is_labeled: np.ndarray  # Reaction is on-label
+    has_sources: np.ndarray  # Signal carries a non-empty sources list
+    unique_source_count: np.ndarray
+    
+    # Flattened sources
+    source_row: np.ndarray
+    source_type: np.ndarray  # Index into source_types
+    source_confidence: np.ndarray
+    source_strength: np.ndarray
+    source_types: List[str]
+    
+    def __len__(self) -> int:
+        return len(self.count)
+    
+    @classmethod
+    def from_signals(
+        cls,
+        signals: List[Dict[str, Any]],
+        layer1: "SingleSourceQuantumScorer",
+        layer2: "MultiSourceQuantumScorer",
+        sources: Optional[List[str]] = None,
+        label_reactions: Optional[List[str]] = None,
+    ) -> "FusionSignalColumns":
+        """
+        Extract columns from signal dicts in one pass.
+        
+        Strings (seriousness, outcome, dates, source names, label
+        matching) are interpreted here exactly as the scalar scorers do,
+        so the columnar scores match detect_signal().
+        """
+        n = len(signals)
+        count = np.asarray([s.get("count", 0) for s in signals])
+        fraction_count = np.empty(n)
+        serious_count = np.empty(n)
+        serious_flag = np.zeros(n, dtype=bool)
+        outcome_code = np.zeros(n, dtype=np.int8)
+        most_recent = np.empty(n, dtype="datetime64[us]")
+        has_layer2 = np.zeros(n, dtype=bool)
+        severity = np.zeros(n)
+        burst = np.zeros(n)
+        mechanism = np.full(n, 0.5)
+        novelty_date = np.empty(n, dtype="datetime64[us]")
+        is_labeled = np.zeros(n, dtype=bool)
+        has_sources = np.zeros(n, dtype=bool)
+        unique_source_count = np.zeros(n, dtype=np.int64)
+        
+        source_row: List[int] = []
+        source_type: List[int] = []
+        source_confidence: List[float] = []
+        source_strength: List[float] = []
+        type_ids: Dict[str, int] = {}
+        
+        for i, signal in enumerate(signals):
+            fraction_count[i] = signal.get("count", 1)
+            serious_count[i] = signal.get("serious_count", 0)
+            
+            seriousness = signal.get("seriousness")
+            if seriousness is not None:
+                serious_flag[i] = str(seriousness).lower().strip() in _SERIOUS_FLAGS
+            outcome_code[i] = _outcome_code(signal.get("outcome"))
+            
+            most_recent[i] = _to_datetime64(layer1._most_recent_date(signal))
+            
+            if not (sources or "sources" in signal):
+                novelty_date[i] = np.datetime64("NaT", "us")
+                continue
+            
+            has_layer2[i] = True
+            severity[i] = layer2._compute_severity_score(signal)
+            burst[i] = signal.get("burst_score", 0.0)
+            mechanism[i] = signal.get("mechanism_score", 0.5)
+            is_labeled[i] = layer2._is_labeled(signal, label_reactions)
+            novelty_date[i] = layer2._novelty_reference_date(signal)
+            
+            signal_sources = signal.get("sources", []) if "sources" in signal else []
+            if not signal_sources:
+                continue
+            has_sources[i] = True
+            unique_source_count[i] = len(set(signal_sources))
+            confidences = signal.get("source_confidence", {})
+            strengths = signal.get("source_strength", {})
+            for source in signal_sources:
+                source_kind = layer2._infer_source_type(source, signal)
+                source_row.append(i)
+                source_type.append(type_ids.setdefault(source_kind, len(type_ids)))
+                source_confidence.append(confidences.get(source, 0.5))
+                source_strength.append(strengths.get(source, 0.5))
+        
+        return cls(
+            drugs=[s.get("drug", "") for s in signals],
+            events=[s.get("reaction", "") for s in signals],
+            count=count,
+            fraction_count=fraction_count,
+            serious_count=serious_count,
+            serious_flag=serious_flag,
+            outcome_code=outcome_code,
+            most_recent=most_recent,
+            has_layer2=has_layer2,
+            severity=severity,
+            burst=burst,
+            mechanism=mechanism,
+            novelty_date=novelty_date,
+            is_labeled=is_labeled,
+            has_sources=has_sources,
+            unique_source_count=unique_source_count,
+            source_row=np.asarray(source_row, dtype=np.int64),
+            source_type=np.asarray(source_type, dtype=np.int64),
+            source_confidence=np.asarray(source_confidence, dtype=np.float64),
+            source_strength=np.asarray(source_strength, dtype=np.float64),
+            source_types=list(type_ids),
+        )
+
+
 class SingleSourceQuantumScorer:
     """Implements the streamlit-era quantum ranking algorithm with configurable thresholds."""
 
@@ -134,24 +306,11 @@ class SingleSourceQuantumScorer:
     def _calculate_recency_score(self, signal: Dict[str, Any]) -> float:
         """Calculate recency score using configurable thresholds."""
         recency_cfg = self.config.recency_config
-        dates: List[datetime] = []
+        most_recent = self._most_recent_date(signal)
 
-        if "dates" in signal and isinstance(signal["dates"], list):
-            for date_item in signal["dates"]:
-                parsed = self._parse_date(date_item)
-                if parsed:
-                    dates.append(parsed)
-
-        for key in ["onset_date", "report_date"]:
-            if key in signal:
-                parsed = self._parse_date(signal[key])
-                if parsed:
-                    dates.append(parsed)
-
-        if not dates:
+        if most_recent is None:
             return 0.5
 
-        most_recent = max(dates)
         days_ago = (datetime.now() - most_recent).days
         recent_days = recency_cfg["recent_days"]
         moderate_days = recency_cfg["moderate_days"]
@@ -168,6 +327,24 @@ class SingleSourceQuantumScorer:
 
         return max(0.0, min(1.0, recency_score))
 
+    def _most_recent_date(self, signal: Dict[str, Any]) -> Optional[datetime]:
+        """Latest parseable date among dates, onset_date and report_date."""
+        dates: List[datetime] = []
+
+        if "dates" in signal and isinstance(signal["dates"], list):
+            for date_item in signal["dates"]:
+                parsed = self._parse_date(date_item)
+                if parsed:
+                    dates.append(parsed)
+
+        for key in ["onset_date", "report_date"]:
+            if key in signal:
+                parsed = self._parse_date(signal[key])
+                if parsed:
+                    dates.append(parsed)
+
+        return max(dates) if dates else None
+
     def _parse_date(self, date_val: Any) -> Optional[datetime]:
         if isinstance(date_val, datetime):
             return date_val
@@ -260,6 +437,118 @@ class SingleSourceQuantumScorer:
 
         return quantum_score, components
 
+    def calculate_quantum_scores(
+        self,
+        columns: FusionSignalColumns,
+        total_cases: int,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Columnar extract_features() + calculate_quantum_score().
+        
+        Terms are accumulated in the same order as the scalar path.
+        
+        Returns:
+            Dict of component arrays keyed like QuantumComponents fields
+        """
+        weights = self.weights
+        thresholds = self.config.interaction_thresholds
+        boosts = self.config.interaction_boosts
+        tunneling_cfg = self.config.tunneling_range
+        seriousness_weights = self.config.seriousness_weights
+        recency_cfg = self.config.recency_config
+        
+        count = columns.count.astype(np.float64)
+        
+        # Rarity
+        if total_cases > 0:
+            rarity = np.clip(1.0 - (count / total_cases), 0.0, 1.0)
+        else:
+            rarity = np.zeros(len(count))
+        
+        # Seriousness
+        outcome_weights = np.array([
+            0.0,
+            seriousness_weights["death"],
+            seriousness_weights["hospitalization"],
+            seriousness_weights["disability"],
+        ])
+        seriousness = np.where(columns.serious_flag, seriousness_weights["flag_base"], 0.0)
+        seriousness = seriousness + outcome_weights[columns.outcome_code]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(
+                columns.fraction_count > 0,
+                (columns.serious_count / columns.fraction_count) * seriousness_weights["serious_fraction"],
+                0.0,
+            )
+        seriousness = np.minimum(1.0, seriousness + fraction)
+        
+        # Recency
+        now64 = np.datetime64(now or datetime.now(), "us")
+        has_date = ~np.isnat(columns.most_recent)
+        delta = now64 - np.where(has_date, columns.most_recent, now64)
+        days_ago = (delta // np.timedelta64(1, "D")).astype(np.float64)
+        recent_days = recency_cfg["recent_days"]
+        moderate_days = recency_cfg["moderate_days"]
+        recency = np.select(
+            [days_ago <= recent_days, days_ago <= moderate_days],
+            [
+                recency_cfg["recent_weight"] - (days_ago / recent_days) * 0.5,
+                recency_cfg["moderate_weight"] - ((days_ago - recent_days) / recent_days) * 0.3,
+            ],
+            default=np.maximum(0.0, recency_cfg["old_weight"] - (days_ago - moderate_days) / 3650.0),
+        )
+        recency = np.where(has_date, np.clip(recency, 0.0, 1.0), 0.5)
+        
+        count_normalized = np.minimum(1.0, count / 10.0)
+        base_score = (
+            weights["rarity"] * rarity
+            + weights["seriousness"] * seriousness
+            + weights["recency"] * recency
+            + weights["count"] * count_normalized
+        )
+        
+        # Interaction boosts
+        def interaction(name: str, *components: np.ndarray) -> np.ndarray:
+            hit = np.logical_and.reduce([c > thresholds[name] for c in components])
+            return np.where(hit, boosts[name], 0.0)
+        
+        interaction_rare_serious = interaction("rare_serious", rarity, seriousness)
+        interaction_rare_recent = interaction("rare_recent", rarity, recency)
+        interaction_serious_recent = interaction("serious_recent", seriousness, recency)
+        interaction_all_three = interaction("all_three", rarity, seriousness, recency)
+        interaction_term = (
+            interaction_rare_serious
+            + interaction_rare_recent
+            + interaction_serious_recent
+            + interaction_all_three
+        )
+        
+        # Tunneling boost
+        tunneling_min = tunneling_cfg["min"]
+        tunneling_max = tunneling_cfg["max"]
+        boost_per_component = tunneling_cfg["boost_per_component"]
+        tunneling_boost = np.zeros(len(count))
+        for component in (rarity, seriousness, recency):
+            in_range = (tunneling_min < component) & (component <= tunneling_max)
+            tunneling_boost = np.where(in_range, tunneling_boost + boost_per_component, tunneling_boost)
+        
+        quantum_score = np.maximum(0.0, base_score + interaction_term + tunneling_boost)
+        
+        return {
+            "rarity": rarity,
+            "seriousness": seriousness,
+            "recency": recency,
+            "count_normalized": count_normalized,
+            "interaction_rare_serious": interaction_rare_serious,
+            "interaction_rare_recent": interaction_rare_recent,
+            "interaction_serious_recent": interaction_serious_recent,
+            "interaction_all_three": interaction_all_three,
+            "tunneling_boost": tunneling_boost,
+            "base_score": base_score,
+            "quantum_score_layer1": quantum_score,
+        }
+
 
 # ============================================================================
 # Layer 2: Multi-Source Quantum Scoring
@@ -317,21 +606,7 @@ class MultiSourceQuantumScorer:
 
     def _compute_frequency_score(self, count: int) -> float:
         """Calculate frequency score using configurable thresholds."""
-        if count == 0:
-            return 0.0
-        
-        thresholds = self.config.frequency_thresholds
-        # Sort thresholds in descending order
-        sorted_thresholds = sorted(
-            [(int(k), v["score"]) for k, v in thresholds.items()],
-            reverse=True
-        )
-        
-        for threshold_count, score in sorted_thresholds:
-            if count >= threshold_count:
-                return score
-        
-        return 0.0
+        return self.config.compiled.frequency_score(count)
 
     def _compute_severity_score(self, signal: Dict[str, Any]) -> float:
         if "severity" in signal:
@@ -354,15 +629,7 @@ class MultiSourceQuantumScorer:
     ) -> float:
         """Calculate novelty score using configurable thresholds."""
         novelty_cfg = self.config.novelty_config
-        reaction = signal.get("reaction", "")
-
-        # Check if on-label
-        is_labeled = False
-        if label_reactions:
-            is_labeled = any(
-                reaction.lower() in known.lower() or known.lower() in reaction.lower()
-                for known in label_reactions
-            )
+        is_labeled = self._is_labeled(signal, label_reactions)
         
         if "most_recent_date" in signal:
             try:
@@ -392,6 +659,171 @@ class MultiSourceQuantumScorer:
 
         return 0.5 if not is_labeled else 0.2
 
+    def _is_labeled(
+        self,
+        signal: Dict[str, Any],
+        label_reactions: Optional[List[str]],
+    ) -> bool:
+        """Whether the signal's reaction matches a known label reaction."""
+        reaction = signal.get("reaction", "")
+        if not label_reactions:
+            return False
+        return any(
+            reaction.lower() in known.lower() or known.lower() in reaction.lower()
+            for known in label_reactions
+        )
+
+    def _novelty_reference_date(self, signal: Dict[str, Any]) -> np.datetime64:
+        """
+        most_recent_date as datetime64, or NaT where the scalar novelty
+        score falls back to its default (missing, unparseable or tz-aware).
+        """
+        if "most_recent_date" not in signal:
+            return np.datetime64("NaT", "us")
+        try:
+            most_recent = datetime.fromisoformat(str(signal["most_recent_date"]))
+        except Exception:
+            return np.datetime64("NaT", "us")
+        if most_recent.tzinfo is not None:
+            return np.datetime64("NaT", "us")
+        return np.datetime64(most_recent, "us")
+
+    def compute_multi_source_scores(
+        self,
+        columns: FusionSignalColumns,
+        sources: Optional[List[str]] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Columnar compute_multi_source_score() for every signal.
+        
+        Rows where columns.has_layer2 is False should be ignored by the
+        caller (the scalar path leaves Layer 2 at its defaults there).
+        
+        Returns:
+            Dict of component arrays plus "quantum_score_layer2"
+        """
+        frequency = self._compute_frequency_scores(columns.count)
+        novelty = self._compute_novelty_scores(columns, now)
+        consensus = self._compute_consensus_scores(columns, sources)
+        
+        quantum_score = (
+            self.weights["frequency"] * frequency
+            + self.weights["severity"] * columns.severity
+            + self.weights["burst"] * columns.burst
+            + self.weights["novelty"] * novelty
+            + self.weights["consensus"] * consensus
+            + self.weights["mechanism"] * columns.mechanism
+        )
+        quantum_score = np.clip(quantum_score, 0.0, 1.0)
+        
+        return {
+            "frequency": frequency,
+            "severity": columns.severity,
+            "burst": columns.burst,
+            "novelty": novelty,
+            "consensus": consensus,
+            "mechanism": columns.mechanism,
+            "quantum_score_layer2": quantum_score,
+        }
+
+    def _compute_frequency_scores(self, counts: np.ndarray) -> np.ndarray:
+        """Vectorized _compute_frequency_score()."""
+        return self.config.compiled.frequency_score_batch(counts)
+
+    def _compute_novelty_scores(
+        self,
+        columns: FusionSignalColumns,
+        now: Optional[datetime] = None,
+    ) -> np.ndarray:
+        """Vectorized _compute_novelty_score()."""
+        novelty_cfg = self.config.novelty_config
+        now64 = np.datetime64(now or datetime.now(), "us")
+        
+        has_date = ~np.isnat(columns.novelty_date)
+        delta = now64 - np.where(has_date, columns.novelty_date, now64)
+        days_ago = delta // np.timedelta64(1, "D")
+        
+        off_label = np.select(
+            [
+                days_ago <= novelty_cfg["very_recent_days"],
+                days_ago <= novelty_cfg["recent_days"],
+                days_ago <= novelty_cfg["moderate_days"],
+                days_ago <= novelty_cfg["old_days"],
+            ],
+            [1.0, 0.8, 0.6, 0.4],
+            default=0.2,
+        )
+        on_label = np.select(
+            [
+                days_ago <= novelty_cfg["on_label_recent_days"],
+                days_ago <= novelty_cfg["on_label_moderate_days"],
+            ],
+            [0.6, 0.4],
+            default=0.2,
+        )
+        dated = np.where(columns.is_labeled, on_label, off_label)
+        undated = np.where(columns.is_labeled, 0.2, 0.5)
+        return np.where(has_date, dated, undated)
+
+    def _compute_consensus_scores(
+        self,
+        columns: FusionSignalColumns,
+        sources: Optional[List[str]],
+    ) -> np.ndarray:
+        """
+        Vectorized _compute_consensus_score() over the flattened sources.
+        
+        Per-signal sums are bincounts over source rows, which add in source
+        order like the scalar loop.
+        """
+        n = len(columns)
+        boost_cfg = self.config.consensus_boost
+        consensus = np.zeros(n)
+        
+        # Priority per source type; NaN for types without a priority
+        type_priority = np.array(
+            [self.source_priorities.get(t, np.nan) if t in self.source_priorities else np.nan
+             for t in columns.source_types],
+            dtype=np.float64,
+        )
+        rows = columns.source_row
+        known = ~np.isnan(type_priority[columns.source_type]) if len(rows) else np.zeros(0, dtype=bool)
+        
+        # Total priority over the distinct known types present per signal
+        pair_key = np.unique(rows[known] * max(len(columns.source_types), 1) + columns.source_type[known])
+        pair_rows = pair_key // max(len(columns.source_types), 1)
+        pair_types = pair_key % max(len(columns.source_types), 1)
+        total_priority = np.bincount(pair_rows, weights=type_priority[pair_types], minlength=n)
+        has_known = np.bincount(pair_rows, minlength=n) > 0
+        
+        # Weighted strength and high-confidence count
+        k_rows = rows[known]
+        weight = type_priority[columns.source_type[known]] / total_priority[k_rows]
+        contribution = (
+            weight * columns.source_strength[known] * np.maximum(0.1, columns.source_confidence[known])
+        )
+        weighted_strength = np.bincount(k_rows, weights=contribution, minlength=n)
+        high_conf = (
+            (columns.source_confidence[known] >= boost_cfg["high_conf_threshold"])
+            & (columns.source_strength[known] >= boost_cfg["high_conf_strength_threshold"])
+        )
+        high_conf_count = np.bincount(k_rows[high_conf], minlength=n)
+        
+        weighted = np.minimum(1.0, weighted_strength)
+        weighted = np.where(
+            high_conf_count >= boost_cfg["min_high_conf_sources"],
+            np.minimum(1.0, weighted + boost_cfg["boost_amount"]),
+            weighted,
+        )
+        
+        # Fallback: simple count-based consensus
+        available_sources = len(sources) if sources else 7
+        fallback = np.minimum(columns.unique_source_count / available_sources, 1.0)
+        
+        consensus = np.where(has_known, weighted, fallback)
+        return np.where(columns.has_sources, consensus, 0.0)
+
     def _compute_consensus_score(
         self,
         signal: Dict[str, Any],
@@ -680,50 +1112,137 @@ class CompleteFusionEngine:
         sources: Optional[List[str]] = None,
         label_reactions: Optional[List[str]] = None,
     ) -> List[CompleteFusionResult]:
+        """
+        Score and rank many signals.
+        
+        Signal dicts are converted to FusionSignalColumns once and scored
+        with detect_signals_columnar(); scores, ranks and alert levels match
+        calling detect_signal() per signal.
+        """
         if not signals:
             return []
 
         if total_cases is None:
             total_cases = sum(s.get("count", 0) for s in signals)
 
-        results: List[CompleteFusionResult] = []
-        for signal in signals:
-            result = self.detect_signal(
-                drug=signal.get("drug", ""),
-                event=signal.get("reaction", ""),
-                signal_data=signal,
-                total_cases=total_cases,
-                sources=sources,
-                label_reactions=label_reactions,
-            )
-            results.append(result)
+        columns = FusionSignalColumns.from_signals(
+            signals,
+            self.quantum_scorer_layer1,
+            self.quantum_scorer_layer2,
+            sources=sources,
+            label_reactions=label_reactions,
+        )
+        return self.detect_signals_columnar(columns, total_cases, sources=sources)
 
-        results.sort(key=lambda r: r.fusion_score, reverse=True)
+    def detect_signals_columnar(
+        self,
+        columns: FusionSignalColumns,
+        total_cases: int,
+        sources: Optional[List[str]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[CompleteFusionResult]:
+        """
+        Layer 1, Layer 2 and fusion scores for columnar signals.
+        
+        No Bayesian layer is run (the Bayesian score is the scalar path's
+        0.5 default). Results are sorted by fusion score, with quantum and
+        classical ranks assigned as in detect_signals_batch().
+        
+        Args:
+            columns: Signal columns
+            total_cases: Total cases for rarity
+            sources: Available sources (enables Layer 2 for every signal)
+            now: Reference time for recency/novelty (defaults to now)
+        """
+        n = len(columns)
+        if n == 0:
+            return []
+        now = now or datetime.now()
 
-        for i, result in enumerate(results):
-            result.quantum_rank = i + 1
-            result.percentile = 100 * (1 - i / len(results))
+        layer1 = self.quantum_scorer_layer1.calculate_quantum_scores(columns, total_cases, now)
+        layer2 = self.quantum_scorer_layer2.compute_multi_source_scores(columns, sources, now)
+        quantum_score_layer2 = np.where(columns.has_layer2, layer2["quantum_score_layer2"], 0.5)
 
-        classical_sorted = sorted(results, key=lambda r: r.count, reverse=True)
-        for i, result in enumerate(classical_sorted):
-            result.classical_rank = i + 1
+        fusion_scores = (
+            self.fusion_weights["bayesian"] * 0.5
+            + self.fusion_weights["quantum_layer1"] * layer1["quantum_score_layer1"]
+            + self.fusion_weights["quantum_layer2"] * quantum_score_layer2
+        )
+        fusion_scores = np.clip(fusion_scores, 0.0, 1.0)
+        alert_levels = self._determine_alert_levels(fusion_scores)
+
+        # Stable descending sorts: ties keep input order, then fusion order
+        index = np.arange(n)
+        fusion_order = np.lexsort((index, -fusion_scores))
+        counts = columns.count.astype(np.float64)
+        classical_order = np.lexsort((index, -counts[fusion_order]))
+        classical_rank = np.empty(n, dtype=np.int64)
+        classical_rank[fusion_order[classical_order]] = index + 1
+
+        layer2_fields = ("frequency", "severity", "burst", "novelty", "consensus", "mechanism")
+        results: List[CompleteFusionResult] = []
+        for position, i in enumerate(fusion_order):
+            components = QuantumComponents(
+                **{name: float(values[i]) for name, values in layer1.items()}
+            )
+            if columns.has_layer2[i]:
+                for name in layer2_fields:
+                    setattr(components, name, float(layer2[name][i]))
+                components.quantum_score_layer2 = float(quantum_score_layer2[i])
+
+            results.append(CompleteFusionResult(
+                drug=columns.drugs[i],
+                event=columns.events[i],
+                count=columns.count[i].item(),
+                quantum_score_layer1=float(layer1["quantum_score_layer1"][i]),
+                quantum_score_layer2=float(quantum_score_layer2[i]),
+                fusion_score=float(fusion_scores[i]),
+                components=components,
+                alert_level=alert_levels[i],
+                quantum_rank=position + 1,
+                classical_rank=int(classical_rank[i]),
+                percentile=100 * (1 - position / n),
+            ))
 
         return results
 
     def _determine_alert_level(self, fusion_score: float) -> str:
         """Determine alert level using configurable thresholds."""
-        alert_levels = self.config.alert_levels
-        
-        if fusion_score >= alert_levels["critical"]:
-            return "critical"
-        if fusion_score >= alert_levels["high"]:
-            return "high"
-        if fusion_score >= alert_levels["moderate"]:
-            return "moderate"
-        if fusion_score >= alert_levels["watchlist"]:
-            return "watchlist"
-        if fusion_score >= alert_levels["low"]:
-            return "low"
-        return "none"
-
-
+        return self.config.compiled.alert_level(fusion_score)
+
+    def _determine_alert_levels(self, fusion_scores: np.ndarray) -> List[str]:
+        """Vectorized _determine_alert_level()."""
+        return self.config.compiled.alert_level_batch(fusion_scores)
+
+
+# Engines built by get_fusion_engine(), keyed by the id of the resolved
+# config they were built from (the config is kept alive with the engine)
+_engines: "OrderedDict[int, Tuple[SignalDetectionConfig, CompleteFusionEngine]]" = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def get_fusion_engine(
+    user_id: Optional[str] = None,
+    organization: Optional[str] = None,
+) -> CompleteFusionEngine:
+    """
+    Fusion engine for a request's organization/user.
+
+    The config is resolved through config_manager on every call, so
+    overrides saved since (see ConfigManager.save_override) apply to the
+    next request; an engine is only rebuilt when the resolved config
+    object changes.
+    """
+    config = config_manager.get_config(user_id=user_id, organization=organization)
+    with _engines_lock:
+        entry = _engines.get(id(config))
+        if entry is not None and entry[0] is config:
+            _engines.move_to_end(id(config))
+            return entry[1]
+
+    engine = CompleteFusionEngine(config=config)
+    with _engines_lock:
+        _engines[id(config)] = (config, engine)
+        while len(_engines) > config_manager.cache_size:
+            _engines.popitem(last=False)
+    return engine
@@ -8,12 +8,101 @@ Hierarchical configuration system for signal detection thresholds and weights:
 All thresholds, weights, and scoring parameters are configurable at each level.
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 import json
+import logging
 import os
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Alert levels from most to least severe
+ALERT_LEVEL_ORDER = ("critical", "high", "moderate", "watchlist", "low")
+
+CONFIG_TABLE = "signal_detection_config"
+
+
+# ============================================================================
+# Compiled Lookup Tables
+# ============================================================================
+
+def _frozen(values: List[float]) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class CompiledSignalConfig:
+    """
+    Sorted breakpoint arrays compiled from a SignalDetectionConfig.
+    
+    Frequency thresholds and alert levels are looked up with
+    np.searchsorted instead of re-sorting or walking the config dicts for
+    every signal. Results match the threshold walks in the fusion engine:
+    the first (highest) frequency threshold the count reaches, and the
+    first alert level in ALERT_LEVEL_ORDER whose threshold is met ("none"
+    for NaN scores).
+    """
+    frequency_breakpoints: np.ndarray  # Ascending threshold counts
+    frequency_scores: np.ndarray  # Score below each breakpoint, then at it (len + 1)
+    alert_breakpoints: np.ndarray  # Ascending effective alert thresholds
+    alert_names: Tuple[str, ...]  # "none" followed by levels, least severe first
+    
+    @classmethod
+    def from_config(cls, config: "SignalDetectionConfig") -> "CompiledSignalConfig":
+        thresholds = sorted(
+            (int(k), v["score"]) for k, v in config.frequency_thresholds.items()
+        )
+        
+        # A level is reached when any threshold at or above it in the order
+        # is met, so its effective threshold is the running minimum
+        alert_thresholds = np.minimum.accumulate(
+            [config.alert_levels[name] for name in ALERT_LEVEL_ORDER]
+        )
+        
+        return cls(
+            frequency_breakpoints=_frozen([t for t, _ in thresholds]),
+            frequency_scores=_frozen([0.0] + [score for _, score in thresholds]),
+            alert_breakpoints=_frozen(alert_thresholds[::-1]),
+            alert_names=("none",) + ALERT_LEVEL_ORDER[::-1],
+        )
+    
+    def frequency_score(self, count: Union[int, float]) -> float:
+        """Frequency score for a single count (0 for no cases)."""
+        if count == 0:
+            return 0.0
+        index = np.searchsorted(self.frequency_breakpoints, count, side="right")
+        return float(self.frequency_scores[index])
+    
+    def frequency_score_batch(self, counts: np.ndarray) -> np.ndarray:
+        """Frequency scores for an array of counts."""
+        counts = np.asarray(counts, dtype=np.float64)
+        scores = self.frequency_scores[
+            np.searchsorted(self.frequency_breakpoints, counts, side="right")
+        ]
+        return np.where(counts == 0, 0.0, scores)
+    
+    def alert_level(self, fusion_score: float) -> str:
+        """Alert level name for a single fusion score."""
+        if np.isnan(fusion_score):
+            return "none"
+        index = np.searchsorted(self.alert_breakpoints, fusion_score, side="right")
+        return self.alert_names[index]
+    
+    def alert_level_batch(self, fusion_scores: np.ndarray) -> List[str]:
+        """Alert level names for an array of fusion scores."""
+        fusion_scores = np.asarray(fusion_scores, dtype=np.float64)
+        indices = np.searchsorted(self.alert_breakpoints, fusion_scores, side="right")
+        indices[np.isnan(fusion_scores)] = 0
+        return np.asarray(self.alert_names)[indices].tolist()
+
 
 # ============================================================================
 # Default Platform Configuration
@@ -137,6 +226,24 @@ class SignalDetectionConfig:
         "on_label_moderate_days": 90,  # Moderate (on-label)
     })
     
+    def __post_init__(self):
+        self.compile()
+    
+    @property
+    def compiled(self) -> CompiledSignalConfig:
+        """Lookup tables for frequency thresholds and alert levels."""
+        return self._compiled
+    
+    def compile(self) -> CompiledSignalConfig:
+        """
+        (Re)build the compiled lookup tables.
+        
+        Called on construction, from_dict() and merge(); call again after
+        editing frequency_thresholds or alert_levels in place.
+        """
+        self._compiled = CompiledSignalConfig.from_config(self)
+        return self._compiled
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary."""
         return {
@@ -160,8 +267,9 @@ class SignalDetectionConfig:
         """Create config from dictionary."""
         config = cls()
         for key, value in data.items():
-            if hasattr(config, key):
+            if key in config.__dataclass_fields__:
                 setattr(config, key, value)
+        config.compile()
         return config
     
     def merge(self, other: "SignalDetectionConfig") -> "SignalDetectionConfig":
@@ -180,6 +288,26 @@ class SignalDetectionConfig:
             
             setattr(merged, key, merged_value)
         
+        merged.compile()
+        return merged
+    
+    def with_overrides(self, overrides: Dict[str, Any]) -> "SignalDetectionConfig":
+        """
+        Apply a partial override dict (e.g. a signal_detection_config row).
+        
+        Unlike merge(), fields missing from overrides keep this config's
+        values rather than the platform defaults, so overrides can be
+        stacked level by level.
+        """
+        merged = SignalDetectionConfig.from_dict(self.to_dict())
+        for key, value in (overrides or {}).items():
+            if key not in merged.__dataclass_fields__ or value is None:
+                continue
+            this_value = getattr(self, key)
+            if isinstance(this_value, dict) and isinstance(value, dict):
+                value = {**this_value, **value}
+            setattr(merged, key, value)
+        merged.compile()
         return merged
 
 
@@ -188,11 +316,35 @@ class SignalDetectionConfig:
 # ============================================================================
 
 class ConfigManager:
-    """Manages hierarchical configuration loading and merging."""
+    """
+    Manages hierarchical configuration loading and merging.
     
-    def __init__(self):
+    Resolved configs are kept in an LRU cache keyed by
+    (organization, user_id, admin overrides, version). Overrides are read
+    from the signal_detection_config table (migration 010); call
+    invalidate() when a row changes. Cached entries also expire after
+    SIGNAL_CONFIG_CACHE_TTL seconds so changes made by other workers are
+    picked up.
+    """
+    
+    def __init__(
+        self,
+        supabase_client: Optional[Any] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+    ):
         self.platform_config = SignalDetectionConfig()  # Default platform config
-        self.config_cache: Dict[str, SignalDetectionConfig] = {}
+        self.config_cache: "OrderedDict[Tuple, Tuple[float, SignalDetectionConfig]]" = OrderedDict()
+        self.cache_size = cache_size or int(os.getenv("SIGNAL_CONFIG_CACHE_SIZE", "256"))
+        self.cache_ttl = (
+            cache_ttl if cache_ttl is not None
+            else float(os.getenv("SIGNAL_CONFIG_CACHE_TTL", "300"))
+        )
+        self.version = 0  # Bumped when the platform config changes
+        self._generations: Dict[Tuple[str, str], int] = {}  # Per org/user versions
+        self._supabase = supabase_client
+        self._supabase_unavailable = False
+        self._lock = threading.Lock()
     
     def get_config(
         self,
@@ -205,6 +357,9 @@ class ConfigManager:
         
         Hierarchy: Platform → Admin → Organization → User
         
+        The returned config is shared with other callers through the cache
+        and must not be modified in place.
+        
         Args:
             user_id: User ID (for user-level overrides)
             organization: Organization name (for org-level overrides)
@@ -213,43 +368,200 @@ class ConfigManager:
         Returns:
             Merged SignalDetectionConfig
         """
+        admin_key = json.dumps(admin_overrides, sort_keys=True) if admin_overrides else None
+        with self._lock:
+            key = (organization, user_id, admin_key, self._version_key(organization, user_id))
+            entry = self.config_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+                self.config_cache.move_to_end(key)
+                return entry[1]
+        
+        try:
+            config = self._resolve(user_id, organization, admin_overrides)
+        except Exception as e:
+            # Serve platform defaults + admin overrides without caching them
+            logger.warning(f"Could not load signal detection config overrides: {e}")
+            config = self.platform_config
+            if admin_overrides:
+                config = config.with_overrides(admin_overrides)
+            return config
+        
+        with self._lock:
+            # If invalidate() ran while resolving, key holds the old version
+            # and the possibly stale config is never served again
+            self.config_cache[key] = (time.monotonic(), config)
+            self.config_cache.move_to_end(key)
+            while len(self.config_cache) > self.cache_size:
+                self.config_cache.popitem(last=False)
+        return config
+    
+    def invalidate(
+        self,
+        organization: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        """
+        Drop cached configs after a signal_detection_config row changes.
+        
+        With no arguments (platform row changed) every cached config is
+        invalidated; otherwise only configs resolved for that organization
+        or user are dropped.
+        """
+        with self._lock:
+            if organization is None and user_id is None:
+                self.version += 1
+                self.config_cache.clear()
+                return
+            if organization is not None:
+                scope = ("organization", organization)
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            if user_id is not None:
+                scope = ("user", user_id)
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            for key in list(self.config_cache):
+                if (organization is not None and key[0] == organization) or (
+                    user_id is not None and key[1] == user_id
+                ):
+                    del self.config_cache[key]
+    
+    def save_override(
+        self,
+        level: str,
+        overrides: Dict[str, Any],
+        organization: Optional[str] = None,
+        user_id: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        """
+        Upsert a signal_detection_config row and invalidate affected configs.
+        
+        Args:
+            level: "platform", "organization" or "user"
+            overrides: Partial config dict
+            organization: Organization name (organization level)
+            user_id: User ID (user level)
+            notes: Optional notes stored with the row
+        """
+        supabase = self._get_supabase()
+        if supabase is None:
+            raise RuntimeError("Supabase is not configured")
+        
+        row: Dict[str, Any] = {"level": level, "config": overrides}
+        if level == "organization":
+            row["organization"] = organization
+        elif level == "user":
+            row["user_id"] = user_id
+        if notes is not None:
+            row["notes"] = notes
+        
+        query = supabase.table(CONFIG_TABLE).select("id").eq("level", level)
+        if level == "organization":
+            query = query.eq("organization", organization)
+        elif level == "user":
+            query = query.eq("user_id", user_id)
+        existing = query.limit(1).execute().data
+        
+        if existing:
+            supabase.table(CONFIG_TABLE).update(row).eq("id", existing[0]["id"]).execute()
+        else:
+            supabase.table(CONFIG_TABLE).insert(row).execute()
+        
+        if level == "platform":
+            self.invalidate()
+        else:
+            self.invalidate(
+                organization=organization if level == "organization" else None,
+                user_id=user_id if level == "user" else None,
+            )
+    
+    def _version_key(
+        self,
+        organization: Optional[str],
+        user_id: Optional[str],
+    ) -> Tuple[int, int, int]:
+        return (
+            self.version,
+            self._generations.get(("organization", organization), 0),
+            self._generations.get(("user", user_id), 0),
+        )
+    
+    def _resolve(
+        self,
+        user_id: Optional[str],
+        organization: Optional[str],
+        admin_overrides: Optional[Dict[str, Any]],
+    ) -> SignalDetectionConfig:
         config = self.platform_config
         
-        # Load admin overrides (if provided)
+        platform_overrides = self._load_overrides("platform")
+        if platform_overrides:
+            config = config.with_overrides(platform_overrides)
+        
         if admin_overrides:
-            admin_config = SignalDetectionConfig.from_dict(admin_overrides)
-            config = config.merge(admin_config)
+            config = config.with_overrides(admin_overrides)
         
-        # TODO: Load organization overrides from database
-        # if organization:
-        #     org_config = self._load_org_config(organization)
-        #     config = config.merge(org_config)
+        if organization:
+            org_overrides = self._load_overrides("organization", organization=organization)
+            if org_overrides:
+                config = config.with_overrides(org_overrides)
         
-        # TODO: Load user overrides from database
-        # if user_id:
-        #     user_config = self._load_user_config(user_id)
-        #     config = config.merge(user_config)
+        if user_id:
+            user_overrides = self._load_overrides("user", user_id=user_id)
+            if user_overrides:
+                config = config.with_overrides(user_overrides)
         
         return config
     
+    def _load_overrides(
+        self,
+        level: str,
+        organization: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Config JSON of the signal_detection_config row for a level, if any."""
+        supabase = self._get_supabase()
+        if supabase is None:
+            return None
+        
+        query = supabase.table(CONFIG_TABLE).select("config").eq("level", level)
+        if organization is not None:
+            query = query.eq("organization", organization)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        result = query.limit(1).execute()
+        
+        if result.data:
+            return result.data[0].get("config") or None
+        return None
+    
     def _load_org_config(self, organization: str) -> Optional[SignalDetectionConfig]:
         """Load organization-level configuration from database."""
-        # TODO: Implement database lookup
-        # Example:
-        # result = supabase.table("signal_detection_config")
-        #     .select("*")
-        #     .eq("organization", organization)
-        #     .eq("level", "organization")
-        #     .execute()
-        # if result.data:
-        #     return SignalDetectionConfig.from_dict(result.data[0]["config"])
+        overrides = self._load_overrides("organization", organization=organization)
+        if overrides:
+            return SignalDetectionConfig.from_dict(overrides)
         return None
     
     def _load_user_config(self, user_id: str) -> Optional[SignalDetectionConfig]:
         """Load user-level configuration from database."""
-        # TODO: Implement database lookup
+        overrides = self._load_overrides("user", user_id=user_id)
+        if overrides:
+            return SignalDetectionConfig.from_dict(overrides)
         return None
     
+    def _get_supabase(self) -> Optional[Any]:
+        if self._supabase is None and not self._supabase_unavailable:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+            if url and key:
+                try:
+                    from supabase import create_client
+                except ImportError:
+                    logger.warning("supabase not installed; using platform signal detection config")
+                    self._supabase_unavailable = True
+                    return None
+                self._supabase = create_client(url, key)
+        return self._supabase
+    
     def save_platform_config(self, config: SignalDetectionConfig, path: Optional[str] = None):
         """Save platform configuration to file."""
         if path is None:
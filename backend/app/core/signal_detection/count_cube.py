@@ -0,0 +1,1013 @@
+"""
+Drug-Event Count Cube
+=====================
+
+Persisted sparse count structure for disproportionality analysis.
+
+Counts are kept per normalized (drug, event) pair and per stratum, where a
+stratum is the combination of:
+- serious (0/1)
+- sex ("M", "F", "U")
+- age band ("0-17", "18-44", "45-64", "65-74", "75+", "unknown")
+- country (reporter country code, "" if unknown)
+- month (YYYYMM of receipt/report/event date, 0 if unknown)
+- source (dataset, e.g. "FAERS" or "AI_EXTRACTED"; "" if unknown)
+- upload (source_file_id of the upload the case came from, "" if none)
+
+The unit of counting is a case (report): a case adds one to the total of its
+stratum, one to each distinct drug and event marginal, and one to each
+distinct (drug, event) combination it contains. Any 2x2 table or marginal,
+overall or restricted to a subset of strata, is then a lookup instead of a
+scan over pv_cases. The /signals endpoints take all their tables from the
+cube; deleting an upload's cases removes them with remove_case(), and
+edits made to pv_cases outside the API need scripts/build_count_cube.py.
+
+New cases are buffered in memory and merged into the sorted base arrays by
+compact(). On disk the cube is a base snapshot (.npy arrays plus a JSON
+vocabulary, memory-mapped by load()) and a directory of append-only delta
+files next to it:
+- save() writes only the counts added in this process since its last
+  save, as a new delta file, so workers sharing COUNT_CUBE_PATH never
+  overwrite each other's counts
+- load() and refresh() merge every delta not yet in the base, so a worker
+  picks up counts saved by the others
+- once there are more than COUNT_CUBE_MAX_DELTAS delta files, save() folds
+  them into a new base snapshot (one process at a time)
+
+covered_uploads tells whether the cube counts every case in pv_cases: the
+base snapshot records the completed-upload count it was built from, and
+each delta lists the uploads whose cases it holds. When that total equals
+the ingest watermark's completed uploads, no case is missing.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# STRATUM ENCODING
+# ============================================================================
+
+STRATUM_FIELDS = ("serious", "sex", "age_band", "country", "month", "source", "upload")
+
+AGE_BAND_EDGES = (18, 45, 65, 75)
+AGE_BANDS = ("0-17", "18-44", "45-64", "65-74", "75+")
+
+# Age unit codes (E2B R2 and FAERS) to years
+_AGE_UNIT_YEARS = {
+    "800": 10.0, "dec": 10.0,
+    "801": 1.0, "yr": 1.0, "year": 1.0, "years": 1.0,
+    "802": 1 / 12, "mon": 1 / 12, "month": 1 / 12, "months": 1 / 12,
+    "803": 1 / 52, "wk": 1 / 52, "week": 1 / 52, "weeks": 1 / 52,
+    "804": 1 / 365, "dy": 1 / 365, "day": 1 / 365, "days": 1 / 365,
+    "805": 1 / 8760, "hr": 1 / 8760, "hour": 1 / 8760, "hours": 1 / 8760,
+}
+
+_MONTH_PATTERN = re.compile(r"^(\d{4})-?(\d{2})")
+
+_PAIR_SHIFT = np.int64(32)
+
+# Delta files allowed to accumulate before save() folds them into the base
+MAX_DELTA_FILES = int(os.getenv("COUNT_CUBE_MAX_DELTAS", "64"))
+
+# How often get_count_cube() looks for counts saved by other processes
+REFRESH_SECONDS = float(os.getenv("COUNT_CUBE_REFRESH_SECONDS", "5"))
+
+# A consolidation lock older than this is left over from a crashed process
+_STALE_LOCK_SECONDS = 600
+
+
+def normalize_term(value: Any) -> str:
+    """Normalize a drug/event name for use as a cube key"""
+    return " ".join(str(value or "").lower().split())
+
+
+def _sex_code(value: Any) -> str:
+    sex = str(value or "").strip().lower()
+    if sex in ("m", "male", "1"):
+        return "M"
+    if sex in ("f", "female", "2"):
+        return "F"
+    return "U"
+
+
+def age_in_years(age: Any, unit: Any = None) -> Optional[float]:
+    """Age in years from a value and an E2B/FAERS age unit (years if none)"""
+    try:
+        years = float(age)
+    except (TypeError, ValueError):
+        return None
+    if np.isnan(years):
+        return None
+    if unit:
+        years *= _AGE_UNIT_YEARS.get(str(unit).strip().lower(), 1.0)
+    return years
+
+
+def _age_band(age: Any, unit: Any = None) -> str:
+    years = age_in_years(age, unit)
+    if years is None or years < 0 or years > 130:
+        return "unknown"
+    return AGE_BANDS[int(np.searchsorted(AGE_BAND_EDGES, years, side="right"))]
+
+
+def _month_code(*dates: Any) -> int:
+    for value in dates:
+        match = _MONTH_PATTERN.match(str(value or "").strip())
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            if 1 <= month <= 12:
+                return year * 100 + month
+    return 0
+
+
+def _serious_code(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value.strip().lower() in ("1", "true", "yes", "y"))
+    return int(bool(value))
+
+
+def case_stratum(case: Dict[str, Any]) -> Tuple[int, str, str, str, int, str, str]:
+    """
+    Stratum of a case, from pv_cases columns or parser output fields.
+
+    Returns:
+        (serious, sex, age_band, country, month, source, upload)
+    """
+    return (
+        _serious_code(case.get("serious")),
+        _sex_code(case.get("sex") or case.get("patient_sex")),
+        _age_band(
+            case.get("age") if case.get("age") is not None else case.get("patient_age"),
+            case.get("age_unit") or case.get("patient_age_unit")
+        ),
+        str(case.get("reporter_country") or case.get("country") or "").strip().upper(),
+        _month_code(case.get("receipt_date"), case.get("report_date"), case.get("event_date")),
+        str(case.get("source") or "").strip(),
+        str(case.get("source_file_id") or ""),
+    )
+
+
+def case_terms(case: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    Distinct normalized drugs and events of a case.
+
+    Understands pv_cases rows (drug_name/reaction) as well as parser output
+    with concomitant_drugs, drugs and reactions lists.
+    """
+    drugs = [case.get("drug_name")]
+    drugs.extend(case.get("concomitant_drugs") or [])
+    for drug in case.get("drugs") or []:
+        drugs.append(drug.get("name") or drug.get("drug_name") if isinstance(drug, dict) else drug)
+
+    events = [case.get("reaction")]
+    for reaction in case.get("reactions") or []:
+        events.append(reaction.get("term") or reaction.get("reaction") if isinstance(reaction, dict) else reaction)
+
+    drugs = list(dict.fromkeys(t for t in map(normalize_term, drugs) if t))
+    events = list(dict.fromkeys(t for t in map(normalize_term, events) if t))
+    return drugs, events
+
+
+# ============================================================================
+# COUNT CUBE
+# ============================================================================
+
+class DrugEventCountCube:
+    """
+    Sparse drug x event x stratum count cube.
+
+    Base counts live in sorted NumPy arrays (memory-mapped after load());
+    cases added since the last compact() are held in Counters and included
+    in every lookup.
+    """
+
+    ARRAY_NAMES = (
+        "pair_key", "pair_stratum", "pair_count",
+        "drug_id", "drug_stratum", "drug_count",
+        "event_id", "event_stratum", "event_count",
+        "stratum_count",
+    )
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Directory the cube is saved to (defaults to default_path());
+                delta files go to a sibling "<name>.deltas" directory
+        """
+        self.path = Path(path) if path else self.default_path()
+        self.delta_path = self.path.with_name(f"{self.path.name}.deltas")
+        self._lock = threading.RLock()
+
+        # Counts added in this process since the last save(), keyed by term
+        # so they can be written without this process's vocabulary ids
+        self._unsaved_pairs: Counter = Counter()
+        self._unsaved_drugs: Counter = Counter()
+        self._unsaved_events: Counter = Counter()
+        self._unsaved_strata: Counter = Counter()
+        self._unsaved_uploads: set = set()
+
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty counts and vocabularies (unsaved counts are kept)"""
+        # Identity of the base snapshot on disk and the delta files merged
+        self._base_stamp: Optional[Tuple[int, int]] = None
+        self._applied_deltas: set = set()
+
+        # Completed uploads counted by the base snapshot (None if unknown)
+        # and uploads counted since
+        self._base_uploads: Optional[int] = None
+        self._uploads: set = set()
+
+        # Vocabularies
+        self._drugs: List[str] = []
+        self._events: List[str] = []
+        self._strata: List[Tuple[int, str, str, str, int, str, str]] = []
+        self._drug_ids: Dict[str, int] = {}
+        self._event_ids: Dict[str, int] = {}
+        self._stratum_ids: Dict[Tuple, int] = {}
+
+        # Base tables, sorted by (key, stratum)
+        empty_i32 = np.zeros(0, dtype=np.int32)
+        empty_i64 = np.zeros(0, dtype=np.int64)
+        self._arrays: Dict[str, np.ndarray] = {
+            "pair_key": empty_i64, "pair_stratum": empty_i32, "pair_count": empty_i64,
+            "drug_id": empty_i32, "drug_stratum": empty_i32, "drug_count": empty_i64,
+            "event_id": empty_i32, "event_stratum": empty_i32, "event_count": empty_i64,
+            "stratum_count": empty_i64,
+        }
+
+        # Cases added since the last compact()
+        self._pending_pairs: Counter = Counter()
+        self._pending_drugs: Counter = Counter()
+        self._pending_events: Counter = Counter()
+        self._pending_strata: Counter = Counter()
+
+        self._build_totals()
+
+    @staticmethod
+    def default_path() -> Path:
+        return Path(os.getenv("COUNT_CUBE_PATH", "data/count_cube"))
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add_case(self, case: Dict[str, Any]) -> bool:
+        """
+        Count one case.
+
+        Cases without at least one drug and one event are ignored.
+
+        Returns:
+            True if the case was counted
+        """
+        return self._count_case(case, 1)
+
+    def remove_case(self, case: Dict[str, Any]) -> bool:
+        """
+        Uncount a case deleted from pv_cases.
+
+        The case must have been counted with the same drug, event and
+        stratum columns (a pv_cases row as it was before the delete).
+
+        Returns:
+            True if the case was uncounted
+        """
+        return self._count_case(case, -1)
+
+    def _count_case(self, case: Dict[str, Any], sign: int) -> bool:
+        drugs, events = case_terms(case)
+        if not drugs or not events:
+            return False
+
+        stratum = case_stratum(case)
+        with self._lock:
+            s = self._intern(self._stratum_ids, self._strata, stratum)
+            drug_ids = [self._intern(self._drug_ids, self._drugs, d) for d in drugs]
+            event_ids = [self._intern(self._event_ids, self._events, e) for e in events]
+
+            self._pending_strata[s] += sign
+            for d in drug_ids:
+                self._pending_drugs[(d, s)] += sign
+                self._drug_totals_pending[d] += sign
+            for e in event_ids:
+                self._pending_events[(e, s)] += sign
+                self._event_totals_pending[e] += sign
+            for d in drug_ids:
+                for e in event_ids:
+                    key = (d << 32) | e
+                    self._pending_pairs[(key, s)] += sign
+                    self._pair_totals_pending[key] += sign
+            self._n += sign
+
+            self._unsaved_strata[stratum] += sign
+            for drug in drugs:
+                self._unsaved_drugs[(drug, stratum)] += sign
+                for event in events:
+                    self._unsaved_pairs[(drug, event, stratum)] += sign
+            for event in events:
+                self._unsaved_events[(event, stratum)] += sign
+        return True
+
+    def add_upload(self, upload_id: str) -> None:
+        """Record that every case of an upload has been added"""
+        with self._lock:
+            self._uploads.add(upload_id)
+            self._unsaved_uploads.add(upload_id)
+
+    def add_cases(self, cases: Iterable[Dict[str, Any]]) -> int:
+        """
+        Count many cases.
+
+        Returns:
+            Number of cases counted
+        """
+        return sum(self.add_case(case) for case in cases)
+
+    @staticmethod
+    def _intern(ids: Dict, values: List, value) -> int:
+        index = ids.get(value)
+        if index is None:
+            index = len(values)
+            ids[value] = index
+            values.append(value)
+        return index
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending_strata)
+
+    def compact(self) -> None:
+        """Merge buffered cases into the sorted base arrays"""
+        with self._lock:
+            if not self.has_pending:
+                return
+
+            a = self._arrays
+            a["pair_key"], a["pair_stratum"], a["pair_count"] = self._merge(
+                a["pair_key"], a["pair_stratum"], a["pair_count"], self._pending_pairs, np.int64
+            )
+            a["drug_id"], a["drug_stratum"], a["drug_count"] = self._merge(
+                a["drug_id"], a["drug_stratum"], a["drug_count"], self._pending_drugs, np.int32
+            )
+            a["event_id"], a["event_stratum"], a["event_count"] = self._merge(
+                a["event_id"], a["event_stratum"], a["event_count"], self._pending_events, np.int32
+            )
+
+            stratum_count = np.zeros(len(self._strata), dtype=np.int64)
+            stratum_count[:len(a["stratum_count"])] = a["stratum_count"]
+            for s, count in self._pending_strata.items():
+                stratum_count[s] += count
+            a["stratum_count"] = stratum_count
+
+            self._pending_pairs.clear()
+            self._pending_drugs.clear()
+            self._pending_events.clear()
+            self._pending_strata.clear()
+            self._build_totals()
+
+    @staticmethod
+    def _merge(
+        keys: np.ndarray,
+        strata: np.ndarray,
+        counts: np.ndarray,
+        pending: Counter,
+        key_dtype
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Merge pending (key, stratum) counts into a sorted sparse table"""
+        if not pending:
+            return keys, strata, counts
+
+        new_keys = np.fromiter((k for k, _ in pending), dtype=key_dtype, count=len(pending))
+        new_strata = np.fromiter((s for _, s in pending), dtype=np.int32, count=len(pending))
+        new_counts = np.fromiter(pending.values(), dtype=np.int64, count=len(pending))
+
+        all_keys = np.concatenate([keys, new_keys])
+        all_strata = np.concatenate([strata, new_strata])
+        all_counts = np.concatenate([counts, new_counts])
+
+        order = np.lexsort((all_strata, all_keys))
+        all_keys, all_strata, all_counts = all_keys[order], all_strata[order], all_counts[order]
+
+        # Sum duplicate (key, stratum) rows; rows whose cases were all
+        # removed are dropped
+        starts = np.flatnonzero(np.concatenate([
+            [True], (all_keys[1:] != all_keys[:-1]) | (all_strata[1:] != all_strata[:-1])
+        ]))
+        summed = np.add.reduceat(all_counts, starts) if len(starts) else all_counts
+        keep = summed != 0
+        return all_keys[starts][keep], all_strata[starts][keep], summed[keep]
+
+    def _totals(
+        self,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        """
+        Pair, drug and event totals over the base arrays, optionally only
+        over the strata selected by a stratum mask.
+
+        Returns:
+            (pair_keys, pair_totals, drug_totals, event_totals, n)
+        """
+        a = self._arrays
+        pair_key, pair_count = a["pair_key"], a["pair_count"]
+        drug_id, drug_count = a["drug_id"], a["drug_count"]
+        event_id, event_count = a["event_id"], a["event_count"]
+        stratum_count = a["stratum_count"]
+        if mask is not None:
+            keep = mask[a["pair_stratum"]]
+            pair_key, pair_count = pair_key[keep], pair_count[keep]
+            keep = mask[a["drug_stratum"]]
+            drug_id, drug_count = drug_id[keep], drug_count[keep]
+            keep = mask[a["event_stratum"]]
+            event_id, event_count = event_id[keep], event_count[keep]
+            stratum_count = stratum_count[mask[:len(stratum_count)]]
+
+        pair_keys, starts = np.unique(pair_key, return_index=True)
+        pair_totals = (
+            np.add.reduceat(pair_count, starts) if len(starts) else np.zeros(0, dtype=np.int64)
+        )
+        drug_totals = np.bincount(
+            drug_id, weights=drug_count, minlength=len(self._drugs)
+        ).astype(np.int64)
+        event_totals = np.bincount(
+            event_id, weights=event_count, minlength=len(self._events)
+        ).astype(np.int64)
+        return pair_keys, pair_totals, drug_totals, event_totals, int(stratum_count.sum())
+
+    def _build_totals(self) -> None:
+        """Recompute the unstratified lookups from the base arrays"""
+        (
+            self._pair_totals_keys, self._pair_totals,
+            self._drug_totals, self._event_totals, self._n
+        ) = self._totals()
+
+        self._pair_totals_pending: Counter = Counter()
+        self._drug_totals_pending: Counter = Counter()
+        self._event_totals_pending: Counter = Counter()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def total(self) -> int:
+        """Number of counted cases"""
+        return self._n
+
+    @property
+    def covered_uploads(self) -> Optional[int]:
+        """
+        Completed uploads whose cases are all counted, or None if unknown
+        (a cube saved without coverage, or never built)
+        """
+        if self._base_uploads is None:
+            return None
+        return self._base_uploads + len(self._uploads)
+
+    @property
+    def drugs(self) -> List[str]:
+        return list(self._drugs)
+
+    @property
+    def events(self) -> List[str]:
+        return list(self._events)
+
+    def drug_count(self, drug: str) -> int:
+        """Cases reporting the drug"""
+        d = self._drug_ids.get(normalize_term(drug))
+        if d is None:
+            return 0
+        base = int(self._drug_totals[d]) if d < len(self._drug_totals) else 0
+        return base + self._drug_totals_pending.get(d, 0)
+
+    def event_count(self, event: str) -> int:
+        """Cases reporting the event"""
+        e = self._event_ids.get(normalize_term(event))
+        if e is None:
+            return 0
+        base = int(self._event_totals[e]) if e < len(self._event_totals) else 0
+        return base + self._event_totals_pending.get(e, 0)
+
+    def pair_count(self, drug: str, event: str) -> int:
+        """Cases reporting both the drug and the event"""
+        d = self._drug_ids.get(normalize_term(drug))
+        e = self._event_ids.get(normalize_term(event))
+        if d is None or e is None:
+            return 0
+        key = (d << 32) | e
+        i = int(np.searchsorted(self._pair_totals_keys, key))
+        base = 0
+        if i < len(self._pair_totals_keys) and self._pair_totals_keys[i] == key:
+            base = int(self._pair_totals[i])
+        return base + self._pair_totals_pending.get(key, 0)
+
+    def cooccurrence_counts(
+        self,
+        drugs: List[str],
+        events: List[str],
+        substring: bool = False
+    ) -> np.ndarray:
+        """
+        Pair counts for every drug x event combination.
+
+        With substring=True each name matches every cube term containing it
+        (like an ILIKE '%name%' filter) and counts are summed over the
+        matched pairs, so a case can be counted more than once; the result
+        is only zero when no matching pair was ever reported.
+
+        Returns:
+            int64 array of shape (len(drugs), len(events))
+        """
+        self.compact()
+        counts = np.zeros((len(drugs), len(events)), dtype=np.int64)
+        if not len(self._pair_totals_keys):
+            return counts
+
+        drug_ids = [self._term_ids(self._drugs, self._drug_ids, d, substring) for d in drugs]
+        event_ids = [self._term_ids(self._events, self._event_ids, e, substring) for e in events]
+
+        pair_drugs = self._pair_totals_keys >> _PAIR_SHIFT
+        pair_events = self._pair_totals_keys & np.int64(0xFFFFFFFF)
+        for i, ids in enumerate(drug_ids):
+            if not len(ids):
+                continue
+            # Pair keys are sorted by drug id, so each drug is one range
+            rows = self._key_rows(pair_drugs, ids)
+            for j, wanted in enumerate(event_ids):
+                if len(wanted) and len(rows):
+                    hit = np.isin(pair_events[rows], wanted)
+                    counts[i, j] = int(self._pair_totals[rows[hit]].sum())
+        return counts
+
+    @staticmethod
+    def _term_ids(
+        vocab: List[str],
+        ids: Dict[str, int],
+        term: str,
+        substring: bool
+    ) -> np.ndarray:
+        key = normalize_term(term)
+        if not substring:
+            return np.array([ids[key]] if key in ids else [], dtype=np.int64)
+        return np.array([i for i, name in enumerate(vocab) if key in name], dtype=np.int64)
+
+    def table(
+        self,
+        drug: str,
+        event: str,
+        substring: bool = False,
+        **strata: Any
+    ) -> Tuple[int, int, int, int]:
+        """
+        2x2 contingency table for a drug-event pair.
+
+        With substring=True the drug and event match every cube term
+        containing them, as in cooccurrence_counts(). Keyword arguments
+        restrict the counts to matching strata, e.g.
+        table("aspirin", "nausea", sex="F", month=[202401, 202402]).
+        Each value may be a single value or a collection of values.
+
+        Returns:
+            (a, b, c, d): drug+event, drug only, event only, neither
+        """
+        if substring or strata:
+            a, drug_n, event_n, n = self._matched_counts(drug, event, substring, strata)
+        else:
+            a = self.pair_count(drug, event)
+            drug_n = self.drug_count(drug)
+            event_n = self.event_count(event)
+            n = self._n
+        return a, drug_n - a, event_n - a, n - drug_n - event_n + a
+
+    def _stratum_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask over stratum ids matching all filters"""
+        unknown = set(filters) - set(STRATUM_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown strata: {sorted(unknown)}")
+
+        mask = np.ones(len(self._strata), dtype=bool)
+        for field_index, name in enumerate(STRATUM_FIELDS):
+            if name not in filters:
+                continue
+            wanted = filters[name]
+            if isinstance(wanted, (str, bytes, int, bool)) or not isinstance(wanted, Iterable):
+                wanted = [wanted]
+            if name == "serious":
+                wanted = [_serious_code(w) for w in wanted]
+            elif name == "sex":
+                wanted = [_sex_code(w) for w in wanted]
+            elif name == "country":
+                wanted = [str(w).strip().upper() for w in wanted]
+            elif name == "upload":
+                wanted = [str(w) for w in wanted]
+            wanted = set(wanted)
+            mask &= np.fromiter(
+                (stratum[field_index] in wanted for stratum in self._strata),
+                dtype=bool, count=len(self._strata)
+            )
+        return mask
+
+    def _matched_counts(
+        self,
+        drug: str,
+        event: str,
+        substring: bool,
+        filters: Dict[str, Any]
+    ) -> Tuple[int, int, int, int]:
+        """(pair, drug, event, total) case counts over the matching strata"""
+        self.compact()
+        mask = self._stratum_mask(filters)
+        a = self._arrays
+        n = int(a["stratum_count"][mask[:len(a["stratum_count"])]].sum())
+
+        drug_ids = self._term_ids(self._drugs, self._drug_ids, drug, substring)
+        event_ids = self._term_ids(self._events, self._event_ids, event, substring)
+        drug_rows = self._key_rows(a["drug_id"], drug_ids)
+        event_rows = self._key_rows(a["event_id"], event_ids)
+        drug_n = int(a["drug_count"][drug_rows][mask[a["drug_stratum"][drug_rows]]].sum())
+        event_n = int(a["event_count"][event_rows][mask[a["event_stratum"][event_rows]]].sum())
+
+        # Pair keys are sorted by drug id, so each drug is one range
+        pair_rows = self._key_rows(a["pair_key"] >> _PAIR_SHIFT, drug_ids)
+        pair_rows = pair_rows[np.isin(a["pair_key"][pair_rows] & np.int64(0xFFFFFFFF), event_ids)]
+        pair_n = int(a["pair_count"][pair_rows][mask[a["pair_stratum"][pair_rows]]].sum())
+        return pair_n, drug_n, event_n, n
+
+    @staticmethod
+    def _key_rows(keys: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """Row indices of a sorted key array whose key is one of ids"""
+        if not len(ids):
+            return np.zeros(0, dtype=np.int64)
+        bounds = np.searchsorted(keys, np.stack([ids, ids + 1]))
+        return np.concatenate([np.arange(lo, hi) for lo, hi in bounds.T])
+
+    def contingency_arrays(
+        self,
+        min_count: int = 1,
+        **strata: Any
+    ) -> Tuple[List[str], List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        2x2 tables for every pair with at least min_count cases.
+
+        Keyword arguments restrict all counts to matching strata as in
+        table(). The result can be passed straight to
+        UnifiedSignalDetector.detect_signals_columnar() or
+        SignalDetector.detect_all_signals_from_tables().
+
+        Returns:
+            (drugs, events, n11, n10, n01, n00)
+        """
+        self.compact()
+        if strata:
+            pair_keys, pair_totals, drug_totals, event_totals, n = self._totals(
+                self._stratum_mask(strata)
+            )
+        else:
+            pair_keys, pair_totals = self._pair_totals_keys, self._pair_totals
+            drug_totals, event_totals, n = self._drug_totals, self._event_totals, self._n
+
+        keep = pair_totals >= max(min_count, 1)
+        keys = pair_keys[keep]
+        drug_ids = (keys >> _PAIR_SHIFT).astype(np.int64)
+        event_ids = (keys & np.int64(0xFFFFFFFF)).astype(np.int64)
+
+        n11 = pair_totals[keep].astype(np.int64)
+        n10 = drug_totals[drug_ids] - n11
+        n01 = event_totals[event_ids] - n11
+        n00 = n - n11 - n10 - n01
+
+        drugs = [self._drugs[i] for i in drug_ids]
+        events = [self._events[i] for i in event_ids]
+        return drugs, events, n11, n10, n01, n00
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> Optional[Path]:
+        """
+        Append the counts added since the last save() as a new delta file.
+
+        Only this process's new counts are written, so concurrent savers
+        never lose each other's updates. When more than MAX_DELTA_FILES
+        deltas have accumulated they are folded into the base snapshot.
+
+        Returns:
+            Path of the delta file, or None if there was nothing to save
+        """
+        with self._lock:
+            if not self._unsaved_strata and not self._unsaved_uploads:
+                return None
+            delta = self._unsaved_delta()
+
+            self.delta_path.mkdir(parents=True, exist_ok=True)
+            name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+            tmp = self.delta_path / f"{name}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(delta, f)
+            os.replace(tmp, self.delta_path / name)
+
+            self._applied_deltas.add(name)
+            self._clear_unsaved()
+
+        if len(self._delta_names()) > MAX_DELTA_FILES:
+            self.consolidate()
+        return self.delta_path / name
+
+    def save_snapshot(self, covered_uploads: Optional[int] = None) -> None:
+        """
+        Write the whole cube as the base snapshot.
+
+        Used when the cube was rebuilt from pv_cases: delta files present on
+        disk are taken to be included and are removed.
+
+        Args:
+            covered_uploads: Completed uploads (ingest watermark) read
+                before the rebuild started, if known
+        """
+        with self._exclusive(wait=True):
+            with self._lock:
+                self.compact()
+                self._base_uploads = covered_uploads
+                self._uploads.clear()
+                merged = self._delta_names()
+                self._write_base(merged)
+                self._clear_unsaved()
+            self._remove_deltas(merged)
+
+    def consolidate(self) -> bool:
+        """
+        Fold the delta files on disk into a new base snapshot.
+
+        Runs in at most one process at a time; others skip it.
+
+        Returns:
+            True if a new snapshot was written
+        """
+        with self._exclusive(wait=False) as acquired:
+            if not acquired:
+                return False
+            merged = type(self).load(self.path, mmap=False)
+            names = [name for name in merged._delta_names() if name in merged._applied_deltas]
+            merged.compact()
+            merged._write_base(names)
+            merged._remove_deltas(names)
+            logger.info(f"Folded {len(names)} count cube deltas into {self.path}")
+            return True
+
+    def refresh(self) -> None:
+        """
+        Pick up counts saved by other processes.
+
+        Merges new delta files, or reloads everything if the base snapshot
+        was replaced; counts not yet saved by this process are kept.
+        """
+        with self._lock:
+            stamp = self._read_base_stamp()
+            if stamp is not None and stamp != self._base_stamp:
+                unsaved = self._unsaved_delta()
+                self._reset()
+                self._load_base(mmap=True)
+                self._apply_delta(unsaved)
+            self._load_deltas()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, mmap: bool = True) -> "DrugEventCountCube":
+        """
+        Load the saved base snapshot and delta files; returns an empty cube
+        if none exist.
+
+        Args:
+            path: Cube directory (defaults to default_path())
+            mmap: Memory-map the base arrays instead of reading them
+        """
+        cube = cls(path)
+        cube._load_base(mmap)
+        cube._load_deltas()
+        return cube
+
+    def _load_base(self, mmap: bool) -> None:
+        stamp = self._read_base_stamp()
+        if stamp is None:
+            return
+
+        try:
+            with open(self.path / "vocab.json") as f:
+                vocab = json.load(f)
+            arrays = {
+                name: np.load(self.path / f"{name}.npy", mmap_mode="r" if mmap else None)
+                for name in self.ARRAY_NAMES
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load count cube from {self.path}: {e}")
+            return
+        if vocab.get("stratum_fields") != list(STRATUM_FIELDS):
+            logger.warning(
+                f"Count cube at {self.path} has strata {vocab.get('stratum_fields')}, "
+                f"expected {list(STRATUM_FIELDS)}; rebuild it with scripts/build_count_cube.py"
+            )
+            return
+
+        self._drugs = vocab["drugs"]
+        self._events = vocab["events"]
+        self._strata = [tuple(s) for s in vocab["strata"]]
+        self._drug_ids = {d: i for i, d in enumerate(self._drugs)}
+        self._event_ids = {e: i for i, e in enumerate(self._events)}
+        self._stratum_ids = {s: i for i, s in enumerate(self._strata)}
+        self._arrays = arrays
+        self._build_totals()
+        self._base_stamp = stamp
+        self._applied_deltas = set(vocab.get("deltas", []))
+        self._base_uploads = vocab.get("covered_uploads")
+
+    def _load_deltas(self) -> None:
+        for name in self._delta_names():
+            if name in self._applied_deltas:
+                continue
+            try:
+                with open(self.delta_path / name) as f:
+                    delta = json.load(f)
+            except FileNotFoundError:
+                # Folded into a new base meanwhile; the next refresh loads it
+                continue
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable count cube delta {name}: {e}")
+            else:
+                self._apply_delta(delta)
+            self._applied_deltas.add(name)
+
+    def _write_base(self, merged_deltas: List[str]) -> None:
+        """
+        Write the (compacted) cube as the base snapshot.
+
+        Files are written to a temporary directory that then replaces the
+        previous copy, so concurrent readers never see a partial cube.
+        """
+        target = self.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+
+        for name in self.ARRAY_NAMES:
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(self._arrays[name]))
+        with open(tmp / "vocab.json", "w") as f:
+            json.dump({
+                "drugs": self._drugs,
+                "events": self._events,
+                "strata": [list(s) for s in self._strata],
+                "stratum_fields": list(STRATUM_FIELDS),
+                "total": self._n,
+                "covered_uploads": self.covered_uploads,
+                "deltas": sorted(merged_deltas),
+            }, f)
+
+        old = target.with_name(f"{target.name}.old-{os.getpid()}")
+        if target.exists():
+            target.rename(old)
+        tmp.rename(target)
+        shutil.rmtree(old, ignore_errors=True)
+
+        self._base_stamp = self._read_base_stamp()
+        self._applied_deltas.update(merged_deltas)
+        self._base_uploads = self.covered_uploads
+        self._uploads = set()
+
+    def _read_base_stamp(self) -> Optional[Tuple[int, int]]:
+        """Identity of the base snapshot on disk (changes when it is replaced)"""
+        try:
+            stat = (self.path / "vocab.json").stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _delta_names(self) -> List[str]:
+        try:
+            return sorted(p.name for p in self.delta_path.glob("*.json"))
+        except OSError:
+            return []
+
+    def _remove_deltas(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                (self.delta_path / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _unsaved_delta(self) -> Dict[str, list]:
+        """Unsaved counts in the delta file format"""
+        strata = list(self._unsaved_strata)
+        index = {stratum: i for i, stratum in enumerate(strata)}
+        return {
+            "strata": [list(stratum) for stratum in strata],
+            "stratum_counts": [[index[s], c] for s, c in self._unsaved_strata.items()],
+            "drugs": [[d, index[s], c] for (d, s), c in self._unsaved_drugs.items()],
+            "events": [[e, index[s], c] for (e, s), c in self._unsaved_events.items()],
+            "pairs": [[d, e, index[s], c] for (d, e, s), c in self._unsaved_pairs.items()],
+            "uploads": sorted(self._unsaved_uploads),
+        }
+
+    def _apply_delta(self, delta: Dict[str, list]) -> None:
+        """Add the counts of a delta to the pending counts"""
+        if any(len(stratum) != len(STRATUM_FIELDS) for stratum in delta["strata"]):
+            logger.warning("Skipping count cube delta written with other strata")
+            return
+        with self._lock:
+            strata = [
+                self._intern(self._stratum_ids, self._strata, tuple(stratum))
+                for stratum in delta["strata"]
+            ]
+            for s, count in delta["stratum_counts"]:
+                self._pending_strata[strata[s]] += count
+                self._n += count
+            for drug, s, count in delta["drugs"]:
+                d = self._intern(self._drug_ids, self._drugs, drug)
+                self._pending_drugs[(d, strata[s])] += count
+                self._drug_totals_pending[d] += count
+            for event, s, count in delta["events"]:
+                e = self._intern(self._event_ids, self._events, event)
+                self._pending_events[(e, strata[s])] += count
+                self._event_totals_pending[e] += count
+            for drug, event, s, count in delta["pairs"]:
+                key = (
+                    self._intern(self._drug_ids, self._drugs, drug) << 32
+                ) | self._intern(self._event_ids, self._events, event)
+                self._pending_pairs[(key, strata[s])] += count
+                self._pair_totals_pending[key] += count
+            self._uploads.update(delta.get("uploads", []))
+
+    def _clear_unsaved(self) -> None:
+        self._unsaved_pairs.clear()
+        self._unsaved_drugs.clear()
+        self._unsaved_events.clear()
+        self._unsaved_strata.clear()
+        self._unsaved_uploads.clear()
+
+    @contextmanager
+    def _exclusive(self, wait: bool):
+        """
+        Cross-process lock for rewriting the base snapshot.
+
+        Yields whether it was acquired; with wait=True it blocks until it is.
+        """
+        lock = self.path.with_name(f"{self.path.name}.lock")
+        lock.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                lock.mkdir()
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - lock.stat().st_mtime > _STALE_LOCK_SECONDS:
+                        lock.rmdir()
+                        continue
+                except OSError:
+                    continue
+                if not wait:
+                    yield False
+                    return
+                time.sleep(0.1)
+        try:
+            yield True
+        finally:
+            lock.rmdir()
+
+
+_count_cube: Optional[DrugEventCountCube] = None
+_count_cube_refreshed = 0.0
+_count_cube_lock = threading.Lock()
+
+
+def get_count_cube() -> DrugEventCountCube:
+    """
+    Process-wide count cube, loaded from COUNT_CUBE_PATH on first use and
+    refreshed at most every COUNT_CUBE_REFRESH_SECONDS with the counts
+    other workers have saved
+    """
+    global _count_cube, _count_cube_refreshed
+    with _count_cube_lock:
+        now = time.monotonic()
+        if _count_cube is None:
+            _count_cube = DrugEventCountCube.load()
+            _count_cube_refreshed = now
+        elif now - _count_cube_refreshed >= REFRESH_SECONDS:
+            _count_cube.refresh()
+            _count_cube_refreshed = now
+        return _count_cube
@@ -22,7 +22,7 @@ from typing import Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
-from .bayesian_signal_detection import ContingencyTable, SignalStrength
+from .bayesian_signal_detection import ContingencyTable, SignalStrength, STRENGTH_LEVELS
 
 
 # ============================================================================
@@ -105,6 +105,89 @@ class DisproportionalityResult:
         }
 
 
+_CONFIDENCE_BY_STRENGTH = np.array([0.25, 0.50, 0.70, 0.85, 0.95])
+
+
+@dataclass
+class DisproportionalityBatchResult:
+    """
+    Columnar disproportionality results for many drug-event pairs.
+    
+    Every field is a NumPy array with one entry per input 2x2 table, in
+    input order. Row i matches DisproportionalityAnalyzer.analyze on the
+    i-th table; use to_result() to materialize a single row.
+    """
+    observed_count: np.ndarray
+    expected_count: np.ndarray
+    
+    prr: np.ndarray
+    prr_lower_ci: np.ndarray
+    prr_upper_ci: np.ndarray
+    prr_is_signal: np.ndarray
+    
+    ror: np.ndarray
+    ror_lower_ci: np.ndarray
+    ror_upper_ci: np.ndarray
+    ror_is_signal: np.ndarray
+    
+    ic: np.ndarray
+    ic_lower_ci: np.ndarray
+    ic_upper_ci: np.ndarray
+    ic_is_signal: np.ndarray
+    
+    chi_square: np.ndarray
+    chi_square_p_value: np.ndarray
+    fishers_p_value: np.ndarray  # NaN where not computed
+    
+    is_signal: np.ndarray
+    strength_code: np.ndarray  # Index into STRENGTH_LEVELS
+    confidence_level: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.observed_count)
+    
+    def to_result(self, i: int, drug: str, event: str) -> DisproportionalityResult:
+        """Materialize row i as a DisproportionalityResult"""
+        fishers_p = self.fishers_p_value[i]
+        return DisproportionalityResult(
+            drug=drug,
+            event=event,
+            observed_count=int(self.observed_count[i]),
+            expected_count=float(self.expected_count[i]),
+            prr=float(self.prr[i]),
+            prr_lower_ci=float(self.prr_lower_ci[i]),
+            prr_upper_ci=float(self.prr_upper_ci[i]),
+            prr_is_signal=bool(self.prr_is_signal[i]),
+            ror=float(self.ror[i]),
+            ror_lower_ci=float(self.ror_lower_ci[i]),
+            ror_upper_ci=float(self.ror_upper_ci[i]),
+            ror_is_signal=bool(self.ror_is_signal[i]),
+            ic=float(self.ic[i]),
+            ic_lower_ci=float(self.ic_lower_ci[i]),
+            ic_upper_ci=float(self.ic_upper_ci[i]),
+            ic_is_signal=bool(self.ic_is_signal[i]),
+            chi_square=float(self.chi_square[i]),
+            chi_square_p_value=float(self.chi_square_p_value[i]),
+            fishers_p_value=None if np.isnan(fishers_p) else float(fishers_p),
+            is_signal=bool(self.is_signal[i]),
+            signal_strength=STRENGTH_LEVELS[self.strength_code[i]],
+            confidence_level=float(self.confidence_level[i])
+        )
+
+
+def _as_count_arrays(
+    n11, n10, n01, n00
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Coerce 2x2 cell counts to equal-length float64 arrays"""
+    arrays = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(n11, dtype=np.float64)),
+        np.atleast_1d(np.asarray(n10, dtype=np.float64)),
+        np.atleast_1d(np.asarray(n01, dtype=np.float64)),
+        np.atleast_1d(np.asarray(n00, dtype=np.float64)),
+    )
+    return tuple(np.ascontiguousarray(arr) for arr in arrays)
+
+
 # ============================================================================
 # PRR (PROPORTIONAL REPORTING RATIO)
 # ============================================================================
@@ -173,6 +256,40 @@ class PRRCalculator:
         is_signal = prr >= 2.0 and a >= 3
         
         return prr, lower_ci, upper_ci, is_signal
+    
+    @staticmethod
+    def calculate_batch(
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized PRR over arrays of 2x2 tables.
+        
+        Same rules as calculate(), applied element-wise.
+        
+        Returns:
+            (prr, lower_ci, upper_ci, is_signal) arrays
+        """
+        a, b, c, d = _as_count_arrays(n11, n10, n01, n00)
+        
+        valid = (c != 0) & ((a + b) != 0) & ((c + d) != 0)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prr = np.where(valid, (a / (a + b)) / (c / (c + d)), 0.0)
+            
+            se_log_prr = np.sqrt(1/a - 1/(a+b) + 1/c - 1/(c+d))
+            log_prr = np.where(prr > 0, np.log(prr), 0.0)
+            margin = 1.96 * se_log_prr
+            
+            has_cases = valid & (a > 0)
+            lower_ci = np.where(has_cases, np.exp(log_prr - margin), 0.0)
+            upper_ci = np.where(has_cases, np.exp(log_prr + margin), 0.0)
+        
+        is_signal = valid & (prr >= 2.0) & (a >= 3)
+        
+        return prr, lower_ci, upper_ci, is_signal
 
 
 # ============================================================================
@@ -228,6 +345,44 @@ class RORCalculator:
         is_signal = lower_ci > 1.0 and ct.n11 >= 3
         
         return ror, lower_ci, upper_ci, is_signal
+    
+    @staticmethod
+    def calculate_batch(
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized ROR over arrays of 2x2 tables.
+        
+        Same rules as calculate(), applied element-wise. Tables whose
+        scalar computation would divide by zero yield inf/NaN instead
+        of raising.
+        
+        Returns:
+            (ror, lower_ci, upper_ci, is_signal) arrays
+        """
+        a, b, c, d = _as_count_arrays(n11, n10, n01, n00)
+        observed = a
+        
+        # 0.5 continuity correction where b or c is zero
+        correction = np.where((b == 0) | (c == 0), 0.5, 0.0)
+        a, b, c, d = a + correction, b + correction, c + correction, d + correction
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ror = (a * d) / (b * c)
+            se_log_ror = np.sqrt(1/a + 1/b + 1/c + 1/d)
+            
+            log_ror = np.log(ror)
+            margin = 1.96 * se_log_ror
+            
+            lower_ci = np.exp(log_ror - margin)
+            upper_ci = np.exp(log_ror + margin)
+        
+        is_signal = (lower_ci > 1.0) & (observed >= 3)
+        
+        return ror, lower_ci, upper_ci, is_signal
 
 
 # ============================================================================
@@ -289,6 +444,40 @@ class ICCalculator:
         is_signal = lower_ci > 0 and a >= 3
         
         return ic, lower_ci, upper_ci, is_signal
+    
+    @staticmethod
+    def calculate_batch(
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized IC over arrays of 2x2 tables.
+        
+        Same rules as calculate(), applied element-wise.
+        
+        Returns:
+            (ic, lower_ci, upper_ci, is_signal) arrays
+        """
+        a, b, c, d = _as_count_arrays(n11, n10, n01, n00)
+        n1x = a + b
+        nx1 = a + c
+        N = a + b + c + d
+        
+        valid = (a != 0) & (n1x != 0) & (nx1 != 0) & (N != 0)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            E = (n1x * nx1) / N
+            ic = np.where(valid, np.log2(a / E), 0.0)
+            
+            sd = np.sqrt(1/a + 1/E)
+            lower_ci = np.where(valid, ic - 1.96 * sd, 0.0)
+            upper_ci = np.where(valid, ic + 1.96 * sd, 0.0)
+        
+        is_signal = valid & (lower_ci > 0) & (a >= 3)
+        
+        return ic, lower_ci, upper_ci, is_signal
 
 
 # ============================================================================
@@ -320,6 +509,46 @@ class StatisticalTests:
         
         return chi2, p_value
     
+    @staticmethod
+    def chi_square_batch(
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized chi-square test over arrays of 2x2 tables.
+        
+        Reproduces scipy.stats.chi2_contingency for 2x2 tables (one
+        degree of freedom, Yates' continuity correction). Tables with an
+        empty row or column, which chi2_contingency rejects, get
+        chi-square 0 and p-value 1.
+        
+        Returns:
+            (chi_square, p_value) arrays
+        """
+        a, b, c, d = _as_count_arrays(n11, n10, n01, n00)
+        row1, row0 = a + b, c + d
+        col1, col0 = a + c, b + d
+        N = row1 + row0
+        
+        valid = (row1 > 0) & (row0 > 0) & (col1 > 0) & (col0 > 0)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            e11 = row1 * col1 / N
+            e10 = row1 * col0 / N
+            e01 = row0 * col1 / N
+            e00 = row0 * col0 / N
+            
+            # Yates: move every cell toward its expectation by up to 0.5
+            dev = np.maximum(np.abs(a - e11) - 0.5, 0.0) ** 2
+            chi2 = dev / e11 + dev / e10 + dev / e01 + dev / e00
+        
+        chi2 = np.where(valid, chi2, 0.0)
+        p_value = np.where(valid, stats.chi2.sf(chi2, 1), 1.0)
+        
+        return chi2, p_value
+    
     @staticmethod
     def fishers_exact(ct: ContingencyTable) -> float:
         """
@@ -407,6 +636,41 @@ class DisproportionalitySignalClassifier:
         
         # No Signal
         return SignalStrength.NONE, 0.25
+    
+    @staticmethod
+    def classify_batch(
+        prr: np.ndarray,
+        prr_is_signal: np.ndarray,
+        ror_is_signal: np.ndarray,
+        ic_is_signal: np.ndarray,
+        observed: np.ndarray,
+        chi_square_p: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized classify(); same rules in the same precedence order.
+        
+        Returns:
+            (strength_code, confidence) arrays, where strength_code
+            indexes STRENGTH_LEVELS
+        """
+        methods_detecting = (
+            prr_is_signal.astype(np.int8)
+            + ror_is_signal.astype(np.int8)
+            + ic_is_signal.astype(np.int8)
+        )
+        
+        strength_code = np.select(
+            [
+                (methods_detecting == 3) & (observed >= 10) & (chi_square_p < 0.001),
+                (methods_detecting >= 2) & (observed >= 5) & (chi_square_p < 0.01),
+                (methods_detecting >= 1) & (observed >= 3) & (chi_square_p < 0.05),
+                (methods_detecting >= 1) | ((prr >= 1.5) & (observed >= 3)),
+            ],
+            [4, 3, 2, 1],
+            default=0
+        ).astype(np.int8)
+        
+        return strength_code, _CONFIDENCE_BY_STRENGTH[strength_code]
 
 
 # ============================================================================
@@ -449,51 +713,81 @@ class DisproportionalityAnalyzer:
         Returns:
             Complete disproportionality result
         """
-        observed = contingency_table.n11
-        expected = contingency_table.expected
-        
-        # Skip if below minimum count
-        if observed < self.min_count:
-            return self._create_no_signal(drug, event, observed, expected)
-        
-        # Calculate PRR
-        prr, prr_lower, prr_upper, prr_signal = self.prr_calculator.calculate(
-            contingency_table
+        ct = contingency_table
+        batch = self.analyze_batch(
+            ct.n11, ct.n10, ct.n01, ct.n00,
+            include_fishers=True
         )
+        return batch.to_result(0, drug, event)
+    
+    def analyze_batch(
+        self,
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray,
+        include_fishers: bool = False
+    ) -> DisproportionalityBatchResult:
+        """
+        Perform disproportionality analysis over arrays of 2x2 tables.
         
-        # Calculate ROR
-        ror, ror_lower, ror_upper, ror_signal = self.ror_calculator.calculate(
-            contingency_table
-        )
+        All point estimates, intervals, tests and signal flags are
+        computed in one vectorized pass. Pairs below min_count get the
+        same 'no signal' values as analyze().
         
-        # Calculate IC
-        ic, ic_lower, ic_upper, ic_signal = self.ic_calculator.calculate(
-            contingency_table
-        )
+        Args:
+            n11: Drug + event counts
+            n10: Drug + not event counts
+            n01: Not drug + event counts
+            n00: Not drug + not event counts
+            include_fishers: Also run Fisher's exact test on small-sample
+                pairs. This is a per-pair scipy call, so it is off by
+                default for large batches.
+            
+        Returns:
+            Columnar batch result in input order
+        """
+        a, b, c, d = _as_count_arrays(n11, n10, n01, n00)
         
-        # Statistical tests
-        chi_square, chi_p = self.statistical_tests.chi_square(contingency_table)
+        N = a + b + c + d
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = np.where(N != 0, (a + b) * (a + c) / N, 0.0)
         
-        # Fisher's exact for small samples
-        fishers_p = None
-        if expected < 5 or observed < 5:
-            fishers_p = self.statistical_tests.fishers_exact(contingency_table)
+        active = a >= self.min_count
         
-        # Overall signal assessment
-        is_signal = prr_signal or ror_signal or ic_signal
+        prr, prr_lower, prr_upper, prr_signal = self.prr_calculator.calculate_batch(a, b, c, d)
+        ror, ror_lower, ror_upper, ror_signal = self.ror_calculator.calculate_batch(a, b, c, d)
+        ic, ic_lower, ic_upper, ic_signal = self.ic_calculator.calculate_batch(a, b, c, d)
+        chi_square, chi_p = self.statistical_tests.chi_square_batch(a, b, c, d)
         
-        # Classify signal strength
-        strength, confidence = self.classifier.classify(
-            prr, prr_signal,
-            ror, ror_signal,
-            ic_lower, ic_signal,
-            observed, chi_p
+        # Rows below the minimum count report no signal at all
+        prr, prr_lower, prr_upper, ror, ror_lower, ror_upper, ic, ic_lower, ic_upper, chi_square = (
+            np.where(active, arr, 0.0)
+            for arr in (prr, prr_lower, prr_upper, ror, ror_lower, ror_upper,
+                        ic, ic_lower, ic_upper, chi_square)
+        )
+        chi_p = np.where(active, chi_p, 1.0)
+        prr_signal &= active
+        ror_signal &= active
+        ic_signal &= active
+        
+        fishers_p = np.full(len(a), np.nan)
+        if include_fishers:
+            needs_fishers = active & ((expected < 5) | (a < 5))
+            for i in np.flatnonzero(needs_fishers):
+                table = np.array([[a[i], b[i]], [c[i], d[i]]], dtype=np.int64)
+                fishers_p[i] = stats.fisher_exact(table)[1]
+        
+        is_signal = prr_signal | ror_signal | ic_signal
+        
+        strength_code, confidence = self.classifier.classify_batch(
+            prr, prr_signal, ror_signal, ic_signal, a, chi_p
         )
+        strength_code = np.where(active, strength_code, 0).astype(np.int8)
+        confidence = np.where(active, confidence, 0.0)
         
-        return DisproportionalityResult(
-            drug=drug,
-            event=event,
-            observed_count=observed,
+        return DisproportionalityBatchResult(
+            observed_count=a.astype(np.int64),
             expected_count=expected,
             prr=prr,
             prr_lower_ci=prr_lower,
@@ -511,42 +805,9 @@ class DisproportionalityAnalyzer:
             chi_square_p_value=chi_p,
             fishers_p_value=fishers_p,
             is_signal=is_signal,
-            signal_strength=strength,
+            strength_code=strength_code,
             confidence_level=confidence
         )
-    
-    def _create_no_signal(
-        self,
-        drug: str,
-        event: str,
-        observed: int,
-        expected: float
-    ) -> DisproportionalityResult:
-        """Create a 'no signal' result for low-count pairs"""
-        return DisproportionalityResult(
-            drug=drug,
-            event=event,
-            observed_count=observed,
-            expected_count=expected,
-            prr=0.0,
-            prr_lower_ci=0.0,
-            prr_upper_ci=0.0,
-            prr_is_signal=False,
-            ror=0.0,
-            ror_lower_ci=0.0,
-            ror_upper_ci=0.0,
-            ror_is_signal=False,
-            ic=0.0,
-            ic_lower_ci=0.0,
-            ic_upper_ci=0.0,
-            ic_is_signal=False,
-            chi_square=0.0,
-            chi_square_p_value=1.0,
-            fishers_p_value=None,
-            is_signal=False,
-            signal_strength=SignalStrength.NONE,
-            confidence_level=0.0
-        )
 
 
 # ============================================================================
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
 from supabase import create_client, Client
 
@@ -10,12 +10,19 @@ from app.core.signal_detection.query_router import (
     SignalQuerySpec,
     QueryRouter,
     FusionResultSummary,
+    QueryResult,
+)
+from app.core.signal_detection.complete_fusion_engine import get_fusion_engine
+from app.core.signal_detection.metrics_provider import (
+    create_supabase_metrics_provider,
+    create_supabase_batch_metrics_provider,
+    create_count_cube_cooccurrence_index,
 )
-from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine
-from app.core.signal_detection.metrics_provider import create_supabase_metrics_provider
 from app.core.terminology.fda_mapper import FDATerminologyMapper
 from app.core.analysis.models import SignalQueryFilters
+from app.core.analysis.query_cache import get_query_cache, query_cache_key
 
+import json
 import os
 
 _supabase: Optional[Client] = None
@@ -47,17 +54,28 @@ def get_query_router() -> Optional[QueryRouter]:
         return None
 
     metrics_provider = create_supabase_metrics_provider(supabase)
-    fusion_engine = CompleteFusionEngine()
+    batch_metrics_provider = create_supabase_batch_metrics_provider(supabase)
+    fusion_engine = get_fusion_engine()
     fda_mapper = FDATerminologyMapper()
 
     _query_router = QueryRouter(
         fusion_engine=fusion_engine,
         metrics_provider=metrics_provider,
+        batch_metrics_provider=batch_metrics_provider,
+        cooccurrence_index=create_count_cube_cooccurrence_index(
+            ingest_watermark=get_query_cache().current_watermark
+        ),
         fda_mapper=fda_mapper,
     )
     return _query_router
 
 
+def close_query_router() -> None:
+    """Shut down the shared router's worker pools (app shutdown)"""
+    if _query_router is not None:
+        _query_router.close()
+
+
 def _filters_to_spec(filters: SignalQueryFilters, limit: int = 100) -> SignalQuerySpec:
     """
     Minimal bridge from conversational filters -> SignalQuerySpec.
@@ -82,13 +100,22 @@ def _filters_to_spec(filters: SignalQueryFilters, limit: int = 100) -> SignalQue
     )
 
 
+def _config_fingerprint(fusion_engine) -> str:
+    """Cache key part that changes when the engine's config does"""
+    return json.dumps(fusion_engine.config.to_dict(), sort_keys=True)
+
+
 def run_fusion_for_filters(
     filters: SignalQueryFilters,
     limit: int = 50,
+    organization: Optional[str] = None,
+    user_id: Optional[str] = None,
 ) -> List[FusionResultSummary]:
     """
     Core helper: given a cohort filter definition, rank signals within that cohort.
 
+    Scores use the signal detection config of the organization/user.
+
     Returns a list of FusionResultSummary entries sorted by fusion_score.
     """
     router = get_query_router()
@@ -97,11 +124,94 @@ def run_fusion_for_filters(
         return []
 
     spec = _filters_to_spec(filters, limit=limit)
+    fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
 
     # This call will:
     # - fetch metrics via metrics_provider
     # - run CompleteFusionEngine
     # - return sorted FusionResultSummary objects
-    results = router.run_query(spec)
-    return results
+    # Repeated filters are served from the query result cache; results
+    # computed while a provider was failing are not cached.
+    result = get_query_cache().get_or_compute(
+        query_cache_key("fusion", filters, limit, _config_fingerprint(fusion_engine)),
+        lambda: router.run_query_detailed(spec, fusion_engine=fusion_engine),
+        dump=_dump_result,
+        load=_load_result,
+        cacheable=lambda result: result.complete,
+    )
+    return result.results
+
+
+async def run_fusion_for_filters_async(
+    filters: SignalQueryFilters,
+    limit: int = 50,
+    organization: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> QueryResult:
+    """
+    Async run_fusion_for_filters() for FastAPI handlers; evidence fetching
+    and fusion run off the event loop.
+
+    Returns a QueryResult so callers can report pruned (empty) pairs and
+    pairs whose evidence could not be fetched; such results are not cached.
+    """
+    router = get_query_router()
+    if router is None:
+        return QueryResult(results=[])
+
+    spec = _filters_to_spec(filters, limit=limit)
+    fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
+    return await get_query_cache().get_or_compute_async(
+        query_cache_key("fusion_detailed", filters, limit, _config_fingerprint(fusion_engine)),
+        lambda: router.run_query_detailed_async(spec, fusion_engine=fusion_engine),
+        dump=_dump_result,
+        load=_load_result,
+        cacheable=lambda result: result.complete,
+    )
+
+
+async def stream_fusion_for_filters(
+    filters: SignalQueryFilters,
+    limit: int = 50,
+    organization: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> AsyncIterator[List[FusionResultSummary]]:
+    """
+    Running top `limit` results for filters as evidence arrives
+    (QueryRouter.stream_query). The last list equals
+    run_fusion_for_filters_async(filters, limit).results when no provider
+    call failed. Streamed runs are not cached.
+    """
+    router = get_query_router()
+    if router is None:
+        yield []
+        return
+
+    spec = _filters_to_spec(filters, limit=limit)
+    fusion_engine = get_fusion_engine(user_id=user_id, organization=organization)
+    async for results in router.stream_query(spec, fusion_engine=fusion_engine):
+        yield results
+
+
+def _dump_result(result: QueryResult) -> dict:
+    return {
+        "results": _dump_summaries(result.results),
+        "candidate_pairs": result.candidate_pairs,
+        "skipped_pairs": result.skipped_pairs,
+    }
+
+
+def _load_result(data: dict) -> QueryResult:
+    return QueryResult(
+        results=_load_summaries(data["results"]),
+        candidate_pairs=data["candidate_pairs"],
+        skipped_pairs=data["skipped_pairs"],
+    )
+
+
+def _dump_summaries(results: List[FusionResultSummary]) -> List[dict]:
+    return [r.to_dict() for r in results]
+
 
+def _load_summaries(data: List[dict]) -> List[FusionResultSummary]:
+    return [FusionResultSummary(**d) for d in data]
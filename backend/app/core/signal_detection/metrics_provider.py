@@ -9,11 +9,18 @@ You can implement multiple providers:
 - SupabaseMetricsProvider (for Supabase database)
 - DataFrameMetricsProvider (for Pandas DataFrames)
 - FAERSMetricsProvider (for FAERS parquet files)
+
+Batch providers receive every candidate pair of a query at once:
+- create_supabase_batch_metrics_provider (one filtered pv_cases query)
+
+create_count_cube_cooccurrence_index lets the router skip pairs the local
+count cube has never seen.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Any
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -23,10 +30,18 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
-from .query_router import SignalQuerySpec, MetricsProvider
+from .query_router import (
+    SignalQuerySpec,
+    MetricsProvider,
+    BatchMetricsProvider,
+    CooccurrenceIndex,
+)
 
 logger = logging.getLogger(__name__)
 
+# pv_cases columns needed to build evidence
+CASE_COLUMNS = "drug_name,reaction,serious,event_date,report_date,outcome"
+
 
 def create_supabase_metrics_provider(supabase_client: Any) -> MetricsProvider:
     """
@@ -57,111 +72,216 @@ def create_supabase_metrics_provider(supabase_client: Any) -> MetricsProvider:
           - age_yrs (numeric) ✅
           - sex (text, optional) ✅
           - outcome (text, optional) ✅
+
+        Query errors propagate so the router can tell "no cases" from
+        "could not fetch".
         """
-        try:
-            # Build query
-            query = supabase_client.table("pv_cases").select("*")
-
-            # Filter by drug (case-insensitive)
-            query = query.ilike("drug_name", f"%{drug}%")
-
-            # Filter by event/reaction (case-insensitive)
-            # Try both 'reaction' and 'event_term' columns
-            if hasattr(query, 'or_'):
-                query = query.or_(
-                    f"reaction.ilike.%{event}%,event_term.ilike.%{event}%"
-                )
-            else:
-                # Fallback: try reaction column first
-                query = query.ilike("reaction", f"%{event}%")
+        # Build query
+        query = supabase_client.table("pv_cases").select("*")
+
+        # Filter by drug (case-insensitive)
+        query = query.ilike("drug_name", f"%{drug}%")
+
+        # Filter by event/reaction (case-insensitive)
+        # Try both 'reaction' and 'event_term' columns
+        if hasattr(query, 'or_'):
+            query = query.or_(
+                f"{_ilike_filter('reaction', event)},{_ilike_filter('event_term', event)}"
+            )
+        else:
+            # Fallback: try reaction column first
+            query = query.ilike("reaction", f"%{event}%")
+
+        # Apply seriousness, age and time window filters
+        # Note: Schema uses 'serious' (boolean), not 'is_serious'
+        query = _apply_spec_filters(query, spec)
+
+        # Execute query
+        response = query.execute()
+        rows = response.data or []
+
+        if not rows:
+            logger.debug(f"No cases found for {drug} + {event}")
+            return {}
 
-            # Apply seriousness filter
-            # Note: Schema uses 'serious' (boolean), not 'is_serious'
-            if spec.seriousness_only:
-                query = query.eq("serious", True)
+        # Aggregate data
+        count = len(rows)
+        signal_data = _signal_data_from_rows(rows)
 
-            # Apply age filters
-            if spec.age_min is not None:
-                query = query.gte("age_yrs", spec.age_min)
-            if spec.age_max is not None:
-                query = query.lte("age_yrs", spec.age_max)
+        # Calculate total_cases (denominator for rarity calculation)
+        # Option 1: Query total cases in database
+        total_response = supabase_client.table("pv_cases").select("id", count="exact").execute()
+        total_cases = total_response.count if hasattr(total_response, 'count') else count * 10  # Fallback
 
-            # Apply time window filter
-            if spec.time_window:
-                from_date = _parse_time_window(spec.time_window)
-                if from_date:
-                    query = query.gte("event_date", from_date.isoformat())
+        # Build evidence dict for CompleteFusionEngine.detect_signal()
+        evidence = _build_evidence(drug, event, signal_data, total_cases)
 
-            # Execute query
-            response = query.execute()
-            rows = response.data or []
+        return evidence
 
-            if not rows:
-                logger.debug(f"No cases found for {drug} + {event}")
-                return {}
+    return metrics_provider
 
-            # Aggregate data
-            count = len(rows)
-            # Note: Schema uses 'serious' (boolean), not 'is_serious'
-            serious_count = sum(1 for r in rows if r.get("serious", False))
-            seriousness = "yes" if serious_count > 0 else "no"
-
-            # Extract dates
-            dates = []
-            for r in rows:
-                date_str = r.get("event_date") or r.get("report_date")
-                if date_str:
-                    try:
-                        if isinstance(date_str, str):
-                            dates.append(datetime.fromisoformat(date_str.replace("Z", "+00:00")))
-                        elif isinstance(date_str, datetime):
-                            dates.append(date_str)
-                    except Exception:
-                        pass
-
-            # Extract outcomes
-            outcomes = []
-            for r in rows:
-                outcome = r.get("outcome", "")
-                if outcome:
-                    outcomes.append(str(outcome))
-
-            # Build signal_data dict
-            signal_data = {
-                "count": count,
-                "serious_count": serious_count,
-                "seriousness": seriousness,
-                "dates": dates,
-                "outcomes": outcomes,
-                "sources": ["faers"],  # Default source, can be enhanced
-            }
 
-            # Calculate total_cases (denominator for rarity calculation)
-            # Option 1: Query total cases in database
-            total_response = supabase_client.table("pv_cases").select("id", count="exact").execute()
-            total_cases = total_response.count if hasattr(total_response, 'count') else count * 10  # Fallback
+def create_supabase_batch_metrics_provider(
+    supabase_client: Any,
+    page_size: int = 1000,
+) -> BatchMetricsProvider:
+    """
+    Create a batch metrics provider that queries Supabase once per spec.
 
-            # Build evidence dict for CompleteFusionEngine.detect_signal()
-            evidence = {
-                "drug": drug,
-                "event": event,
-                "signal_data": signal_data,
-                "total_cases": max(total_cases, count),  # Ensure at least count
-                # Optional: Add contingency table, clinical features, time series if available
-                "contingency_table": None,
-                "clinical_features": None,
-                "time_series": None,
-                "sources": signal_data.get("sources"),
-                "label_reactions": None,  # Can be populated from drug label data
-            }
+    All candidate drugs and reactions go into a single filtered pv_cases
+    query (paged by page_size rows), and rows are assigned to pairs with the
+    same case-insensitive substring match as the per-pair provider's ilike
+    filters. total_cases is counted once per spec.
 
-            return evidence
+    Args:
+        supabase_client: Your Supabase client instance
+        page_size: Rows per request
 
-        except Exception as e:
-            logger.exception(f"Error in metrics_provider for {drug} + {event}: {e}")
+    Returns:
+        BatchMetricsProvider callable
+
+    Usage:
+        provider = create_supabase_batch_metrics_provider(supabase)
+        router = QueryRouter(fusion_engine, batch_metrics_provider=provider)
+    """
+    def batch_metrics_provider(
+        pairs: List[Tuple[str, str]],
+        spec: SignalQuerySpec,
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        if not pairs:
             return {}
 
-    return metrics_provider
+        drugs = list(dict.fromkeys(drug for drug, _ in pairs))
+        events = list(dict.fromkeys(event for _, event in pairs))
+
+        drug_filter = ",".join(_ilike_filter("drug_name", drug) for drug in drugs)
+        event_filter = ",".join(_ilike_filter("reaction", event) for event in events)
+
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            query = supabase_client.table("pv_cases").select(CASE_COLUMNS)
+            query = query.or_(f"and(or({drug_filter}),or({event_filter}))")
+            query = _apply_spec_filters(query, spec)
+            # A stable order keeps pages from skipping or repeating rows
+            page = query.order("id").range(offset, offset + page_size - 1).execute().data or []
+            rows.extend(page)
+            offset += len(page)
+            if len(page) < page_size:
+                break
+
+        # Assign rows to pairs
+        wanted = set(pairs)
+        drug_terms = [(drug, drug.lower()) for drug in drugs]
+        event_terms = [(event, event.lower()) for event in events]
+        rows_by_pair: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            drug_name = str(row.get("drug_name") or "").lower()
+            reaction = str(row.get("reaction") or "").lower()
+            matched_drugs = [drug for drug, term in drug_terms if term in drug_name]
+            if not matched_drugs:
+                continue
+            matched_events = [event for event, term in event_terms if term in reaction]
+            for drug in matched_drugs:
+                for event in matched_events:
+                    if (drug, event) in wanted:
+                        rows_by_pair[(drug, event)].append(row)
+
+        if not rows_by_pair:
+            logger.debug(f"No cases found for {len(pairs)} pairs")
+            return {}
+
+        total_response = (
+            supabase_client.table("pv_cases").select("id", count="exact").limit(1).execute()
+        )
+        total_cases = getattr(total_response, "count", None)
+
+        evidence_by_pair: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for (drug, event), pair_rows in rows_by_pair.items():
+            count = len(pair_rows)
+            signal_data = _signal_data_from_rows(pair_rows)
+            evidence_by_pair[(drug, event)] = _build_evidence(
+                drug, event, signal_data,
+                total_cases if total_cases is not None else count * 10,  # Fallback
+            )
+        return evidence_by_pair
+
+    return batch_metrics_provider
+
+
+def _ilike_filter(column: str, term: str) -> str:
+    """
+    PostgREST filter for column ILIKE '%term%' to use inside or()
+
+    The term matches literally: LIKE wildcards in it are escaped, and the
+    value is double-quoted so commas, dots and parentheses in names do not
+    break the or() syntax.
+    """
+    pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    quoted = pattern.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{column}.ilike."%{quoted}%"'
+
+
+def _apply_spec_filters(query: Any, spec: SignalQuerySpec) -> Any:
+    """Seriousness, age and time-window filters on a pv_cases query"""
+    if spec.seriousness_only:
+        query = query.eq("serious", True)
+    if spec.age_min is not None:
+        query = query.gte("age_yrs", spec.age_min)
+    if spec.age_max is not None:
+        query = query.lte("age_yrs", spec.age_max)
+    if spec.time_window:
+        from_date = _parse_time_window(spec.time_window)
+        if from_date:
+            query = query.gte("event_date", from_date.isoformat())
+    return query
+
+
+def _signal_data_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate pv_cases rows of one pair into fusion signal_data"""
+    serious_count = sum(1 for r in rows if r.get("serious", False))
+
+    dates = []
+    for r in rows:
+        date_str = r.get("event_date") or r.get("report_date")
+        if date_str:
+            try:
+                if isinstance(date_str, str):
+                    dates.append(datetime.fromisoformat(date_str.replace("Z", "+00:00")))
+                elif isinstance(date_str, datetime):
+                    dates.append(date_str)
+            except Exception:
+                pass
+
+    return {
+        "count": len(rows),
+        "serious_count": serious_count,
+        "seriousness": "yes" if serious_count > 0 else "no",
+        "dates": dates,
+        "date_histogram": dict(sorted(Counter(d.strftime("%Y-%m") for d in dates).items())),
+        "outcomes": [str(r["outcome"]) for r in rows if r.get("outcome")],
+        "sources": ["faers"],
+    }
+
+
+def _build_evidence(
+    drug: str,
+    event: str,
+    signal_data: Dict[str, Any],
+    total_cases: int,
+) -> Dict[str, Any]:
+    """Evidence dict for CompleteFusionEngine.detect_signal()"""
+    return {
+        "drug": drug,
+        "event": event,
+        "signal_data": signal_data,
+        "total_cases": max(total_cases, signal_data["count"]),  # Ensure at least count
+        "contingency_table": None,
+        "clinical_features": None,
+        "time_series": None,
+        "sources": signal_data.get("sources"),
+        "label_reactions": None,
+    }
 
 
 def _parse_time_window(time_window: str) -> Optional[datetime]:
@@ -293,3 +413,56 @@ def create_dataframe_metrics_provider(df: Any) -> MetricsProvider:
 
     return metrics_provider
 
+
+def create_count_cube_cooccurrence_index(
+    cube: Any = None,
+    substring: bool = True,
+    ingest_watermark: Optional[Callable[[], Optional[Tuple[int, Optional[str]]]]] = None,
+) -> CooccurrenceIndex:
+    """
+    Create a co-occurrence index backed by the drug-event count cube.
+
+    With substring=True names match cube terms the way the Supabase
+    providers' ILIKE filters do, so a pair is only reported empty when no
+    matching drug/reaction pair was ever counted.
+
+    A zero count only means "no such case" if the cube counts every case
+    in pv_cases, so the index reports nothing (no pairs are pruned) unless
+    the cube's covered_uploads equals the completed uploads of the current
+    ingest watermark. Without ingest_watermark coverage cannot be checked
+    and nothing is ever pruned.
+
+    Args:
+        cube: DrugEventCountCube (defaults to get_count_cube())
+        substring: Match names as substrings instead of exactly
+        ingest_watermark: Callable returning the current ingest watermark
+            (e.g. QueryResultCache.current_watermark)
+
+    Returns:
+        CooccurrenceIndex callable
+    """
+    def cooccurrence_index(pairs: List[Tuple[str, str]]) -> Optional[List[int]]:
+        from .count_cube import get_count_cube
+
+        if ingest_watermark is None:
+            return None
+        count_cube = cube if cube is not None else get_count_cube()
+        covered = count_cube.covered_uploads
+        if covered is None:
+            return None
+        watermark = ingest_watermark()
+        if watermark is None or watermark[0] != covered:
+            logger.debug(
+                f"Count cube covers {covered} uploads, watermark is {watermark}; not pruning"
+            )
+            return None
+
+        drugs = list(dict.fromkeys(drug for drug, _ in pairs))
+        events = list(dict.fromkeys(event for _, event in pairs))
+        counts = count_cube.cooccurrence_counts(drugs, events, substring=substring)
+
+        drug_index = {drug: i for i, drug in enumerate(drugs)}
+        event_index = {event: j for j, event in enumerate(events)}
+        return [int(counts[drug_index[drug], event_index[event]]) for drug, event in pairs]
+
+    return cooccurrence_index
@@ -13,26 +13,51 @@ High-level flow:
 1. NLP (or ai_query) produces a `SignalQuerySpec` or filters dict.
 2. QueryRouter:
    - Uses FDATerminologyMapper to normalize reaction terms.
-   - Builds candidate (drug, event) pairs.
-   - Calls `metrics_provider(drug, event, spec)` for evidence.
+   - Builds candidate (drug, event) pairs, dropping pairs an optional
+     `cooccurrence_index` reports as never co-occurring.
+   - Calls `batch_metrics_provider(pairs, spec)` once for all pairs, or
+     `metrics_provider(drug, event, spec)` per pair, for evidence.
    - Calls `fusion_engine.detect_signal(**evidence)`.
    - Returns ranked results with fusion scores and simple explanations.
+
+`run_query_async` / `stream_query` do the same without blocking the event
+loop: provider calls fan out on a thread pool with bounded concurrency,
+fusion for large candidate sets runs in a process pool, and partial top-k
+results are yielded as evidence arrives.
+
+The query methods take an optional `fusion_engine` to score one query with
+a request's organization/user config (get_fusion_engine()) instead of the
+router's default engine.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any, Callable, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime
+import asyncio
+import heapq
+import json
 import logging
+import multiprocessing
+import os
 
 from pydantic import BaseModel, Field
 
 from app.core.terminology.fda_mapper import FDATerminologyMapper, MappedTerm
 from app.core.signal_detection.complete_fusion_engine import CompleteFusionEngine
+from app.core.signal_detection.config import SignalDetectionConfig
 
 logger = logging.getLogger(__name__)
 
+# Concurrency for the async query path
+MAX_CONCURRENCY = int(os.getenv("QUERY_ROUTER_MAX_CONCURRENCY", "8"))
+# Pairs per batch_metrics_provider call on the async path
+EVIDENCE_CHUNK_SIZE = int(os.getenv("QUERY_ROUTER_CHUNK_SIZE", "250"))
+# Candidate count above which fusion runs in a process pool
+PROCESS_POOL_MIN_PAIRS = int(os.getenv("QUERY_ROUTER_PROCESS_POOL_MIN_PAIRS", "2000"))
+
 # -------------------------------------------------------------------------
 # Intent / filters model
 # -------------------------------------------------------------------------
@@ -98,6 +123,42 @@ class FusionResultSummary:
 # Type alias: metrics_provider takes (drug, event, spec) → evidence dict for fusion
 MetricsProvider = Callable[[str, str, SignalQuerySpec], Dict[str, Any]]
 
+# Type alias: batch_metrics_provider takes all (drug, event) pairs of a spec →
+# evidence dict per pair (pairs without evidence may be omitted)
+BatchMetricsProvider = Callable[
+    [List[Tuple[str, str]], SignalQuerySpec],
+    Dict[Tuple[str, str], Dict[str, Any]],
+]
+
+# Type alias: cooccurrence_index takes (drug, event) pairs → co-occurrence
+# count per pair (0 = never reported together), or None if it cannot tell
+CooccurrenceIndex = Callable[[List[Tuple[str, str]]], Optional[List[int]]]
+
+
+@dataclass
+class QueryResult:
+    """
+    Ranked results of a query plus candidate bookkeeping.
+    """
+    results: List[FusionResultSummary]
+    candidate_pairs: int = 0
+    skipped_pairs: int = 0  # Pairs pruned by the co-occurrence index
+    failed_pairs: int = 0  # Pairs whose evidence could not be fetched
+
+    @property
+    def complete(self) -> bool:
+        """False if provider errors may have dropped results"""
+        return not self.failed_pairs
+
+    @property
+    def message(self) -> Optional[str]:
+        parts = []
+        if self.skipped_pairs:
+            parts.append(f"skipped {self.skipped_pairs} empty pairs")
+        if self.failed_pairs:
+            parts.append(f"evidence unavailable for {self.failed_pairs} pairs")
+        return "; ".join(parts) or None
+
 
 # -------------------------------------------------------------------------
 # Query Router
@@ -110,7 +171,9 @@ class QueryRouter:
     - output: list of FusionResultSummary, ranked by fusion_score
 
     It **does not** know about Supabase or how evidence is built;
-    that's the job of the injected `metrics_provider`.
+    that's the job of the injected `metrics_provider` or
+    `batch_metrics_provider`. When a batch provider is given it is used
+    instead of the per-pair provider.
     """
 
     def __init__(
@@ -118,10 +181,16 @@ class QueryRouter:
         fusion_engine: CompleteFusionEngine,
         fda_mapper: Optional[FDATerminologyMapper] = None,
         metrics_provider: Optional[MetricsProvider] = None,
+        batch_metrics_provider: Optional[BatchMetricsProvider] = None,
+        cooccurrence_index: Optional[CooccurrenceIndex] = None,
     ) -> None:
         self.fusion_engine = fusion_engine
         self.fda_mapper = fda_mapper or FDATerminologyMapper()
         self.metrics_provider: MetricsProvider = metrics_provider or self._default_metrics_provider
+        self.batch_metrics_provider = batch_metrics_provider
+        self.cooccurrence_index = cooccurrence_index
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -130,43 +199,40 @@ class QueryRouter:
     def run_query(
         self,
         spec: SignalQuerySpec,
+        fusion_engine: Optional[CompleteFusionEngine] = None,
     ) -> List[FusionResultSummary]:
         """
         Main entry point: take a SignalQuerySpec and return ranked signals.
         """
-        # 1) Normalize reactions via FDA mapper
-        mapped_reactions = self._normalize_reactions(spec.reactions)
+        return self.run_query_detailed(spec, fusion_engine=fusion_engine).results
 
-        # 2) Build candidate (drug, event) pairs
-        candidates = self._build_candidate_pairs(spec.drugs, mapped_reactions)
+    def run_query_detailed(
+        self,
+        spec: SignalQuerySpec,
+        fusion_engine: Optional[CompleteFusionEngine] = None,
+    ) -> QueryResult:
+        """
+        run_query() plus how many candidate pairs were built and pruned.
+        """
+        fusion_engine = fusion_engine or self.fusion_engine
+        # 1-2) Normalize reactions and build non-empty candidate pairs
+        candidates, skipped = self._prepare_candidates(spec)
 
         if not candidates:
-            logger.info("QueryRouter: no candidates generated for spec=%s", spec.model_dump_json())
-            return []
+            return QueryResult(results=[], skipped_pairs=skipped)
 
-        # 3) For each candidate, gather metrics and run fusion
+        # 3) Gather metrics for all candidates, then run fusion per candidate
+        evidence_by_pair, failed = self._gather_evidence(candidates, spec)
         results: List[FusionResultSummary] = []
 
         for drug, event in candidates:
             try:
-                evidence = self.metrics_provider(drug, event, spec)
+                evidence = evidence_by_pair.get((drug, event))
                 if not evidence:
                     continue
 
-                fusion_output = self.fusion_engine.detect_signal(**evidence)
-
-                summary = FusionResultSummary(
-                    drug=drug,
-                    event=event,
-                    fusion_score=fusion_output.fusion_score,
-                    alert_level=fusion_output.alert_level,
-                    quantum_score_layer1=getattr(fusion_output, "quantum_score_layer1", None),
-                    quantum_score_layer2=getattr(fusion_output, "quantum_score_layer2", None),
-                    classical_score=getattr(fusion_output, "classical_score", None),
-                    explanation=self._generate_explanation(drug, event, fusion_output),
-                    components=getattr(fusion_output, "components", {}),
-                )
-                results.append(summary)
+                fusion_output = fusion_engine.detect_signal(**evidence)
+                results.append(self._summarize(drug, event, fusion_output))
 
             except Exception as e:
                 logger.exception("QueryRouter: fusion error for %s/%s: %s", drug, event, e)
@@ -174,7 +240,12 @@ class QueryRouter:
 
         # 4) Rank by fusion_score desc and apply limit
         results.sort(key=lambda r: r.fusion_score, reverse=True)
-        return results[: spec.limit]
+        return QueryResult(
+            results=results[: spec.limit],
+            candidate_pairs=len(candidates),
+            skipped_pairs=skipped,
+            failed_pairs=failed,
+        )
 
     def route_nlp_to_fusion(
         self,
@@ -196,7 +267,237 @@ class QueryRouter:
 
         You can adapt this to your actual NLP output fields.
         """
-        spec = SignalQuerySpec(
+        spec = self._spec_from_filters(nlp_filters, limit)
+
+        summaries = self.run_query(spec)
+        return [s.to_dict() for s in summaries]
+
+    async def run_query_async(
+        self,
+        spec: SignalQuerySpec,
+        max_concurrency: int = MAX_CONCURRENCY,
+        fusion_engine: Optional[CompleteFusionEngine] = None,
+    ) -> List[FusionResultSummary]:
+        """
+        Non-blocking run_query(): returns the same ranked results.
+        """
+        result = await self.run_query_detailed_async(
+            spec, max_concurrency=max_concurrency, fusion_engine=fusion_engine
+        )
+        return result.results
+
+    async def run_query_detailed_async(
+        self,
+        spec: SignalQuerySpec,
+        max_concurrency: int = MAX_CONCURRENCY,
+        fusion_engine: Optional[CompleteFusionEngine] = None,
+    ) -> QueryResult:
+        """
+        Non-blocking run_query_detailed().
+        """
+        loop = asyncio.get_running_loop()
+        candidates, skipped = await loop.run_in_executor(
+            self._get_thread_pool(max_concurrency), self._prepare_candidates, spec
+        )
+        result = QueryResult(results=[], candidate_pairs=len(candidates), skipped_pairs=skipped)
+        async for results in self._stream_candidates(
+            spec, candidates, max_concurrency, result, fusion_engine or self.fusion_engine
+        ):
+            result.results = results
+        return result
+
+    async def stream_query(
+        self,
+        spec: SignalQuerySpec,
+        max_concurrency: int = MAX_CONCURRENCY,
+        fusion_engine: Optional[CompleteFusionEngine] = None,
+    ) -> AsyncIterator[List[FusionResultSummary]]:
+        """
+        Yield the running top `spec.limit` results as evidence arrives.
+
+        Provider calls (one per pair, or one per EVIDENCE_CHUNK_SIZE pairs
+        with a batch provider) run on a thread pool, at most
+        max_concurrency at a time. Fusion runs in a process pool when there
+        are more than PROCESS_POOL_MIN_PAIRS candidates, otherwise on the
+        thread pool. The last list yielded equals run_query(spec).
+        """
+        loop = asyncio.get_running_loop()
+        candidates, _ = await loop.run_in_executor(
+            self._get_thread_pool(max_concurrency), self._prepare_candidates, spec
+        )
+        async for results in self._stream_candidates(
+            spec, candidates, max_concurrency, QueryResult(results=[]),
+            fusion_engine or self.fusion_engine
+        ):
+            yield results
+
+    async def _stream_candidates(
+        self,
+        spec: SignalQuerySpec,
+        candidates: List[Tuple[str, str]],
+        max_concurrency: int,
+        result: QueryResult,
+        fusion_engine: CompleteFusionEngine,
+    ) -> AsyncIterator[List[FusionResultSummary]]:
+        """Running top-k as chunks finish; provider failures are counted in result"""
+        if not candidates:
+            yield []
+            return
+
+        loop = asyncio.get_running_loop()
+        thread_pool = self._get_thread_pool(max_concurrency)
+
+        if self.batch_metrics_provider is not None:
+            chunks = [
+                candidates[i:i + EVIDENCE_CHUNK_SIZE]
+                for i in range(0, len(candidates), EVIDENCE_CHUNK_SIZE)
+            ]
+        else:
+            chunks = [[pair] for pair in candidates]
+
+        fusion_pool: Executor = thread_pool
+        if len(candidates) > PROCESS_POOL_MIN_PAIRS:
+            fusion_pool = self._get_process_pool()
+            # Workers build (and keep) an engine per config they are sent
+            config_json = json.dumps(fusion_engine.config.to_dict(), sort_keys=True)
+
+        position = {pair: i for i, pair in enumerate(candidates)}
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def process(chunk: List[Tuple[str, str]]) -> List[Tuple[int, FusionResultSummary]]:
+            async with semaphore:
+                evidence_by_pair, failed = await loop.run_in_executor(
+                    thread_pool, self._gather_evidence, chunk, spec
+                )
+                result.failed_pairs += failed
+                items = [
+                    (position[pair], evidence_by_pair.get(pair))
+                    for pair in chunk
+                    if evidence_by_pair.get(pair)
+                ]
+                if not items:
+                    return []
+                if fusion_pool is thread_pool:
+                    fused = await loop.run_in_executor(fusion_pool, _fuse_items, fusion_engine, items)
+                else:
+                    fused = await loop.run_in_executor(
+                        fusion_pool, _fuse_in_worker, config_json, items
+                    )
+            return [
+                (index, self._summarize(*candidates[index], fusion_output))
+                for index, fusion_output in fused
+            ]
+
+        # Min-heap of the best results so far; ties keep candidate order
+        top: List[Tuple[float, int, FusionResultSummary]] = []
+        for finished in asyncio.as_completed([process(chunk) for chunk in chunks]):
+            summaries = await finished
+            for index, summary in summaries:
+                item = (summary.fusion_score, -index, summary)
+                if len(top) < spec.limit:
+                    heapq.heappush(top, item)
+                elif item[:2] > top[0][:2]:
+                    heapq.heapreplace(top, item)
+            if summaries:
+                yield [item[2] for item in sorted(top, key=lambda t: (-t[0], -t[1]))]
+
+        if not top:
+            yield []
+
+    async def route_nlp_to_fusion_async(
+        self,
+        nlp_filters: Dict[str, Any],
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Non-blocking route_nlp_to_fusion()."""
+        spec = self._spec_from_filters(nlp_filters, limit)
+        summaries = await self.run_query_async(spec)
+        return [s.to_dict() for s in summaries]
+
+    def close(self) -> None:
+        """Shut down the async path's worker pools."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _prepare_candidates(self, spec: SignalQuerySpec) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        Candidate pairs for a spec, minus pairs that never co-occur.
+
+        Returns:
+            (candidates, number of pairs skipped)
+        """
+        mapped_reactions = self._normalize_reactions(spec.reactions)
+        candidates = self._build_candidate_pairs(spec.drugs, mapped_reactions)
+
+        if not candidates:
+            logger.info("QueryRouter: no candidates generated for spec=%s", spec.model_dump_json())
+            return [], 0
+
+        candidates, skipped = self._prune_candidates(candidates)
+        if skipped:
+            logger.info("QueryRouter: skipped %d empty pairs of %d", skipped, skipped + len(candidates))
+        return candidates, skipped
+
+    def _prune_candidates(
+        self,
+        candidates: List[Tuple[str, str]],
+    ) -> Tuple[List[Tuple[str, str]], int]:
+        """Drop pairs with zero co-occurrence; keeps all pairs if no index"""
+        if self.cooccurrence_index is None:
+            return candidates, 0
+        try:
+            counts = self.cooccurrence_index(candidates)
+        except Exception as e:
+            logger.exception("QueryRouter: co-occurrence index error: %s", e)
+            return candidates, 0
+        if counts is None:
+            return candidates, 0
+
+        kept = [pair for pair, count in zip(candidates, counts) if count > 0]
+        return kept, len(candidates) - len(kept)
+
+    def _summarize(self, drug: str, event: str, fusion_output: Any) -> FusionResultSummary:
+        return FusionResultSummary(
+            drug=drug,
+            event=event,
+            fusion_score=fusion_output.fusion_score,
+            alert_level=fusion_output.alert_level,
+            quantum_score_layer1=getattr(fusion_output, "quantum_score_layer1", None),
+            quantum_score_layer2=getattr(fusion_output, "quantum_score_layer2", None),
+            classical_score=getattr(fusion_output, "classical_score", None),
+            explanation=self._generate_explanation(drug, event, fusion_output),
+            components=getattr(fusion_output, "components", {}),
+        )
+
+    def _get_thread_pool(self, max_workers: int) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="query-router"
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Forking a server process would copy its threads, locks and
+            # open connections into the workers; start them clean instead
+            start_method = (
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            )
+            self._process_pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context(start_method),
+            )
+        return self._process_pool
+
+    def _spec_from_filters(self, nlp_filters: Dict[str, Any], limit: int) -> SignalQuerySpec:
+        return SignalQuerySpec(
             task=nlp_filters.get("task") or "rank_signals",
             drugs=nlp_filters.get("drugs") or [],
             reactions=nlp_filters.get("reactions") or [],
@@ -209,12 +510,34 @@ class QueryRouter:
             raw_text=nlp_filters.get("raw_text"),
         )
 
-        summaries = self.run_query(spec)
-        return [s.to_dict() for s in summaries]
+    def _gather_evidence(
+        self,
+        candidates: List[Tuple[str, str]],
+        spec: SignalQuerySpec,
+    ) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], int]:
+        """
+        Evidence for each candidate pair, from the batch provider if set,
+        otherwise one metrics_provider call per pair.
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+        Returns:
+            (evidence by pair, number of pairs whose provider call raised)
+        """
+        if self.batch_metrics_provider is not None:
+            try:
+                return self.batch_metrics_provider(candidates, spec) or {}, 0
+            except Exception as e:
+                logger.exception("QueryRouter: batch metrics error for spec=%s: %s", spec.model_dump_json(), e)
+                return {}, len(candidates)
+
+        evidence_by_pair: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        failed = 0
+        for drug, event in candidates:
+            try:
+                evidence_by_pair[(drug, event)] = self.metrics_provider(drug, event, spec)
+            except Exception as e:
+                logger.exception("QueryRouter: metrics error for %s/%s: %s", drug, event, e)
+                failed += 1
+        return evidence_by_pair, failed
 
     def _normalize_reactions(self, reactions: List[str]) -> List[MappedTerm]:
         if not reactions:
@@ -302,3 +625,42 @@ class QueryRouter:
             spec.model_dump_json(),
         )
         return {}
+
+
+# -------------------------------------------------------------------------
+# Fusion helpers (module level so process pool workers can run them)
+# -------------------------------------------------------------------------
+
+# Engines of a worker process, by config JSON
+WORKER_ENGINE_CACHE_SIZE = 32
+_worker_engines: Dict[str, CompleteFusionEngine] = {}
+
+
+def _fuse_in_worker(
+    config_json: str,
+    items: List[Tuple[int, Dict[str, Any]]],
+) -> List[Tuple[int, Any]]:
+    engine = _worker_engines.get(config_json)
+    if engine is None:
+        if len(_worker_engines) >= WORKER_ENGINE_CACHE_SIZE:
+            _worker_engines.clear()
+        engine = CompleteFusionEngine(config=SignalDetectionConfig.from_dict(json.loads(config_json)))
+        _worker_engines[config_json] = engine
+    return _fuse_items(engine, items)
+
+
+def _fuse_items(
+    fusion_engine: CompleteFusionEngine,
+    items: List[Tuple[int, Dict[str, Any]]],
+) -> List[Tuple[int, Any]]:
+    """detect_signal() for (position, evidence) items; failures are skipped"""
+    fused = []
+    for index, evidence in items:
+        try:
+            fused.append((index, fusion_engine.detect_signal(**evidence)))
+        except Exception as e:
+            logger.exception(
+                "QueryRouter: fusion error for %s/%s: %s",
+                evidence.get("drug"), evidence.get("event"), e,
+            )
+    return fused
@@ -101,6 +101,23 @@ class SpikeDetectionResult:
     is_significant: bool
 
 
+@dataclass
+class SpikeBatchResult:
+    """
+    Spike statistics for many series sharing one time axis.
+    
+    Arrays have shape (n_series, n_points). Points inside the first
+    window have no baseline: their statistics are NaN and they are never
+    flagged.
+    """
+    baseline_mean: np.ndarray
+    z_score: np.ndarray
+    p_value: np.ndarray  # Poisson upper-tail P(X >= count | baseline_mean)
+    is_spike: np.ndarray  # z_score > z_threshold
+    is_significant: np.ndarray  # is_spike and p_value < 0.01
+    has_recent_spike: np.ndarray  # Shape (n_series,)
+
+
 @dataclass
 class ChangePointResult:
     """Detected change point in time series"""
@@ -122,6 +139,34 @@ class TrendAnalysisResult:
     is_significant: bool
     doubling_time_days: Optional[float]  # For increasing trends
     half_life_days: Optional[float]  # For decreasing trends
+    
+    # Non-parametric trend statistics
+    mann_kendall_s: int = 0
+    mann_kendall_z: float = 0.0
+    mann_kendall_p_value: float = 1.0
+    theil_sen_slope: float = 0.0  # Cases per day
+
+
+@dataclass
+class TrendBatchResult:
+    """
+    Trend statistics for many series sharing one time axis.
+    
+    Every field is an array with one entry per series.
+    """
+    slope: np.ndarray  # OLS, cases per day
+    intercept: np.ndarray
+    r_squared: np.ndarray
+    p_value: np.ndarray  # OLS slope t-test
+    mann_kendall_s: np.ndarray
+    mann_kendall_z: np.ndarray
+    mann_kendall_p_value: np.ndarray
+    theil_sen_slope: np.ndarray
+    mean: np.ndarray
+    cv: np.ndarray  # Coefficient of variation
+    
+    def __len__(self) -> int:
+        return len(self.slope)
 
 
 @dataclass
@@ -201,7 +246,13 @@ class TemporalPatternResult:
                 "direction": self.trend.direction.value,
                 "slope": round(self.trend.slope, 4),
                 "r_squared": round(self.trend.r_squared, 3),
-                "is_significant": self.trend.is_significant
+                "is_significant": self.trend.is_significant,
+                "mann_kendall": {
+                    "s": self.trend.mann_kendall_s,
+                    "z": round(self.trend.mann_kendall_z, 3),
+                    "p_value": round(self.trend.mann_kendall_p_value, 4)
+                },
+                "theil_sen_slope": round(self.trend.theil_sen_slope, 4)
             },
             "novelty": {
                 "first_report_date": self.novelty.first_report_date.isoformat(),
@@ -258,44 +309,9 @@ class SpikeDetector:
         if len(time_series.counts) < self.window_size:
             return [], False
         
-        spikes = []
         counts = np.array(time_series.counts)
-        
-        # For each point (after window), check if it's a spike
-        for i in range(self.window_size, len(counts)):
-            # Calculate baseline from previous window
-            baseline = counts[i - self.window_size:i]
-            baseline_mean = np.mean(baseline)
-            baseline_std = np.std(baseline)
-            
-            if baseline_std == 0:
-                baseline_std = np.sqrt(baseline_mean)  # Poisson approximation
-            
-            # Current count
-            current = counts[i]
-            
-            # Z-score
-            z_score = (current - baseline_mean) / baseline_std if baseline_std > 0 else 0
-            
-            # Is this a spike?
-            if z_score > self.z_threshold:
-                # Calculate p-value (Poisson test)
-                p_value = 1 - stats.poisson.cdf(current - 1, baseline_mean)
-                
-                # Fold increase
-                fold_increase = current / baseline_mean if baseline_mean > 0 else float('inf')
-                
-                spike = SpikeDetectionResult(
-                    spike_date=time_series.dates[i],
-                    spike_count=current,
-                    expected_count=baseline_mean,
-                    fold_increase=fold_increase,
-                    z_score=z_score,
-                    p_value=p_value,
-                    is_significant=p_value < 0.01
-                )
-                
-                spikes.append(spike)
+        baseline_mean, z_scores, p_values = self.spike_statistics(counts)
+        spikes = self._spike_results(counts, time_series.dates, baseline_mean, z_scores, p_values)
         
         # Check for recent spikes
         if spikes and time_series.dates:
@@ -305,6 +321,135 @@ class SpikeDetector:
             has_recent_spike = False
         
         return spikes, has_recent_spike
+    
+    def _spike_results(
+        self,
+        counts: np.ndarray,
+        dates: List[datetime],
+        baseline_mean: np.ndarray,
+        z_scores: np.ndarray,
+        p_values: np.ndarray
+    ) -> List[SpikeDetectionResult]:
+        """Build SpikeDetectionResult objects for one series' spikes"""
+        spikes = []
+        for i in np.flatnonzero(z_scores > self.z_threshold):
+            current = counts[i]
+            mean = baseline_mean[i]
+            
+            # Fold increase
+            fold_increase = current / mean if mean > 0 else float('inf')
+            
+            spike = SpikeDetectionResult(
+                spike_date=dates[i],
+                spike_count=current,
+                expected_count=mean,
+                fold_increase=fold_increase,
+                z_score=z_scores[i],
+                p_value=p_values[i],
+                is_significant=p_values[i] < 0.01
+            )
+            
+            spikes.append(spike)
+        
+        return spikes
+    
+    def spike_statistics(
+        self,
+        counts: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Baseline mean, z-score and Poisson tail p-value at every point.
+        
+        The baseline for point i is the window_size points before it.
+        Window sums come from cumulative sums, so all points (and all
+        series, for a 2-D input) are scored in one pass.
+        
+        Args:
+            counts: Counts of shape (n_points,) or (n_series, n_points)
+            
+        Returns:
+            (baseline_mean, z_score, p_value), each shaped like counts;
+            NaN where i < window_size
+        """
+        counts = np.asarray(counts)
+        w = self.window_size
+        n = counts.shape[-1]
+        
+        baseline_mean = np.full(counts.shape, np.nan)
+        z_scores = np.full(counts.shape, np.nan)
+        p_values = np.full(counts.shape, np.nan)
+        if n <= w:
+            return baseline_mean, z_scores, p_values
+        
+        # Windowed sums of x and x² via prefix sums. Integer counts stay
+        # integer so the variance numerator is exact.
+        if np.issubdtype(counts.dtype, np.integer):
+            values = counts.astype(np.int64)
+        else:
+            values = counts.astype(np.float64)
+        pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+        csum = np.pad(np.cumsum(values, axis=-1), pad)
+        csum_sq = np.pad(np.cumsum(values * values, axis=-1), pad)
+        
+        window_sum = csum[..., w:n] - csum[..., :n - w]
+        window_sum_sq = csum_sq[..., w:n] - csum_sq[..., :n - w]
+        
+        mean = window_sum / w
+        variance_numerator = np.maximum(w * window_sum_sq - window_sum * window_sum, 0)
+        std = np.sqrt(variance_numerator) / w
+        
+        # Flat baseline: fall back to the Poisson standard deviation
+        std = np.where(std == 0, np.sqrt(mean), std)
+        
+        current = counts[..., w:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, (current - mean) / std, 0.0)
+        
+        baseline_mean[..., w:] = mean
+        z_scores[..., w:] = z
+        p_values[..., w:] = stats.poisson.sf(current - 1, mean)
+        
+        return baseline_mean, z_scores, p_values
+    
+    def detect_spikes_batch(
+        self,
+        counts: np.ndarray,
+        dates: Optional[List[datetime]] = None,
+        recent_days: int = 90
+    ) -> SpikeBatchResult:
+        """
+        Detect spikes across many series in one pass.
+        
+        Args:
+            counts: Counts of shape (n_series, n_points) (or 1-D for one
+                series), all sampled on the same dates
+            dates: Shared dates of the points; needed for has_recent_spike
+            recent_days: Define "recent" for flag
+            
+        Returns:
+            SpikeBatchResult with per-point statistics and flags
+        """
+        counts = np.atleast_2d(np.asarray(counts))
+        baseline_mean, z_scores, p_values = self.spike_statistics(counts)
+        
+        is_spike = z_scores > self.z_threshold
+        is_significant = is_spike & (p_values < 0.01)
+        
+        if dates:
+            cutoff_date = dates[-1] - timedelta(days=recent_days)
+            recent = np.array([d >= cutoff_date for d in dates])
+            has_recent_spike = (is_spike & recent).any(axis=1)
+        else:
+            has_recent_spike = np.zeros(len(counts), dtype=bool)
+        
+        return SpikeBatchResult(
+            baseline_mean=baseline_mean,
+            z_score=z_scores,
+            p_value=p_values,
+            is_spike=is_spike,
+            is_significant=is_significant,
+            has_recent_spike=has_recent_spike
+        )
 
 
 # ============================================================================
@@ -315,15 +460,38 @@ class ChangePointDetector:
     """
     Detects change points where the mean reporting rate changes significantly.
     
-    Uses PELT (Pruned Exact Linear Time) algorithm approximation.
+    Uses PELT (Pruned Exact Linear Time, Killick et al. 2012) to find the
+    segmentation minimizing total segment cost plus a penalty per change
+    point. Segment costs come from prefix sums, so each is O(1):
+    - "normal": sum of squared errors around the segment mean
+    - "poisson": Poisson deviance of the segment counts
     """
     
-    def __init__(self, min_segment_size: int = 10):
+    COST_FUNCTIONS = ("normal", "poisson")
+    
+    def __init__(
+        self,
+        min_segment_size: int = 10,
+        cost: str = "normal",
+        penalty: Optional[float] = None,
+        max_change_points: Optional[int] = 3
+    ):
         """
         Args:
             min_segment_size: Minimum days in each segment
+            cost: Segment cost, "normal" or "poisson"
+            penalty: Cost added per change point; defaults to a BIC-style
+                2·log(n), scaled by the noise variance for the normal cost
+            max_change_points: Report at most this many change points (the
+                ones that reduce the cost most); None reports all
         """
+        if cost not in self.COST_FUNCTIONS:
+            raise ValueError(f"Unknown cost: {cost}")
+        
         self.min_segment_size = min_segment_size
+        self.cost = cost
+        self.penalty = penalty
+        self.max_change_points = max_change_points
     
     def detect_change_points(
         self,
@@ -332,6 +500,9 @@ class ChangePointDetector:
         """
         Detect change points in time series.
         
+        Each change point is compared with the segments on either side of
+        it (up to the neighbouring change points).
+        
         Args:
             time_series: Time series data
             
@@ -341,80 +512,218 @@ class ChangePointDetector:
         if len(time_series.counts) < self.min_segment_size * 2:
             return [], False
         
-        change_points = []
         counts = np.array(time_series.counts)
+        indices = self._find_change_points(counts)
         
-        # Simple approach: scan for optimal split point
-        best_change_points = self._find_change_points(counts, time_series.dates)
+        change_points = self._change_point_results(counts, time_series.dates, indices)
+        has_significant_change = any(cp.is_significant for cp in change_points)
+        
+        return change_points, has_significant_change
+    
+    def _change_point_results(
+        self,
+        counts: np.ndarray,
+        dates: List[datetime],
+        indices: List[int]
+    ) -> List[ChangePointResult]:
+        """Build ChangePointResult objects for one series' change points"""
+        change_points = []
+        bounds = [0] + indices + [len(counts)]
         
         # Create ChangePointResult objects
-        for idx, (mean_before, mean_after) in best_change_points:
-            change_date = time_series.dates[idx]
+        for k, idx in enumerate(indices):
+            before_segment = counts[bounds[k]:idx]
+            after_segment = counts[idx:bounds[k + 2]]
+            
+            mean_before = np.mean(before_segment)
+            mean_after = np.mean(after_segment)
             
             # Fold change
             fold_change = mean_after / mean_before if mean_before > 0 else float('inf')
             
-            # Statistical significance (t-test)
-            before_segment = counts[:idx]
-            after_segment = counts[idx:]
-            
-            if len(before_segment) > 1 and len(after_segment) > 1:
-                t_stat, p_value = stats.ttest_ind(before_segment, after_segment)
-                is_significant = p_value < 0.05
-            else:
-                p_value = 1.0
-                is_significant = False
+            p_value = self._segment_p_value(before_segment, after_segment)
             
             cp = ChangePointResult(
-                change_date=change_date,
+                change_date=dates[idx],
                 mean_before=mean_before,
                 mean_after=mean_after,
                 fold_change=fold_change,
                 statistical_significance=p_value,
-                is_significant=is_significant
+                is_significant=p_value < 0.05
             )
             
             change_points.append(cp)
         
-        has_significant_change = any(cp.is_significant for cp in change_points)
+        return change_points
+    
+    def detect_change_points_batch(self, counts: np.ndarray) -> List[List[int]]:
+        """
+        Change point indices for many series.
         
-        return change_points, has_significant_change
+        All series are segmented together: each PELT step evaluates the
+        candidate starts of every series in one vectorized operation.
+        
+        Args:
+            counts: Counts of shape (n_series, n_points)
+            
+        Returns:
+            Change point indices (start of each new segment) per series
+        """
+        return self._find_change_points_batch(np.atleast_2d(counts))
+    
+    def _segment_p_value(self, before: np.ndarray, after: np.ndarray) -> float:
+        """Significance of the difference between two adjacent segments"""
+        if self.cost == "poisson":
+            # Conditional test: given the total, the count in the first
+            # segment is binomial under a common rate
+            total = int(np.sum(before) + np.sum(after))
+            if total == 0:
+                return 1.0
+            share = len(before) / (len(before) + len(after))
+            return stats.binomtest(int(np.sum(before)), total, share).pvalue
+        
+        if len(before) > 1 and len(after) > 1:
+            p_value = stats.ttest_ind(before, after)[1]
+            return 1.0 if np.isnan(p_value) else p_value
+        return 1.0
+    
+    def _default_penalty(self, counts: np.ndarray) -> float:
+        """BIC-style penalty per change point on the scale of the cost"""
+        n = len(counts)
+        penalty = 2.0 * np.log(n)
+        if self.cost == "normal":
+            # Noise variance from the MAD of first differences, which is
+            # robust to the mean shifts being searched for
+            diffs = np.diff(counts.astype(np.float64))
+            sigma = 1.4826 * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2)
+            variance = sigma ** 2 if sigma > 0 else np.var(counts)
+            penalty *= max(variance, 1e-12)
+        return penalty
+    
+    def _segment_costs(
+        self,
+        total: np.ndarray,
+        total_sq: np.ndarray,
+        length: np.ndarray
+    ) -> np.ndarray:
+        """Segment costs from the sum, sum of squares and length of each segment"""
+        if self.cost == "poisson":
+            log_term = np.zeros(np.broadcast(total, length).shape)
+            np.log(total / length, out=log_term, where=total > 0)
+            return 2.0 * (total - total * log_term)
+        return total_sq - total * total / length
     
     def _find_change_points(
         self,
-        counts: np.ndarray,
-        dates: List[datetime],
-        max_change_points: int = 3
-    ) -> List[Tuple[int, Tuple[float, float]]]:
+        counts: np.ndarray
+    ) -> List[int]:
         """
-        Find up to max_change_points change points.
+        PELT segmentation of one series.
         
-        Returns list of (index, (mean_before, mean_after))
+        Returns:
+            Sorted change point indices (start of each new segment)
         """
-        n = len(counts)
-        change_points = []
+        return self._find_change_points_batch(np.atleast_2d(counts))[0]
+    
+    def _find_change_points_batch(self, counts: np.ndarray) -> List[List[int]]:
+        """
+        PELT segmentation of each row of counts.
+        
+        Returns:
+            Sorted change point indices (start of each new segment) per row
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        n_series, n = counts.shape
+        m = self.min_segment_size
+        if n < 2 * m:
+            return [[] for _ in range(n_series)]
+        
+        pad = ((0, 0), (1, 0))
+        csum = np.pad(np.cumsum(counts, axis=1), pad)
+        csum_sq = np.pad(np.cumsum(counts * counts, axis=1), pad)
+        if self.penalty is not None:
+            penalty = np.full(n_series, float(self.penalty))
+        else:
+            penalty = np.array([self._default_penalty(row) for row in counts])
+        rows = np.arange(n_series)
+        
+        # F[:, t]: optimal cost of counts[:, :t]; last[:, t]: its final change point
+        F = np.full((n_series, n + 1), np.inf)
+        F[:, 0] = -penalty
+        last = np.zeros((n_series, n + 1), dtype=np.int64)
+        
+        # Candidate starts of the final segment: columns still live for at
+        # least one series, and a per-series mask of the unpruned ones
+        columns = np.zeros(0, dtype=np.int64)
+        live = np.zeros((n_series, 0), dtype=bool)
         
-        # Try each potential split point
-        for i in range(self.min_segment_size, n - self.min_segment_size):
-            before = counts[:i]
-            after = counts[i:]
+        for t in range(m, n + 1):
+            # t - m becomes admissible as the start of the final segment
+            s = t - m
+            if s == 0 or s >= m:
+                columns = np.append(columns, s)
+                live = np.hstack([live, np.ones((n_series, 1), dtype=bool)])
             
-            mean_before = np.mean(before)
-            mean_after = np.mean(after)
+            costs = F[:, columns] + self._segment_costs(
+                csum[:, t:t + 1] - csum[:, columns],
+                csum_sq[:, t:t + 1] - csum_sq[:, columns],
+                t - columns
+            )
+            costs[~live] = np.inf
+            best = np.argmin(costs, axis=1)
+            F[:, t] = costs[rows, best] + penalty
+            last[:, t] = columns[best]
             
-            # Only consider if means are different enough
-            if mean_after > mean_before * 1.5 or mean_before > mean_after * 1.5:
-                # Calculate cost (sum of squared errors)
-                cost_before = np.sum((before - mean_before) ** 2)
-                cost_after = np.sum((after - mean_after) ** 2)
-                total_cost = cost_before + cost_after
-                
-                change_points.append((i, (mean_before, mean_after), total_cost))
+            # Prune starts that can never be optimal again. A start s is
+            # beaten by u = t - m once F(s) + C(s, u) > F(u): u is an
+            # admissible last change point for every end T >= t, and
+            # C(s, T) >= C(s, u) + C(u, T). Comparing against F(t) itself
+            # is not valid because t cannot end a segment before t + m.
+            u = t - m
+            if u >= m:
+                before = columns < u
+                dominated = F[:, columns] + self._segment_costs(
+                    csum[:, u:u + 1] - csum[:, columns],
+                    csum_sq[:, u:u + 1] - csum_sq[:, columns],
+                    np.maximum(u - columns, 1)
+                ) > F[:, u:u + 1]
+                live &= ~(dominated & before)
+            keep = live.any(axis=0)
+            if not keep.all():
+                columns = columns[keep]
+                live = live[:, keep]
+        
+        results = []
+        for i in range(n_series):
+            change_points = []
+            t = n
+            while last[i, t] > 0:
+                t = int(last[i, t])
+                change_points.append(t)
+            change_points.reverse()
+            
+            if self.max_change_points is not None and len(change_points) > self.max_change_points:
+                change_points = self._strongest(change_points, csum[i], csum_sq[i])
+            results.append(change_points)
+        
+        return results
+    
+    def _strongest(
+        self,
+        change_points: List[int],
+        csum: np.ndarray,
+        csum_sq: np.ndarray
+    ) -> List[int]:
+        """Keep the max_change_points change points with the largest cost reduction"""
+        bounds = np.array([0] + change_points + [len(csum) - 1])
+        starts, cps, ends = bounds[:-2], bounds[1:-1], bounds[2:]
         
-        # Sort by cost (lower is better) and take top change points
-        change_points.sort(key=lambda x: x[2])
+        def cost(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            return self._segment_costs(csum[b] - csum[a], csum_sq[b] - csum_sq[a], b - a)
         
-        return [(idx, means) for idx, means, _ in change_points[:max_change_points]]
+        gains = cost(starts, ends) - cost(starts, cps) - cost(cps, ends)
+        keep = np.argsort(gains)[::-1][:self.max_change_points]
+        return sorted(change_points[i] for i in keep)
 
 
 # ============================================================================
@@ -425,9 +734,15 @@ class TrendAnalyzer:
     """
     Analyzes long-term trends in reporting.
     
-    Uses linear regression and Mann-Kendall test.
+    Uses linear regression for direction and magnitude, plus the
+    Mann-Kendall test and Theil-Sen slope as robust, non-parametric
+    checks. All statistics are computed for a matrix of series at once.
     """
     
+    # Pairwise differences are evaluated in blocks of about this many
+    # elements to bound memory on long series
+    PAIRWISE_BLOCK_SIZE = 4_000_000
+    
     @staticmethod
     def analyze_trend(time_series: TimeSeriesData) -> TrendAnalysisResult:
         """
@@ -454,9 +769,15 @@ class TrendAnalyzer:
         x = np.array([(d - time_series.dates[0]).days for d in time_series.dates])
         y = np.array(time_series.counts)
         
-        # Linear regression
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-        r_squared = r_value ** 2
+        batch = TrendAnalyzer.analyze_trend_batch(x, y[np.newaxis, :])
+        return TrendAnalyzer.trend_result(batch, 0)
+    
+    @staticmethod
+    def trend_result(batch: TrendBatchResult, i: int) -> TrendAnalysisResult:
+        """Classify row i of a batch into a TrendAnalysisResult"""
+        slope = float(batch.slope[i])
+        p_value = float(batch.p_value[i])
+        mean = float(batch.mean[i])
         
         # Determine direction
         if p_value < 0.05:
@@ -466,37 +787,189 @@ class TrendAnalyzer:
                 direction = TrendDirection.DECREASING
         else:
             # Check coefficient of variation for fluctuation
-            cv = np.std(y) / np.mean(y) if np.mean(y) > 0 else 0
-            if cv > 0.5:
+            if batch.cv[i] > 0.5:
                 direction = TrendDirection.FLUCTUATING
             else:
                 direction = TrendDirection.STABLE
         
         # Calculate doubling time for increasing trends
         doubling_time = None
-        if direction == TrendDirection.INCREASING and slope > 0 and np.mean(y) > 0:
+        if direction == TrendDirection.INCREASING and slope > 0 and mean > 0:
             # Doubling time = ln(2) / (slope / mean)
-            growth_rate = slope / np.mean(y)
+            growth_rate = slope / mean
             if growth_rate > 0:
                 doubling_time = np.log(2) / growth_rate
         
         # Calculate half-life for decreasing trends
         half_life = None
-        if direction == TrendDirection.DECREASING and slope < 0 and np.mean(y) > 0:
+        if direction == TrendDirection.DECREASING and slope < 0 and mean > 0:
             # Half-life = ln(2) / (|slope| / mean)
-            decay_rate = abs(slope) / np.mean(y)
+            decay_rate = abs(slope) / mean
             if decay_rate > 0:
                 half_life = np.log(2) / decay_rate
         
         return TrendAnalysisResult(
             direction=direction,
             slope=slope,
-            r_squared=r_squared,
+            r_squared=float(batch.r_squared[i]),
             p_value=p_value,
             is_significant=p_value < 0.05,
             doubling_time_days=doubling_time,
-            half_life_days=half_life
+            half_life_days=half_life,
+            mann_kendall_s=int(batch.mann_kendall_s[i]),
+            mann_kendall_z=float(batch.mann_kendall_z[i]),
+            mann_kendall_p_value=float(batch.mann_kendall_p_value[i]),
+            theil_sen_slope=float(batch.theil_sen_slope[i])
         )
+    
+    @staticmethod
+    def analyze_trend_batch(x: np.ndarray, counts: np.ndarray) -> TrendBatchResult:
+        """
+        OLS, Mann-Kendall and Theil-Sen statistics for many series.
+        
+        Args:
+            x: Time of each point in days, shape (n_points,), ascending
+            counts: Counts of shape (n_series, n_points)
+            
+        Returns:
+            TrendBatchResult with one entry per series
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+        
+        slope, intercept, r_squared, p_value = TrendAnalyzer._ols(x, y)
+        mk_s, mk_z, mk_p = TrendAnalyzer._mann_kendall(y)
+        theil_sen = TrendAnalyzer._theil_sen(x, y)
+        
+        mean = y.mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = np.where(mean > 0, y.std(axis=1) / mean, 0.0)
+        
+        return TrendBatchResult(
+            slope=slope,
+            intercept=intercept,
+            r_squared=r_squared,
+            p_value=p_value,
+            mann_kendall_s=mk_s,
+            mann_kendall_z=mk_z,
+            mann_kendall_p_value=mk_p,
+            theil_sen_slope=theil_sen,
+            mean=mean,
+            cv=cv
+        )
+    
+    @staticmethod
+    def _ols(
+        x: np.ndarray,
+        y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Least-squares slope, intercept, r² and slope p-value (as stats.linregress)"""
+        n = len(x)
+        x_mean = x.mean()
+        y_mean = y.mean(axis=1)
+        dx = x - x_mean
+        dy = y - y_mean[:, np.newaxis]
+        
+        ssxm = np.dot(dx, dx)
+        ssym = np.einsum("ij,ij->i", dy, dy)
+        ssxym = dy @ dx
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = ssxym / ssxm
+            r = np.where((ssxm == 0) | (ssym == 0), 0.0, ssxym / np.sqrt(ssxm * ssym))
+        r = np.clip(r, -1.0, 1.0)
+        intercept = y_mean - slope * x_mean
+        
+        df = n - 2
+        if df > 0:
+            tiny = 1.0e-20
+            t = r * np.sqrt(df / ((1.0 - r + tiny) * (1.0 + r + tiny)))
+            p_value = 2 * stats.t.sf(np.abs(t), df)
+        else:
+            p_value = np.ones(len(y))
+        
+        return slope, intercept, r ** 2, p_value
+    
+    @staticmethod
+    def _mann_kendall(y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Mann-Kendall S, tie-corrected Z and two-sided p-value per row.
+        
+        S is accumulated one lag at a time, so each step is a vectorized
+        comparison of every series against itself shifted by that lag.
+        """
+        n_series, n = y.shape
+        s = np.zeros(n_series, dtype=np.int64)
+        for lag in range(1, n):
+            s += np.sign(y[:, lag:] - y[:, :-lag]).sum(axis=1).astype(np.int64)
+        
+        # Tie correction: sum of t(t-1)(2t+5) over groups of equal values,
+        # written per element as (t-1)(2t+5) for that element's group size
+        tie_term = np.zeros(n_series)
+        if n > 1:
+            sorted_y = np.sort(y, axis=1)
+            new_group = np.ones((n_series, n), dtype=bool)
+            new_group[:, 1:] = sorted_y[:, 1:] != sorted_y[:, :-1]
+            group_id = np.cumsum(new_group, axis=1) - 1 + n * np.arange(n_series)[:, np.newaxis]
+            group_size = np.bincount(group_id.ravel(), minlength=n * n_series)[group_id]
+            tie_term = ((group_size - 1) * (2 * group_size + 5)).sum(axis=1)
+        
+        variance = (n * (n - 1) * (2 * n + 5) - tie_term) / 18.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(
+                variance > 0,
+                (s - np.sign(s)) / np.sqrt(variance),
+                0.0
+            )
+        p_value = 2 * stats.norm.sf(np.abs(z))
+        
+        return s, z, p_value
+    
+    @staticmethod
+    def _theil_sen(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Median of pairwise slopes per row, over pairs with distinct x.
+        
+        Slopes are written lag by lag into a reused buffer holding a block
+        of rows, and each row's median is taken in place.
+        """
+        n_series, n = y.shape
+        result = np.zeros(n_series)
+        n_pairs = n * (n - 1) // 2
+        if n_pairs == 0:
+            return result
+        
+        # Pairs with equal x have no slope
+        if x[0] == x[-1]:
+            return result
+        has_ties = bool(np.any(np.diff(x) == 0))
+        
+        rows_per_block = max(1, TrendAnalyzer.PAIRWISE_BLOCK_SIZE // n_pairs)
+        buffer = np.empty((min(rows_per_block, n_series), n_pairs))
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for start in range(0, n_series, rows_per_block):
+                block = y[start:start + rows_per_block]
+                slopes = buffer[:len(block)]
+                pos = 0
+                for lag in range(1, n):
+                    width = n - lag
+                    dx = x[lag:] - x[:-lag]
+                    out = slopes[:, pos:pos + width]
+                    np.subtract(block[:, lag:], block[:, :-lag], out=out)
+                    out /= dx
+                    if has_ties:
+                        out[:, dx == 0] = np.nan
+                    pos += width
+                
+                if has_ties:
+                    result[start:start + len(block)] = np.nanmedian(slopes, axis=1)
+                else:
+                    result[start:start + len(block)] = np.median(
+                        slopes, axis=1, overwrite_input=True
+                    )
+        
+        return result
 
 
 # ============================================================================
@@ -714,6 +1187,112 @@ class TemporalPatternAnalyzer:
             temporal_flags=flags
         )
     
+    def analyze_batch(
+        self,
+        drugs: List[str],
+        events: List[str],
+        dates: List[datetime],
+        counts: np.ndarray,
+        first_report_dates: List[datetime],
+        latencies: Optional[List[Optional[List[int]]]] = None
+    ) -> List[TemporalPatternResult]:
+        """
+        Temporal pattern analysis for many pairs on a shared time axis.
+        
+        Spike, change point and trend statistics are computed for all
+        series together; results match analyze() on each pair.
+        
+        Args:
+            drugs: Drug name per pair
+            events: Event name per pair
+            dates: Shared, ascending dates of the series points
+            counts: Counts of shape (n_pairs, n_points)
+            first_report_dates: Date of first report per pair
+            latencies: Optional time-to-onset values per pair
+            
+        Returns:
+            One TemporalPatternResult per pair, in input order
+        """
+        counts = np.atleast_2d(np.asarray(counts))
+        n_pairs, n_points = counts.shape
+        
+        # Spike detection
+        if n_points >= self.spike_detector.window_size:
+            spike_batch = self.spike_detector.detect_spikes_batch(counts, dates)
+        else:
+            spike_batch = None
+        
+        # Change point detection
+        if n_points >= self.change_point_detector.min_segment_size * 2:
+            change_point_indices = self.change_point_detector.detect_change_points_batch(counts)
+        else:
+            change_point_indices = [[] for _ in range(n_pairs)]
+        
+        # Trend analysis
+        trend_batch = None
+        if n_points >= 3:
+            x = np.array([(d - dates[0]).days for d in dates])
+            trend_batch = self.trend_analyzer.analyze_trend_batch(x, counts)
+        
+        results = []
+        for i in range(n_pairs):
+            row = counts[i]
+            time_series = TimeSeriesData(dates=list(dates), counts=row.tolist())
+            
+            if spike_batch is not None:
+                spikes = self.spike_detector._spike_results(
+                    row, dates, spike_batch.baseline_mean[i],
+                    spike_batch.z_score[i], spike_batch.p_value[i]
+                )
+                has_recent_spike = bool(spike_batch.has_recent_spike[i])
+            else:
+                spikes, has_recent_spike = [], False
+            
+            change_points = self.change_point_detector._change_point_results(
+                row, dates, change_point_indices[i]
+            )
+            has_change_point = any(cp.is_significant for cp in change_points)
+            
+            if trend_batch is not None:
+                trend = self.trend_analyzer.trend_result(trend_batch, i)
+            else:
+                trend = self.trend_analyzer.analyze_trend(time_series)
+            
+            novelty = self.novelty_assessor.assess_novelty(
+                drugs[i], events[i], first_report_dates[i], time_series.total_cases
+            )
+            
+            pair_latencies = latencies[i] if latencies else None
+            if pair_latencies:
+                latency_dist, median_latency = self.latency_analyzer.analyze_latency_distribution(
+                    pair_latencies
+                )
+            else:
+                latency_dist = {cat: 0 for cat in LatencyCategory}
+                median_latency = None
+            
+            risk_score, flags = self._calculate_temporal_risk(
+                has_recent_spike, has_change_point, trend, novelty
+            )
+            
+            results.append(TemporalPatternResult(
+                drug=drugs[i],
+                event=events[i],
+                time_series=time_series,
+                spikes=spikes,
+                has_recent_spike=has_recent_spike,
+                change_points=change_points,
+                has_change_point=has_change_point,
+                trend=trend,
+                novelty=novelty,
+                latency_distribution=latency_dist,
+                median_latency_days=median_latency,
+                temporal_risk_score=risk_score,
+                temporal_flags=flags
+            ))
+        
+        return results
+    
     def _calculate_temporal_risk(
         self,
         has_recent_spike: bool,
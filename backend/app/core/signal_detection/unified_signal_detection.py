@@ -17,20 +17,25 @@ Date: 2024-12-08
 Version: 1.0.0
 """
 
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import logging
+import os
+
+import numpy as np
 
 # Import our modular components
 from .bayesian_signal_detection import (
     BayesianSignalDetector,
     BayesianSignal,
+    BayesianBatchResult,
     ContingencyTable,
     SignalStrength
 )
 from .disproportionality_analysis import (
     DisproportionalityAnalyzer,
+    DisproportionalityBatchResult,
     DisproportionalityResult
 )
 from .causality_assessment import (
@@ -260,6 +265,56 @@ class SignalScoreCalculator:
             base_score += 0.05
         
         return min(base_score, 1.0)
+    
+    @staticmethod
+    def calculate_composite_scores(
+        classical: DisproportionalityBatchResult,
+        bayesian: BayesianBatchResult,
+        fdr_significant: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_composite_score() for pairs without temporal
+        or causality data.
+        
+        Terms are accumulated in the same order as the scalar path so the
+        scores (and therefore rankings) are identical.
+        
+        Args:
+            classical: Columnar classical results
+            bayesian: Columnar Bayesian results
+            fdr_significant: Optional FDR significance flags
+            
+        Returns:
+            Composite scores (0-1), one per pair
+        """
+        # Classical component
+        methods_detecting = (
+            classical.prr_is_signal.astype(np.int8)
+            + classical.ror_is_signal
+            + classical.ic_is_signal
+        )
+        base_score = np.array([0.2, 0.5, 0.7, 0.9])[methods_detecting]
+        avg_ratio = (classical.prr + classical.ror) / 2
+        magnitude_boost = np.select(
+            [avg_ratio > 5.0, avg_ratio > 3.0], [0.1, 0.05], default=0.0
+        )
+        classical_score = np.minimum(base_score + magnitude_boost, 1.0)
+        
+        # Bayesian component
+        eb05 = bayesian.ebgm_lower_ci
+        bayesian_score = np.select(
+            [eb05 > 4.0, eb05 > 2.0, eb05 > 1.0], [0.95, 0.80, 0.60], default=0.30
+        )
+        if fdr_significant is not None:
+            bayesian_score = np.minimum(bayesian_score + 0.05 * fdr_significant, 1.0)
+        
+        # Temporal weight goes to Bayesian, causality weight to classical
+        score = 0.30 * classical_score
+        score += 0.40 * bayesian_score
+        score += 0.20 * bayesian_score
+        score += 0.10 * classical_score
+        
+        return np.minimum(score, 1.0)
 
 
 # ============================================================================
@@ -369,19 +424,23 @@ class UnifiedSignalDetector:
     def __init__(
         self,
         min_count: int = 3,
-        estimate_priors: bool = True
+        estimate_priors: bool = True,
+        ebgm_method: Optional[str] = None
     ):
         """
         Args:
             min_count: Minimum observed count to analyze
             estimate_priors: Whether to estimate Bayesian priors from data
+            ebgm_method: EBGM prior, "quadrature", "monte_carlo" or "gps"
+                (defaults to the SIGNAL_EBGM_METHOD env var, else "quadrature")
         """
         self.min_count = min_count
         self.estimate_priors = estimate_priors
+        self.ebgm_method = ebgm_method or os.getenv("SIGNAL_EBGM_METHOD", "quadrature")
         
         # Initialize component analyzers
         self.classical_analyzer = DisproportionalityAnalyzer(min_count)
-        self.bayesian_detector = BayesianSignalDetector(min_count)
+        self.bayesian_detector = BayesianSignalDetector(min_count, ebgm_method=self.ebgm_method)
         self.causality_assessor = CausalityAssessor()
         self.temporal_analyzer = TemporalPatternAnalyzer()
         
@@ -483,7 +542,8 @@ class UnifiedSignalDetector:
     def detect_signals_batch(
         self,
         drug_event_pairs: List[Tuple[str, str, ContingencyTable]],
-        estimate_priors: bool = None
+        estimate_priors: bool = None,
+        top_k: Optional[int] = None
     ) -> List[UnifiedSignalResult]:
         """
         Detect signals for multiple drug-event pairs.
@@ -493,6 +553,53 @@ class UnifiedSignalDetector:
         Args:
             drug_event_pairs: List of (drug, event, contingency_table)
             estimate_priors: Override default prior estimation setting
+            top_k: Only return the top_k pairs by composite score
+            
+        Returns:
+            List of unified signals, sorted by composite score
+        """
+        n11 = np.array([ct.n11 for _, _, ct in drug_event_pairs], dtype=np.int64)
+        n10 = np.array([ct.n10 for _, _, ct in drug_event_pairs], dtype=np.int64)
+        n01 = np.array([ct.n01 for _, _, ct in drug_event_pairs], dtype=np.int64)
+        n00 = np.array([ct.n00 for _, _, ct in drug_event_pairs], dtype=np.int64)
+        
+        return self.detect_signals_columnar(
+            [drug for drug, _, _ in drug_event_pairs],
+            [event for _, event, _ in drug_event_pairs],
+            n11, n10, n01, n00,
+            estimate_priors=estimate_priors,
+            top_k=top_k
+        )
+    
+    def detect_signals_columnar(
+        self,
+        drugs: Sequence[str],
+        events: Sequence[str],
+        n11: np.ndarray,
+        n10: np.ndarray,
+        n01: np.ndarray,
+        n00: np.ndarray,
+        estimate_priors: bool = None,
+        top_k: Optional[int] = None
+    ) -> List[UnifiedSignalResult]:
+        """
+        Detect signals for many pairs given as parallel count arrays.
+        
+        Classical and Bayesian statistics and composite scores are computed
+        column-wise for every pair; UnifiedSignalResult objects and key
+        findings are only built for the pairs that are returned. Results
+        match calling detect_signal() per pair and sorting by composite
+        score, with rank/percentile relative to all pairs.
+        
+        Args:
+            drugs: Drug name per pair
+            events: Event name per pair
+            n11: Drug + event counts
+            n10: Drug + not event counts
+            n01: Not drug + event counts
+            n00: Not drug + not event counts
+            estimate_priors: Override default prior estimation setting
+            top_k: Only return the top_k pairs by composite score
             
         Returns:
             List of unified signals, sorted by composite score
@@ -500,31 +607,116 @@ class UnifiedSignalDetector:
         if estimate_priors is None:
             estimate_priors = self.estimate_priors
         
+        n11 = np.asarray(n11, dtype=np.int64)
+        n10 = np.asarray(n10, dtype=np.int64)
+        n01 = np.asarray(n01, dtype=np.int64)
+        n00 = np.asarray(n00, dtype=np.int64)
+        total = len(n11)
+        
+        classical = self.classical_analyzer.analyze_batch(n11, n10, n01, n00)
+        expected = classical.expected_count
+        
         # Estimate Bayesian priors if requested
         if estimate_priors:
-            contingency_tables = [ct for _, _, ct in drug_event_pairs]
-            self.bayesian_detector.estimate_priors(contingency_tables)
+            self.bayesian_detector.estimate_priors_from_counts(n11, expected)
             logger.info("Bayesian priors estimated from dataset")
         
-        # Detect signal for each pair
-        results = []
-        for drug, event, ct in drug_event_pairs:
-            result = self.detect_signal(drug, event, ct)
-            results.append(result)
+        bayesian = self.bayesian_detector.analyze_batch(n11, expected)
+        scores = self.score_calculator.calculate_composite_scores(classical, bayesian)
+        is_signal = classical.is_signal | bayesian.is_signal
+        
+        order = self._top_k_order(scores, top_k)
+        
+        # Fisher's exact test only runs for the rows being returned
+        returned_classical = self.classical_analyzer.analyze_batch(
+            n11[order], n10[order], n01[order], n00[order], include_fishers=True
+        )
         
-        # Sort by composite score (descending)
-        results.sort(key=lambda r: r.composite_score, reverse=True)
+        results = []
+        for rank, i in enumerate(order):
+            results.append(self._materialize(
+                drugs[i], events[i], i, returned_classical, rank,
+                bayesian, float(scores[i]), bool(is_signal[i])
+            ))
         
         # Assign ranks and percentiles
-        total = len(results)
         for i, result in enumerate(results):
             result.rank = i + 1
             result.percentile = 100 * (1 - i / total) if total > 0 else 0
         
         logger.info(f"Analyzed {total} drug-event pairs")
-        logger.info(f"Detected {sum(1 for r in results if r.is_signal)} signals")
+        logger.info(f"Detected {int(np.count_nonzero(is_signal))} signals")
         
         return results
+    
+    @staticmethod
+    def _top_k_order(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        """
+        Indices of the top_k scores, highest first.
+        
+        Ties keep input order, as with a stable descending sort.
+        """
+        n = len(scores)
+        if top_k is None or top_k >= n:
+            selected = np.arange(n)
+        elif top_k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        else:
+            # Partition to find the k-th largest score, then take every
+            # strictly larger score plus the earliest ties at the boundary
+            kth = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[:top_k - len(above)]
+            selected = np.concatenate([above, ties])
+        
+        return selected[np.lexsort((selected, -scores[selected]))]
+    
+    def _materialize(
+        self,
+        drug: str,
+        event: str,
+        i: int,
+        classical: DisproportionalityBatchResult,
+        classical_row: int,
+        bayesian: BayesianBatchResult,
+        composite_score: float,
+        is_signal: bool
+    ) -> UnifiedSignalResult:
+        """Build the UnifiedSignalResult and findings for one batch row"""
+        classical_result = classical.to_result(classical_row, drug, event)
+        bayesian_result = bayesian.to_signal(i, drug, event)
+        
+        # Determine signal strength (use strongest assessment)
+        if bayesian_result.signal_strength == SignalStrength.VERY_STRONG:
+            signal_strength = SignalStrength.VERY_STRONG
+        elif classical_result.signal_strength == SignalStrength.VERY_STRONG:
+            signal_strength = SignalStrength.VERY_STRONG
+        else:
+            signal_strength = bayesian_result.signal_strength
+        
+        result = UnifiedSignalResult(
+            drug=drug,
+            event=event,
+            observed_count=int(bayesian.observed_count[i]),
+            expected_count=float(bayesian.expected_count[i]),
+            classical=classical_result,
+            bayesian=bayesian_result,
+            is_signal=is_signal,
+            signal_strength=signal_strength,
+            confidence_level=max(
+                classical_result.confidence_level, bayesian_result.confidence_level
+            ),
+            composite_score=composite_score
+        )
+        
+        findings, risk_factors, recommendations = self.findings_generator.generate_findings(
+            result
+        )
+        result.key_findings = findings
+        result.risk_factors = risk_factors
+        result.recommendations = recommendations
+        
+        return result
 
 
 # ============================================================================
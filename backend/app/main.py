@@ -58,6 +58,39 @@ app.include_router(signal_detection_api.router, prefix="/api/v1")  # Phase 3.5+3
 app.include_router(quantum_fusion_api.router, prefix="/api/v1")  # Quantum-Bayesian fusion detection
 app.include_router(enhanced_ai_query_api.router)  # Enhanced NLP + fusion endpoint
 
+# Background refresh of the migration-007 materialized views
+from app.services.view_refresher import view_refresher
+
+
+@app.on_event("startup")
+async def start_view_refresher():
+    if os.getenv("MV_REFRESH_ENABLED", "true").lower() == "true":
+        view_refresher.start()
+
+
+@app.on_event("shutdown")
+async def stop_view_refresher():
+    await view_refresher.stop()
+
+
+# Process pool for upload text extraction (app/services/extraction_pool.py)
+from app.services.extraction_pool import extraction_executor
+
+
+@app.on_event("shutdown")
+async def stop_extraction_pool():
+    extraction_executor.close()
+
+
+# Worker pools of the shared fusion QueryRouter
+from app.core.signal_detection.fusion_query import close_query_router
+
+
+@app.on_event("shutdown")
+async def stop_query_router_pools():
+    close_query_router()
+
+
 @app.get("/")
 async def root():
     """API root endpoint"""
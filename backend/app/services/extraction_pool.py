@@ -0,0 +1,200 @@
+"""
+Extraction Worker Pool
+Runs CPU-bound text extraction (pdfplumber, python-docx, pytesseract,
+pandas) in a process pool instead of on the event loop thread
+
+- Server-wide concurrency is the pool size (EXTRACTION_MAX_WORKERS)
+- Each upload gets at most EXTRACTION_MAX_PER_UPLOAD members in flight, so
+  one large archive cannot take every worker
+- extract_many() returns results in input order regardless of which
+  member finishes first
+- iter_pdf_pages() streams a PDF's page texts in order while later page
+  ranges are still being parsed, so callers can start on the first pages
+  of a long document right away
+
+The worker functions import their libraries lazily and this module does
+not import the API modules, so worker processes start without creating
+Supabase or Anthropic clients.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = int(os.getenv("EXTRACTION_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_PER_UPLOAD = int(os.getenv("EXTRACTION_MAX_PER_UPLOAD", "2"))
+PDF_PAGES_PER_TASK = int(os.getenv("EXTRACTION_PDF_PAGES_PER_TASK", "8"))
+
+
+def extract_file_content(file_path: str, file_type: str) -> str:
+    """
+    Extract text from a single (non-archive) file
+
+    Runs inside a worker process; file_type is a files.SUPPORTED_FORMATS
+    category. Unknown types are read as text.
+    """
+    if file_type == "pdf":
+        import pdfplumber
+        with pdfplumber.open(file_path) as pdf:
+            return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+    elif file_type == "document":
+        # Try Word document first
+        if file_path.endswith('.docx'):
+            from docx import Document
+            doc = Document(file_path)
+            return "\n".join([para.text for para in doc.paragraphs])
+
+    elif file_type == "spreadsheet":
+        import pandas as pd
+        return pd.read_excel(file_path).to_string()
+
+    elif file_type == "email":
+        import email
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            msg = email.message_from_file(f)
+            return f"From: {msg['from']}\nSubject: {msg['subject']}\n\n{msg.get_payload()}"
+
+    elif file_type == "image":
+        # OCR for images
+        try:
+            import pytesseract
+            from PIL import Image
+            return pytesseract.image_to_string(Image.open(file_path))
+        except Exception as e:
+            print(f"OCR error: {e}")
+            return f"[Image file - OCR not available: {e}]"
+
+    # Plain text and fallback
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def pdf_page_count(file_path: str) -> int:
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of a PDF"""
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+
+class ExtractionExecutor:
+    """
+    Process pool for extract_file_content with per-upload limits.
+
+    Usage:
+        text = await extraction_executor.extract(path, "pdf")
+        texts = await extraction_executor.extract_many([(path, "pdf"), ...])
+        async for page in extraction_executor.iter_pdf_pages(path):
+            ...
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_per_upload: Optional[int] = None):
+        self.max_workers = max_workers or MAX_WORKERS
+        self.max_per_upload = max_per_upload or MAX_PER_UPLOAD
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def extract(self, file_path: str, file_type: str) -> str:
+        """Extract one file in the pool"""
+        return await self._run(extract_file_content, file_path, file_type)
+
+    async def iter_pdf_pages(
+        self,
+        file_path: str,
+        pages_per_task: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the text of every page of a PDF, in order
+
+        Pages are parsed in ranges of pages_per_task, with up to
+        EXTRACTION_MAX_PER_UPLOAD ranges in flight ahead of the consumer.
+        """
+        pages_per_task = pages_per_task or PDF_PAGES_PER_TASK
+        page_count = await self._run(pdf_page_count, file_path)
+        ranges = deque(
+            (start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)
+        )
+
+        pending: "deque[asyncio.Future]" = deque()
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < self.max_per_upload:
+                    start, stop = ranges.popleft()
+                    pending.append(asyncio.ensure_future(
+                        self._run(extract_pdf_pages, file_path, start, stop)
+                    ))
+                for text in await pending.popleft():
+                    yield text
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def extract_many(
+        self,
+        files: Sequence[Tuple[str, str]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[Union[str, BaseException]]:
+        """
+        Extract several files of one upload in parallel
+
+        Args:
+            files: (file_path, file_type) pairs
+            max_concurrency: Members in flight for this upload
+                (default EXTRACTION_MAX_PER_UPLOAD)
+
+        Returns:
+            Text or the raised exception for each file, in input order
+        """
+        slots = asyncio.Semaphore(max_concurrency or self.max_per_upload)
+
+        async def run(file_path: str, file_type: str) -> str:
+            async with slots:
+                return await self.extract(file_path, file_type)
+
+        return await asyncio.gather(
+            *(run(path, file_type) for path, file_type in files),
+            return_exceptions=True,
+        )
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, function, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. a native OCR/PDF crash); start a fresh pool next time
+            logger.warning(f"Extraction worker crashed on {args[0]}; restarting pool")
+            self._discard_pool(pool)
+            raise
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared instance used by the upload endpoints
+extraction_executor = ExtractionExecutor()
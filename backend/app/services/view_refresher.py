@@ -0,0 +1,237 @@
+"""
+Materialized View Refresher
+Keeps the migration-007 materialized views current in the background
+
+mv_drug_event_signals, mv_daily_statistics and mv_geographic_distribution
+are only as fresh as their last refresh_performance_views() call. The
+refresher polls an ingest watermark from file_upload_history (number of
+completed uploads and the latest upload time) and refreshes the views
+only when it moved:
+- a refresh waits until no new upload has completed for the debounce
+  period, so a burst of uploads triggers one refresh
+- a steady stream of uploads still gets a refresh at least every
+  max-delay seconds
+
+Endpoints call is_fresh() before reading a view and fall back to live
+queries when it returns False.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.analysis.query_cache import IngestWatermark, fetch_ingest_watermark
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZED_VIEWS = (
+    "mv_drug_event_signals",
+    "mv_daily_statistics",
+    "mv_geographic_distribution",
+)
+
+
+class MaterializedViewRefresher:
+    """
+    Debounced, watermark-driven refresher for the performance views.
+
+    tick() does one poll/refresh step and is what the background task
+    runs every poll_seconds; it can also be called directly (e.g. after a
+    bulk import) to refresh sooner.
+    """
+
+    def __init__(
+        self,
+        supabase_client: Optional[Any] = None,
+        poll_seconds: Optional[float] = None,
+        debounce_seconds: Optional[float] = None,
+        max_delay_seconds: Optional[float] = None,
+        max_staleness_seconds: Optional[float] = None,
+    ):
+        self._supabase = supabase_client
+        self._supabase_unavailable = False
+        self.poll_seconds = (
+            poll_seconds if poll_seconds is not None
+            else float(os.getenv("MV_REFRESH_POLL_SECONDS", "30"))
+        )
+        self.debounce_seconds = (
+            debounce_seconds if debounce_seconds is not None
+            else float(os.getenv("MV_REFRESH_DEBOUNCE_SECONDS", "120"))
+        )
+        self.max_delay_seconds = (
+            max_delay_seconds if max_delay_seconds is not None
+            else float(os.getenv("MV_REFRESH_MAX_DELAY_SECONDS", "900"))
+        )
+        self.max_staleness_seconds = (
+            max_staleness_seconds if max_staleness_seconds is not None
+            else float(os.getenv("MV_MAX_STALENESS_SECONDS", "600"))
+        )
+
+        self._lock = threading.Lock()
+        self._watermark: Optional[IngestWatermark] = None  # Latest polled
+        self._refreshed_watermark: Optional[IngestWatermark] = None  # Covered by the views
+        self._refreshed_at: Optional[float] = None  # Wall clock of last refresh
+        self._pending_since: Optional[float] = None  # First unrefreshed change
+        self._last_change_at: Optional[float] = None  # Most recent change
+        self._last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Refresh loop
+    # ------------------------------------------------------------------
+
+    def tick(self, now: Optional[float] = None) -> bool:
+        """
+        Poll the watermark and refresh the views if due
+
+        Returns:
+            True if the views were refreshed
+        """
+        now = time.time() if now is None else now
+        supabase = self._get_supabase()
+        if supabase is None:
+            return False
+
+        watermark = fetch_ingest_watermark(supabase)
+        with self._lock:
+            if watermark != self._watermark:
+                self._watermark = watermark
+                self._last_change_at = now
+            if watermark == self._refreshed_watermark:
+                self._pending_since = None
+                return False
+            if self._pending_since is None:
+                self._pending_since = now
+
+            # Nothing is known about the views at startup; refresh right away
+            first_refresh = self._refreshed_at is None
+            quiet_for = now - self._last_change_at
+            waiting_for = now - self._pending_since
+            if not first_refresh and quiet_for < self.debounce_seconds and waiting_for < self.max_delay_seconds:
+                return False
+
+        return self.refresh(watermark, now)
+
+    def refresh(self, watermark: Optional[IngestWatermark] = None, now: Optional[float] = None) -> bool:
+        """Run refresh_performance_views() and record what it covered"""
+        supabase = self._get_supabase()
+        if supabase is None:
+            return False
+        if watermark is None:
+            watermark = fetch_ingest_watermark(supabase)
+
+        start = time.perf_counter()
+        try:
+            supabase.rpc("refresh_performance_views", {}).execute()
+        except Exception as e:
+            with self._lock:
+                self._last_error = str(e)
+            logger.warning(f"Materialized view refresh failed: {e}")
+            return False
+
+        with self._lock:
+            self._refreshed_watermark = watermark
+            self._refreshed_at = time.time() if now is None else now
+            self._pending_since = None if watermark == self._watermark else self._last_change_at
+            self._last_error = None
+        logger.info(f"Refreshed materialized views in {time.perf_counter() - start:.1f}s "
+                    f"({watermark[0]} completed uploads)")
+        return True
+
+    async def run(self) -> None:
+        """Background loop; runs until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception as e:
+                logger.warning(f"Materialized view refresher error: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Staleness
+    # ------------------------------------------------------------------
+
+    def is_fresh(self, max_staleness_seconds: Optional[float] = None, now: Optional[float] = None) -> bool:
+        """
+        Whether the views are recent enough to serve reads
+
+        The views are fresh if they have been refreshed by this process and
+        either cover the latest ingest watermark or fell behind it less than
+        max_staleness_seconds ago.
+        """
+        limit = self.max_staleness_seconds if max_staleness_seconds is None else max_staleness_seconds
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._refreshed_at is None:
+                return False
+            if self._pending_since is None:
+                return True
+            return now - self._pending_since <= limit
+
+    def staleness(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        with self._lock:
+            refreshed_at = self._refreshed_at
+            pending_since = self._pending_since
+            status = {
+                "views": list(MATERIALIZED_VIEWS),
+                "refreshed_at": _isoformat(refreshed_at),
+                "ingest_watermark": _watermark_dict(self._watermark),
+                "refreshed_watermark": _watermark_dict(self._refreshed_watermark),
+                "pending_since": _isoformat(pending_since),
+                "stale_seconds": round(now - pending_since, 1) if pending_since is not None else 0.0,
+                "last_error": self._last_error,
+            }
+        status["fresh"] = self.is_fresh(now=now)
+        return status
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_supabase(self) -> Optional[Any]:
+        if self._supabase is None and not self._supabase_unavailable:
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+            if url and key:
+                try:
+                    from supabase import create_client
+                except ImportError:
+                    logger.warning("supabase not installed; materialized views will not be refreshed")
+                    self._supabase_unavailable = True
+                    return None
+                self._supabase = create_client(url, key)
+        return self._supabase
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _watermark_dict(watermark: Optional[IngestWatermark]) -> Optional[Dict[str, Any]]:
+    if watermark is None:
+        return None
+    return {"completed_uploads": watermark[0], "latest_upload_at": watermark[1]}
+
+
+# Shared instance used by the app and the endpoints
+view_refresher = MaterializedViewRefresher()
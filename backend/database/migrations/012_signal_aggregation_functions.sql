@@ -0,0 +1,135 @@
+-- Migration: Server-side Signal Aggregation
+-- Parameterized aggregate functions for the signals dashboard
+-- EXECUTION ORDER: 012 (Run after 007)
+
+-- The /api/v1/signals list and /stats tiles used to download raw pv_cases
+-- columns (up to 2000 rows for the list, every drug_name/reaction for the
+-- distinct counts) and aggregate in Python. These functions return the
+-- grouped and distinct counts directly. All filters are bound parameters,
+-- so the API no longer builds SQL strings for exec_sql.
+
+-- ============================================================================
+-- SHARED CASE FILTER
+-- ============================================================================
+-- Mirrors the filters of get_signals_fallback / get_signal_stats_fallback:
+-- organization, source (dataset), serious only, the uploads of a set of
+-- users (file_uploads.user_id -> pv_cases.upload_id) and the files uploaded
+-- on a session date (file_upload_history.uploaded_at -> source_file_id).
+
+CREATE OR REPLACE FUNCTION filtered_pv_cases(
+    p_organization TEXT DEFAULT NULL,
+    p_source TEXT DEFAULT NULL,
+    p_serious_only BOOLEAN DEFAULT FALSE,
+    p_session_date DATE DEFAULT NULL,
+    p_user_ids UUID[] DEFAULT NULL
+)
+RETURNS SETOF pv_cases AS $$
+    SELECT c.*
+    FROM pv_cases c
+    WHERE (p_organization IS NULL OR c.organization = p_organization)
+      AND (p_source IS NULL OR c.source = p_source)
+      AND (NOT COALESCE(p_serious_only, FALSE) OR c.serious = TRUE)
+      AND (p_session_date IS NULL OR c.source_file_id IN (
+          SELECT h.id FROM file_upload_history h
+          WHERE h.uploaded_at >= p_session_date
+            AND h.uploaded_at < p_session_date + 1
+      ))
+      AND (p_user_ids IS NULL OR c.upload_id IN (
+          SELECT u.id FROM file_uploads u WHERE u.user_id = ANY(p_user_ids)
+      ));
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- DRUG-EVENT GROUPS
+-- ============================================================================
+-- One row per (drug, reaction) with the same priority rule as the API:
+--   critical: >= 1000 cases or >= 80% serious
+--   high:     >= 500 cases or >= 50% serious
+--   medium:   >= 100 cases
+--   low:      otherwise
+-- p_search matches drug_name or reaction case-insensitively as a literal
+-- substring (no LIKE wildcards).
+
+CREATE OR REPLACE FUNCTION aggregate_drug_event_signals(
+    p_organization TEXT DEFAULT NULL,
+    p_source TEXT DEFAULT NULL,
+    p_serious_only BOOLEAN DEFAULT FALSE,
+    p_session_date DATE DEFAULT NULL,
+    p_user_ids UUID[] DEFAULT NULL,
+    p_search TEXT DEFAULT NULL,
+    p_priority TEXT DEFAULT NULL,
+    p_limit INTEGER DEFAULT 1000,
+    p_offset INTEGER DEFAULT 0
+)
+RETURNS TABLE(
+    id UUID,
+    drug TEXT,
+    reaction TEXT,
+    cases INTEGER,
+    serious_count INTEGER,
+    priority TEXT,
+    dataset TEXT,
+    organization TEXT
+) AS $$
+    WITH grouped AS (
+        SELECT
+            (ARRAY_AGG(c.id ORDER BY c.created_at, c.id))[1] AS id,
+            COALESCE(NULLIF(c.drug_name, ''), 'Unknown') AS drug,
+            COALESCE(NULLIF(c.reaction, ''), 'Unknown') AS reaction,
+            COUNT(*)::int AS cases,
+            (COUNT(*) FILTER (WHERE c.serious = TRUE))::int AS serious_count,
+            COALESCE((ARRAY_AGG(c.source ORDER BY c.created_at, c.id))[1], 'FAERS') AS dataset,
+            (ARRAY_AGG(c.organization ORDER BY c.created_at, c.id))[1] AS organization
+        FROM filtered_pv_cases(p_organization, p_source, p_serious_only, p_session_date, p_user_ids) c
+        WHERE p_search IS NULL
+           OR STRPOS(LOWER(COALESCE(c.drug_name, '')), LOWER(p_search)) > 0
+           OR STRPOS(LOWER(COALESCE(c.reaction, '')), LOWER(p_search)) > 0
+        GROUP BY 2, 3
+    ),
+    prioritized AS (
+        SELECT
+            g.*,
+            CASE
+                WHEN g.cases >= 1000 OR g.serious_count >= g.cases * 0.8 THEN 'critical'
+                WHEN g.cases >= 500 OR g.serious_count >= g.cases * 0.5 THEN 'high'
+                WHEN g.cases >= 100 THEN 'medium'
+                ELSE 'low'
+            END AS priority
+        FROM grouped g
+    )
+    SELECT p.id, p.drug, p.reaction, p.cases, p.serious_count, p.priority, p.dataset, p.organization
+    FROM prioritized p
+    WHERE p_priority IS NULL OR p.priority = LOWER(p_priority)
+    ORDER BY p.cases DESC, p.drug, p.reaction
+    LIMIT p_limit OFFSET p_offset;
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- DASHBOARD TILES
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION signal_summary_stats(
+    p_organization TEXT DEFAULT NULL,
+    p_source TEXT DEFAULT NULL,
+    p_session_date DATE DEFAULT NULL
+)
+RETURNS TABLE(
+    total_cases INTEGER,
+    serious_events INTEGER,
+    unique_drugs INTEGER,
+    unique_reactions INTEGER
+) AS $$
+    SELECT
+        COUNT(*)::int,
+        (COUNT(*) FILTER (WHERE c.serious = TRUE))::int,
+        (COUNT(DISTINCT c.drug_name) FILTER (WHERE c.drug_name <> ''))::int,
+        (COUNT(DISTINCT c.reaction) FILTER (WHERE c.reaction <> ''))::int
+    FROM filtered_pv_cases(p_organization, p_source, FALSE, p_session_date, NULL) c;
+$$ LANGUAGE sql STABLE;
+
+-- Covering index for the grouped scan
+CREATE INDEX IF NOT EXISTS idx_pv_cases_org_source_drug_reaction
+    ON pv_cases(organization, source, drug_name, reaction);
+
+COMMENT ON FUNCTION aggregate_drug_event_signals IS 'Grouped drug-event counts for /api/v1/signals';
+COMMENT ON FUNCTION signal_summary_stats IS 'Case, serious and distinct drug/reaction counts for /api/v1/signals/stats';
@@ -0,0 +1,22 @@
+-- Migration: Unique Indexes for Concurrent View Refresh
+-- EXECUTION ORDER: 013 (Run after 007)
+
+-- refresh_performance_views() uses REFRESH MATERIALIZED VIEW CONCURRENTLY,
+-- which Postgres only allows on views with a unique index. Migration 007
+-- created plain indexes, so the function failed on every call. The
+-- backend's view refresher (app/services/view_refresher.py) now calls it
+-- after uploads complete.
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_signals_drug_event
+    ON mv_drug_event_signals(drug_name, reaction);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_daily_date
+    ON mv_daily_statistics(date);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_geo_country
+    ON mv_geographic_distribution(reporter_country);
+
+-- A concurrent refresh requires the views to have been populated once
+REFRESH MATERIALIZED VIEW mv_drug_event_signals;
+REFRESH MATERIALIZED VIEW mv_daily_statistics;
+REFRESH MATERIALIZED VIEW mv_geographic_distribution;
@@ -0,0 +1,106 @@
+-- Migration: Grouped Analytics Functions and Consistent Signal Groups
+-- EXECUTION ORDER: 014 (Run after 012 and 013)
+
+-- 1. /sessions/analytics/overview computed its live rows by downloading
+--    every pv_cases row (one unpaged select) and grouping in Python while
+--    the migration-007 views were stale. These functions return the same
+--    rows as mv_daily_statistics / mv_geographic_distribution, grouped in
+--    the database.
+--
+-- 2. /signals reads the top of its list from mv_drug_event_signals and the
+--    rest from aggregate_drug_event_signals (migration 012). The view
+--    grouped raw names and dropped NULLs, while the function groups NULL
+--    and '' names as 'Unknown', so pages from the two sources disagreed.
+--    The view is recreated with the function's grouping and its id,
+--    dataset and organization columns.
+
+-- ============================================================================
+-- ANALYTICS OVERVIEW
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION analytics_daily_statistics(
+    p_start_date DATE DEFAULT NULL,
+    p_end_date DATE DEFAULT NULL
+)
+RETURNS TABLE(
+    date DATE,
+    total_cases INTEGER,
+    serious_cases INTEGER,
+    unique_drugs INTEGER,
+    unique_reactions INTEGER,
+    countries_reporting INTEGER,
+    avg_patient_age DOUBLE PRECISION
+) AS $$
+    SELECT
+        c.event_date::date,
+        COUNT(*)::int,
+        (COUNT(*) FILTER (WHERE c.serious = TRUE))::int,
+        (COUNT(DISTINCT c.drug_name))::int,
+        (COUNT(DISTINCT c.reaction))::int,
+        (COUNT(DISTINCT c.reporter_country))::int,
+        AVG(c.age_yrs)::float8
+    FROM pv_cases c
+    WHERE c.event_date IS NOT NULL
+      AND (p_start_date IS NULL OR c.event_date::date >= p_start_date)
+      AND (p_end_date IS NULL OR c.event_date::date <= p_end_date)
+    GROUP BY 1
+    ORDER BY 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION analytics_geographic_distribution()
+RETURNS TABLE(
+    reporter_country TEXT,
+    case_count INTEGER,
+    serious_count INTEGER,
+    unique_drugs INTEGER,
+    unique_reactions INTEGER
+) AS $$
+    SELECT
+        c.reporter_country,
+        COUNT(*)::int,
+        (COUNT(*) FILTER (WHERE c.serious = TRUE))::int,
+        (COUNT(DISTINCT c.drug_name))::int,
+        (COUNT(DISTINCT c.reaction))::int
+    FROM pv_cases c
+    WHERE c.reporter_country IS NOT NULL
+    GROUP BY 1
+    ORDER BY 2 DESC, 1;
+$$ LANGUAGE sql STABLE;
+
+CREATE INDEX IF NOT EXISTS idx_pv_cases_event_date
+    ON pv_cases(event_date);
+
+-- ============================================================================
+-- DRUG-EVENT SIGNAL VIEW
+-- ============================================================================
+-- Same groups, first case id, dataset and organization as
+-- aggregate_drug_event_signals without filters
+
+DROP MATERIALIZED VIEW IF EXISTS mv_drug_event_signals;
+
+CREATE MATERIALIZED VIEW mv_drug_event_signals AS
+SELECT
+    COALESCE(NULLIF(drug_name, ''), 'Unknown') AS drug_name,
+    COALESCE(NULLIF(reaction, ''), 'Unknown') AS reaction,
+    (ARRAY_AGG(id ORDER BY created_at, id))[1] AS first_case_id,
+    COALESCE((ARRAY_AGG(source ORDER BY created_at, id))[1], 'FAERS') AS dataset,
+    (ARRAY_AGG(organization ORDER BY created_at, id))[1] AS organization,
+    COUNT(*) AS case_count,
+    COUNT(*) FILTER (WHERE serious = true) AS serious_count,
+    AVG(prr) AS avg_prr,
+    AVG(ror) AS avg_ror,
+    AVG(ic) AS avg_ic,
+    BOOL_OR(is_statistical_signal) AS has_signal,
+    MAX(signal_strength) AS max_signal_strength
+FROM pv_cases
+GROUP BY 1, 2
+HAVING COUNT(*) >= 3;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mv_signals_drug_event
+    ON mv_drug_event_signals(drug_name, reaction);
+
+CREATE INDEX IF NOT EXISTS idx_mv_signals_count
+    ON mv_drug_event_signals(case_count DESC);
+
+COMMENT ON FUNCTION analytics_daily_statistics IS 'Live mv_daily_statistics rows for /sessions/analytics/overview';
+COMMENT ON FUNCTION analytics_geographic_distribution IS 'Live mv_geographic_distribution rows for /sessions/analytics/overview';
@@ -0,0 +1,141 @@
+"""
+Benchmark Streaming E2B Parsing
+===============================
+
+Writes a synthetic E2B R2 batch file and compares the streaming
+E2BParser.iter_r2 path (iterparse, processed reports detached) with the
+previous whole-tree path (ET.parse + findall) on reports/sec and peak RSS.
+
+The streaming path runs first, on the full file, so its peak RSS is
+measured before the whole-tree path grows the process. The whole-tree
+path is run on a smaller file by default since it holds every report.
+
+Usage:
+    python scripts/benchmark_e2b_streaming.py [n_reports] [n_tree_reports]
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Allow running from the backend directory or the scripts directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.api.multi_format_parsers import E2BParser
+
+REPORT_TEMPLATE = """  <safetyreport>
+    <safetyreportid>US-SYN-{i:08d}</safetyreportid>
+    <receiptdate>2024{month:02d}15</receiptdate>
+    <occurcountry>US</occurcountry>
+    <serious>{serious}</serious>
+    <primarysource><qualification>{qualification}</qualification></primarysource>
+    <patient>
+      <patientonsetage>{age}</patientonsetage>
+      <patientonsetageunit>801</patientonsetageunit>
+      <patientsex>{sex}</patientsex>
+      <patientweight>72</patientweight>
+      <reaction>
+        <reactionmeddrapt>Reaction {reaction}</reactionmeddrapt>
+        <reactionoutcome>{outcome}</reactionoutcome>
+        <reactionstartdate>2024{month:02d}01</reactionstartdate>
+      </reaction>
+      <drug>
+        <medicinalproduct>DRUG {drug}</medicinalproduct>
+        <drugindication>Indication {drug}</drugindication>
+        <drugdosagetext>10 mg daily</drugdosagetext>
+        <drugadministrationroute>048</drugadministrationroute>
+        <drugstartdate>2023{month:02d}01</drugstartdate>
+      </drug>
+      <drug>
+        <medicinalproduct>DRUG {concomitant}</medicinalproduct>
+      </drug>
+      <summary>
+        <narrativeincludeclinical>Synthetic narrative for report {i}.</narrativeincludeclinical>
+      </summary>
+    </patient>
+  </safetyreport>
+"""
+
+
+def write_r2_file(path: str, n_reports: int) -> int:
+    """Synthetic E2B R2 batch file; returns its size in bytes"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<ichicsr lang="en">\n')
+        f.write("  <ichicsrmessageheader><messagenumb>SYN-1</messagenumb></ichicsrmessageheader>\n")
+        for i in range(n_reports):
+            f.write(REPORT_TEMPLATE.format(
+                i=i,
+                month=1 + i % 12,
+                qualification=1 + i % 5,
+                serious=1 + i % 2,
+                age=18 + i % 70,
+                sex=1 + i % 2,
+                reaction=i % 4000,
+                outcome=1 + i % 6,
+                drug=i % 3000,
+                concomitant=(i * 7) % 3000,
+            ))
+        f.write("</ichicsr>\n")
+    return os.path.getsize(path)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def parse_whole_tree(parser: E2BParser, path: str) -> int:
+    """Previous parse_r2 behaviour: full tree, then every report into a list"""
+    root = ET.parse(path).getroot()
+    cases = [parser._parse_r2_report(report) for report in root.findall(".//safetyreport")]
+    return len(cases)
+
+
+def benchmark(n_reports: int = 500_000, n_tree_reports: int = 50_000):
+    parser = E2BParser()
+    workdir = tempfile.mkdtemp(prefix="e2b_bench_")
+    stream_path = os.path.join(workdir, "stream.xml")
+    tree_path = os.path.join(workdir, "tree.xml")
+
+    size = write_r2_file(stream_path, n_reports)
+    write_r2_file(tree_path, n_tree_reports)
+    baseline = peak_rss_mb()
+    print(f"📊 E2B R2 benchmark: {n_reports:,} reports ({size / 1e6:,.0f} MB) streamed, "
+          f"{n_tree_reports:,} parsed as a whole tree")
+
+    # Streaming path
+    start = time.perf_counter()
+    streamed = sum(1 for _ in parser.iter_r2(stream_path))
+    stream_elapsed = time.perf_counter() - start
+    stream_peak = peak_rss_mb() - baseline
+
+    # Whole-tree path
+    start = time.perf_counter()
+    parsed = parse_whole_tree(parser, tree_path)
+    tree_elapsed = time.perf_counter() - start
+    tree_peak = peak_rss_mb() - baseline
+
+    print(f"  Streaming (iterparse):  {streamed / stream_elapsed:>10,.0f} reports/sec, "
+          f"peak +{stream_peak:,.0f} MB for {streamed:,} reports")
+    print(f"  Whole tree (ET.parse):  {parsed / tree_elapsed:>10,.0f} reports/sec, "
+          f"peak +{tree_peak:,.0f} MB for {parsed:,} reports")
+
+    for path in (stream_path, tree_path):
+        os.remove(path)
+    os.rmdir(workdir)
+
+    return {
+        "stream_reports_per_sec": streamed / stream_elapsed,
+        "stream_peak_mb": stream_peak,
+        "tree_reports_per_sec": parsed / tree_elapsed,
+        "tree_peak_mb": tree_peak,
+    }
+
+
+if __name__ == "__main__":
+    n_reports = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    n_tree_reports = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    benchmark(n_reports, n_tree_reports)
@@ -0,0 +1,68 @@
+"""
+Build Drug-Event Count Cube
+===========================
+Rebuilds the persisted drug x event count cube from all rows in pv_cases.
+
+New cases are added to the cube incrementally on ingest (as delta files)
+and uploads deleted through the API are removed from it; run this once to
+seed the cube from existing data, after pv_cases was edited or deleted
+outside the API, or when the cube's strata change. The rebuilt cube
+replaces the base snapshot and the delta files present when it is written.
+
+Usage:
+    python backend/scripts/build_count_cube.py [--path data/count_cube] [--page-size 1000]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Allow running from the backend directory or the scripts directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from supabase import create_client
+
+from app.core.analysis.query_cache import fetch_ingest_watermark
+from app.core.signal_detection.count_cube import DrugEventCountCube
+
+CASE_COLUMNS = (
+    "drug_name,reaction,serious,sex,age,reporter_country,receipt_date,event_date,"
+    "source,source_file_id"
+)
+
+
+def build(path: str = None, page_size: int = 1000) -> DrugEventCountCube:
+    supabase = create_client(
+        os.environ["SUPABASE_URL"],
+        os.getenv("SUPABASE_SERVICE_KEY") or os.environ["SUPABASE_ANON_KEY"]
+    )
+    cube = DrugEventCountCube(path)
+    # Completed uploads before reading, recorded as the cube's coverage
+    covered_uploads, _ = fetch_ingest_watermark(supabase)
+
+    print(f"📦 Building count cube at {cube.path}")
+    offset = 0
+    while True:
+        result = supabase.table("pv_cases").select(CASE_COLUMNS).range(
+            offset, offset + page_size - 1
+        ).execute()
+        rows = result.data or []
+        cube.add_cases(rows)
+        offset += len(rows)
+        print(f"  {offset:,} cases read", end="\r")
+        if len(rows) < page_size:
+            break
+
+    cube.save_snapshot(covered_uploads)
+    print(f"\n✅ {cube.total:,} cases, {len(cube.drugs):,} drugs, "
+          f"{len(cube.events):,} events")
+    return cube
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--path", default=None, help="Cube directory (default: COUNT_CUBE_PATH)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+    build(args.path, args.page_size)
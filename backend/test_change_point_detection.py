@@ -0,0 +1,179 @@
+"""
+Test script for PELT change point detection
+Compares ChangePointDetector against brute-force optimal partitioning on
+random series, for both segment costs
+"""
+import sys
+from itertools import combinations
+
+import numpy as np
+
+from app.core.signal_detection.temporal_pattern_detection import ChangePointDetector
+
+
+def segmentation_cost(detector, counts, change_points, penalty):
+    """Total segment cost plus penalty of a segmentation"""
+    bounds = [0] + list(change_points) + [len(counts)]
+    total = 0.0
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        segment = counts[start:end]
+        total += float(detector._segment_costs(
+            np.sum(segment), np.sum(segment * segment), np.float64(len(segment))
+        ))
+    return total + penalty * len(change_points)
+
+
+def optimal_partitioning(detector, counts, penalty):
+    """Unpruned O(n²) dynamic program over every admissible final segment"""
+    n, m = len(counts), detector.min_segment_size
+    F = [np.inf] * (n + 1)
+    F[0] = -penalty
+    last = [0] * (n + 1)
+    for t in range(m, n + 1):
+        for s in [0] + list(range(m, t - m + 1)):
+            cost = F[s] + segmentation_cost(detector, counts[s:t], [], 0.0) + penalty
+            if cost < F[t]:
+                F[t], last[t] = cost, s
+    change_points = []
+    t = n
+    while last[t] > 0:
+        t = last[t]
+        change_points.append(t)
+    return sorted(change_points), F[n]
+
+
+def exhaustive_partitioning(detector, counts, penalty):
+    """Best segmentation found by enumerating every set of change points"""
+    n, m = len(counts), detector.min_segment_size
+    best, best_cost = [], segmentation_cost(detector, counts, [], penalty)
+    for k in range(1, n // m):
+        for change_points in combinations(range(m, n - m + 1), k):
+            bounds = (0,) + change_points + (n,)
+            if min(np.diff(bounds)) < m:
+                continue
+            cost = segmentation_cost(detector, counts, change_points, penalty)
+            if cost < best_cost:
+                best, best_cost = list(change_points), cost
+    return best, best_cost
+
+
+def random_series(rng, n, cost):
+    """Piecewise-constant rates with a few random shifts"""
+    n_shifts = min(int(rng.integers(0, 6)), n - 1)
+    shifts = np.sort(rng.choice(np.arange(1, n), n_shifts, replace=False))
+    rates = rng.uniform(0.5, 15.0, n_shifts + 1)
+    mean = np.repeat(rates, np.diff(np.concatenate([[0], shifts, [n]])))
+    if cost == "poisson":
+        return rng.poisson(mean).astype(np.float64)
+    return mean + rng.normal(0.0, 1.0, n)
+
+
+def test_matches_optimal_partitioning():
+    """
+    Default penalty, segments of a few minimum lengths. Pruning against
+    F(t) before t - min_segment_size was admissible lost the optimum on
+    some of these series.
+    """
+    print("=" * 70)
+    print("TEST 1: PELT matches unpruned optimal partitioning")
+    print("=" * 70)
+
+    rng = np.random.default_rng(1)
+    passed = True
+    for cost in ChangePointDetector.COST_FUNCTIONS:
+        for _ in range(500):
+            m = int(rng.integers(2, 11))
+            detector = ChangePointDetector(min_segment_size=m, cost=cost, max_change_points=None)
+            counts = random_series(rng, int(rng.integers(2 * m, 6 * m)), cost)
+            penalty = detector._default_penalty(counts)
+            found = detector._find_change_points(counts)
+            expected, expected_cost = optimal_partitioning(detector, counts, penalty)
+            found_cost = segmentation_cost(detector, counts, found, penalty)
+            if not np.isclose(found_cost, expected_cost, rtol=1e-9, atol=1e-9):
+                print(f"❌ {cost}, m={m}: {found} (cost {found_cost:.2f}) vs "
+                      f"{expected} (cost {expected_cost:.2f})")
+                passed = False
+    if passed:
+        print("✅ PELT matches optimal partitioning for both costs")
+    return passed
+
+
+def test_matches_brute_force():
+    """Small series checked against every possible segmentation"""
+    print("=" * 70)
+    print("TEST 2: PELT matches exhaustive search")
+    print("=" * 70)
+
+    rng = np.random.default_rng(11)
+    passed = True
+    for cost in ChangePointDetector.COST_FUNCTIONS:
+        for m in (1, 2, 3, 5):
+            for penalty in (0.5, 4.0, 20.0):
+                detector = ChangePointDetector(
+                    min_segment_size=m, cost=cost, penalty=penalty, max_change_points=None
+                )
+                for _ in range(8):
+                    counts = random_series(rng, int(rng.integers(2 * m, 16)), cost)
+                    found = detector._find_change_points(counts)
+                    expected, expected_cost = exhaustive_partitioning(detector, counts, penalty)
+                    found_cost = segmentation_cost(detector, counts, found, penalty)
+                    if not np.isclose(found_cost, expected_cost, rtol=1e-9, atol=1e-9):
+                        print(f"❌ {cost}, m={m}, penalty={penalty}: {found} "
+                              f"(cost {found_cost:.2f}) vs {expected} (cost {expected_cost:.2f})")
+                        passed = False
+    if passed:
+        print("✅ PELT matches exhaustive search")
+    return passed
+
+
+def test_batch_matches_single():
+    """Batched segmentation gives each series its own optimum"""
+    print("=" * 70)
+    print("TEST 3: Batch segmentation matches per-series segmentation")
+    print("=" * 70)
+
+    rng = np.random.default_rng(3)
+    detector = ChangePointDetector(cost="poisson", max_change_points=None)
+    counts = np.stack([random_series(rng, 120, "poisson") for _ in range(40)])
+    batch = detector.detect_change_points_batch(counts)
+    single = [detector._find_change_points(row) for row in counts]
+    if batch != single:
+        print("❌ Batch and per-series change points differ")
+        return False
+    print("✅ Batch segmentation matches per-series segmentation")
+    return True
+
+
+def main():
+    tests = [
+        ("Optimal partitioning", test_matches_optimal_partitioning),
+        ("Exhaustive search", test_matches_brute_force),
+        ("Batch", test_batch_matches_single),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ Test '{test_name}' failed with exception: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Test script for the E2B R2 fast path
+Checks that seriousness comes from the report-level <serious> element
+(1 = yes, 2 = no), not from the reaction outcome
+"""
+import os
+import sys
+import tempfile
+
+from app.api.multi_format_parsers import E2BParser
+
+REPORTS = """<?xml version="1.0" encoding="UTF-8"?>
+<ichicsr lang="en">
+  <safetyreport>
+    <safetyreportid>US-TEST-1</safetyreportid>
+    <serious>2</serious>
+    <receiptdate>20240115</receiptdate>
+    <patient>
+      <patientonsetage>6</patientonsetage>
+      <patientonsetageunit>802</patientonsetageunit>
+      <reaction>
+        <reactionmeddrapt>Rash</reactionmeddrapt>
+        <reactionoutcome>1</reactionoutcome>
+        <reactionstartdate>202401</reactionstartdate>
+      </reaction>
+      <drug><medicinalproduct>DRUG A</medicinalproduct></drug>
+    </patient>
+  </safetyreport>
+  <safetyreport>
+    <safetyreportid>US-TEST-2</safetyreportid>
+    <serious>1</serious>
+    <receiptdate>20240116</receiptdate>
+    <patient>
+      <reaction>
+        <reactionmeddrapt>Hepatic failure</reactionmeddrapt>
+        <reactionoutcome>5</reactionoutcome>
+      </reaction>
+      <drug><medicinalproduct>DRUG B</medicinalproduct></drug>
+      <patientdeath><patientdeathdate>20240110</patientdeathdate></patientdeath>
+    </patient>
+  </safetyreport>
+</ichicsr>
+"""
+
+
+def parse_reports():
+    with tempfile.NamedTemporaryFile("w", suffix=".xml", delete=False) as f:
+        f.write(REPORTS)
+    try:
+        return list(E2BParser().iter_r2(f.name))
+    finally:
+        os.unlink(f.name)
+
+
+def test_parser_seriousness():
+    """A recovered non-serious report is not serious, a fatal serious one is"""
+    print("=" * 70)
+    print("TEST 1: Parser reads report-level seriousness")
+    print("=" * 70)
+
+    cases = parse_reports()
+    flags = [case["serious"] for case in cases]
+    if flags != [False, True]:
+        print(f"❌ Expected [False, True], got {flags}")
+        return False
+    print("✅ Seriousness read from <serious>")
+    return True
+
+
+def test_entity_mapping():
+    """pv_cases entities keep the seriousness, convert ages and dates"""
+    print("=" * 70)
+    print("TEST 2: E2B cases map to entities")
+    print("=" * 70)
+
+    from app.api.files import e2b_case_to_entity
+
+    non_serious, serious = [e2b_case_to_entity(case) for case in parse_reports()]
+    checks = [
+        ("non-serious report", non_serious["serious"] is False),
+        ("serious report", serious["serious"] is True),
+        ("age in years", non_serious["patient"]["age"] == 0.5),
+        ("ISO receipt date", non_serious["receipt_date"] == "2024-01-15"),
+        ("partial event date dropped", non_serious["event_date"] is None),
+    ]
+    passed = True
+    for name, ok in checks:
+        if not ok:
+            print(f"❌ {name}")
+            passed = False
+    if passed:
+        print("✅ Entities carry seriousness, ages and dates")
+    return passed
+
+
+def main():
+    tests = [
+        ("Parser seriousness", test_parser_seriousness),
+        ("Entity mapping", test_entity_mapping),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ Test '{test_name}' failed with exception: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
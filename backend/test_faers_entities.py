@@ -0,0 +1,118 @@
+"""
+Test script for the FAERS quarterly fast path
+Checks that every suspect drug and every reaction (PT) of a report
+becomes a pv_cases row, not only the first of each
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+from app.api.faers_quarterly import FAERSQuarterlyLoader
+
+QUARTER_FILES = {
+    "DEMO24Q1.TXT": (
+        "primaryid$caseid$caseversion$event_dt$init_fda_dt$fda_dt$rept_dt$age$age_cod$sex$wt$wt_cod$occr_country$occp_cod\n"
+        "1001$100$1$20240105$20240110$20240110$20240108$54$YR$F$$$US$MD\n"
+    ),
+    "DRUG24Q1.TXT": (
+        "primaryid$caseid$drug_seq$role_cod$drugname$prod_ai$route$dose_vbm\n"
+        "1001$100$1$PS$DRUG A$A$ORAL$10 MG\n"
+        "1001$100$2$SS$DRUG B$B$ORAL$5 MG\n"
+        "1001$100$3$C$DRUG C$C$ORAL$1 MG\n"
+    ),
+    "REAC24Q1.TXT": (
+        "primaryid$caseid$pt$drug_rec_act\n"
+        "1001$100$Nausea$\n"
+        "1001$100$Vomiting$\n"
+    ),
+    "OUTC24Q1.TXT": "primaryid$caseid$outc_cod\n1001$100$HO\n",
+}
+
+
+def load_entities():
+    from app.api.files import faers_case_to_entities
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, content in QUARTER_FILES.items():
+            Path(directory, name).write_text(content)
+        cases = list(FAERSQuarterlyLoader(directory, partitions=2).iter_cases())
+    return cases, [entity for case in cases for entity in faers_case_to_entities(case)]
+
+
+def test_rows_per_drug_and_reaction():
+    """One entity per (suspect drug, PT); concomitant drugs are not rows"""
+    print("=" * 70)
+    print("TEST 1: Suspect drug x reaction rows")
+    print("=" * 70)
+
+    cases, entities = load_entities()
+    pairs = sorted((e["drug"]["name"], e["reaction"]["description"]) for e in entities)
+    expected = [
+        ("DRUG A", "Nausea"), ("DRUG A", "Vomiting"),
+        ("DRUG B", "Nausea"), ("DRUG B", "Vomiting"),
+    ]
+    if len(cases) != 1:
+        print(f"❌ Expected 1 joined report, got {len(cases)}")
+        return False
+    if pairs != expected:
+        print(f"❌ Expected {expected}, got {pairs}")
+        return False
+    print("✅ 1 report -> 4 rows, Vomiting kept")
+    return True
+
+
+def test_report_fields_on_every_row():
+    """Report-level fields are the same on every row of the report"""
+    print("=" * 70)
+    print("TEST 2: Report fields copied to every row")
+    print("=" * 70)
+
+    _, entities = load_entities()
+    checks = [
+        ("serious", all(e["serious"] is True for e in entities)),
+        ("age", all(e["patient"]["age"] == 54.0 for e in entities)),
+        ("country", all(e["reporter"]["country"] == "US" for e in entities)),
+        ("receipt date", all(e["receipt_date"] == "2024-01-10" for e in entities)),
+    ]
+    passed = True
+    for name, ok in checks:
+        if not ok:
+            print(f"❌ {name}")
+            passed = False
+    if passed:
+        print("✅ Seriousness, age, country and dates on all rows")
+    return passed
+
+
+def main():
+    tests = [
+        ("Rows per drug and reaction", test_rows_per_drug_and_reaction),
+        ("Report fields on every row", test_report_fields_on_every_row),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ Test '{test_name}' failed with exception: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Test script for the GPS (two-gamma mixture) EBGM mode
+Checks that SIGNAL_EBGM_METHOD=gps reaches the unified detector and that
+the fitted prior is only rewritten when the fit changes
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from app.core.signal_detection.bayesian_signal_detection import GPSPrior
+from app.core.signal_detection.unified_signal_detection import UnifiedSignalDetector
+
+
+def make_counts(seed: int = 0, pairs: int = 400):
+    """Synthetic columnar contingency tables"""
+    rng = np.random.default_rng(seed)
+    n11 = rng.poisson(4, pairs) + 1
+    n10 = rng.integers(10, 200, pairs)
+    n01 = rng.integers(10, 200, pairs)
+    n00 = np.full(pairs, 100000)
+    drugs = [f"drug_{i}" for i in range(pairs)]
+    events = [f"event_{i}" for i in range(pairs)]
+    return drugs, events, n11, n10, n01, n00
+
+
+def test_env_flag_enables_gps():
+    """SIGNAL_EBGM_METHOD=gps switches the detector to the GPS prior"""
+    print("=" * 70)
+    print("TEST 1: SIGNAL_EBGM_METHOD enables GPS")
+    print("=" * 70)
+
+    os.environ["SIGNAL_EBGM_METHOD"] = "gps"
+    try:
+        gps_detector = UnifiedSignalDetector()
+    finally:
+        os.environ.pop("SIGNAL_EBGM_METHOD")
+    default_detector = UnifiedSignalDetector()
+
+    if gps_detector.bayesian_detector.gps_calculator is None:
+        print("❌ GPS calculator not created with SIGNAL_EBGM_METHOD=gps")
+        return False
+    if default_detector.bayesian_detector.gps_calculator is not None:
+        print("❌ GPS calculator created without the flag")
+        return False
+    print("✅ gps with the flag, quadrature without")
+    return True
+
+
+def test_prior_saved_only_on_change():
+    """Refits on unchanged counts leave the persisted prior alone"""
+    print("=" * 70)
+    print("TEST 2: GPS prior persisted only when the fit changes")
+    print("=" * 70)
+
+    saves = []
+    original_save = GPSPrior.save
+
+    def counting_save(self, path=None):
+        saves.append(path)
+        original_save(self, path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["GPS_PRIOR_PATH"] = os.path.join(directory, "gps_prior.json")
+        GPSPrior.save = counting_save
+        try:
+            drugs, events, n11, n10, n01, n00 = make_counts()
+            detector = UnifiedSignalDetector(ebgm_method="gps")
+            for _ in range(3):
+                detector.detect_signals_columnar(drugs, events, n11, n10, n01, n00, top_k=5)
+            unchanged_saves = len(saves)
+
+            # A new detector warm-starts from the saved prior
+            UnifiedSignalDetector(ebgm_method="gps").detect_signals_columnar(
+                drugs, events, n11, n10, n01, n00, top_k=5
+            )
+            reloaded_saves = len(saves)
+
+            n11_grown = n11.copy()
+            n11_grown[:50] += 20
+            detector.detect_signals_columnar(drugs, events, n11_grown, n10, n01, n00, top_k=5)
+            changed_saves = len(saves)
+        finally:
+            GPSPrior.save = original_save
+            os.environ.pop("GPS_PRIOR_PATH")
+
+    print(f"Saves: {unchanged_saves} after 3 runs, {reloaded_saves} after reload, "
+          f"{changed_saves} after new counts")
+    if unchanged_saves != 1 or reloaded_saves != 1:
+        print("❌ Prior rewritten although the counts did not change")
+        return False
+    if changed_saves != 2:
+        print("❌ Prior not saved after the counts changed")
+        return False
+    print("✅ One write per distinct fit")
+    return True
+
+
+def main():
+    tests = [
+        ("SIGNAL_EBGM_METHOD flag", test_env_flag_enables_gps),
+        ("Prior saved only on change", test_prior_saved_only_on_change),
+    ]
+
+    results = []
+    for test_name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((test_name, result))
+        except Exception as e:
+            print(f"❌ Test '{test_name}' failed with exception: {e}")
+            results.append((test_name, False))
+
+    print("\n" + "=" * 70)
+    print("TEST SUMMARY")
+    print("=" * 70)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())